@@ -1,4 +1,92 @@
 # Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ingen gemensam detektortabell att släppa vid urladdning längre.
+#
+# Version: 0.9.24
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Den gemensamma ServiceCallBatcher töms och släpps när sista entry laddas ur.
+#
+# Version: 0.9.22
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Tjänsten knx_doubleclick.profile profilerar telegramhantering, inläsning
+#   av åtgärdsfiler och körning av åtgärder under ett antal sekunder.
+#
+# Version: 0.9.21
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Den gemensamma tillståndstabellen släpps när sista entry laddas ur.
+#
+# Version: 0.9.18
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ändrade options för en enskild knapp tas i bruk i den körande detektorn
+#   (async_apply_config) i stället för att entry laddas om. Sensorn har
+#   inte längre en egen lyssnare; entry har en enda.
+#
+# Version: 0.9.17
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Katalogen för åtgärdsfiler kontrolleras inte längre per entry; den skapas
+#   en gång när katalogbevakaren startar, och filerna förbereds i batch av
+#   sensorplattformen. Den gemensamma ActionFilesLoader släpps vid sista urladdning.
+#
+# Version: 0.9.16
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Hubb-entries: en lyssnare som låter hubben lägga till, ändra och ta bort
+#   knappar utan omladdning. Statistik och spår för alla hubbens knappar tas
+#   bort vid urladdning, och get_trace/diagnostik omfattar hubbens knappar.
+#
+# Version: 0.9.12
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Tjänsten knx_doubleclick.get_trace returnerar detektorernas spårbuffertar.
+#
+# Version: 0.9.11
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Detektorns statistik tas bort när dess entry laddas ur.
+#
+# Version: 0.9.10
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Det gemensamma timerhjulet för gestfönster stoppas när sista entry
+#   laddas ur.
+#
+# Version: 0.9.5
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Katalogbevakaren för åtgärdsfiler startas med första entry och stoppas
+#   när sista entry laddas ur.
+#
+# Version: 0.9.2
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Dispatcherns nedstängning är asynkron (avregistrerar GA hos KNX).
+#
+# Version: 0.9.1
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Den gemensamma knx_event-dispatchern skapas här och stängs ner när sista
+#   config entry laddas ur.
+#
 # Version: 0.8.17
 # Datum: 2026-01-01
 # Upphovsman: AI-Assistent
@@ -7,38 +95,131 @@
 #   för att skicka 'exist_ok=True' till os.makedirs via async_add_executor_job.
 
 import logging
-import os
-from functools import partial
 
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, PLATFORMS, ACTIONS_DIR_BASENAME
+from .const import (
+    DOMAIN,
+    PLATFORMS,
+    ACTIONS_DIR_BASENAME,
+    DATA_DISPATCHER,
+    DATA_WATCHER,
+    DATA_TIMER_WHEEL,
+    DATA_STATS,
+    DATA_TRACES,
+    DATA_HUBS,
+    DATA_ACTIONS_LOADER,
+    DATA_DETECTORS,
+    DATA_SERVICE_BATCHER,
+    CONF_ENTRY_TYPE,
+    ENTRY_TYPE_HUB,
+    SERVICE_GET_TRACE,
+    SERVICE_PROFILE,
+    ATTR_ENTRY_ID,
+    ATTR_SECONDS,
+    ATTR_TOP,
+    ATTR_SORT,
+    DEFAULT_PROFILE_SECONDS,
+    MAX_PROFILE_SECONDS,
+    DEFAULT_PROFILE_TOP,
+    PROFILE_SORT_KEYS,
+    DEFAULT_PROFILE_SORT,
+)
+from .dispatcher import async_get_dispatcher
+from .profiler import async_profile
+from .watcher import async_start_watcher
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+GET_TRACE_SCHEMA = vol.Schema({vol.Optional(ATTR_ENTRY_ID): cv.string})
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_SECONDS, default=DEFAULT_PROFILE_SECONDS): vol.All(
+            vol.Coerce(float), vol.Range(min=0.1, max=MAX_PROFILE_SECONDS)
+        ),
+        vol.Optional(ATTR_TOP, default=DEFAULT_PROFILE_TOP): vol.All(vol.Coerce(int), vol.Range(min=1, max=500)),
+        vol.Optional(ATTR_SORT, default=DEFAULT_PROFILE_SORT): vol.In(PROFILE_SORT_KEYS),
+    }
+)
+
+
+def entry_id_of_detector(detector_id: str) -> str:
+    """Entry-id för en detektor; knappar i en hubb har id '<entry_id>_<knapp-id>'."""
+    return detector_id.split("_", 1)[0]
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Registrerar integrationens tjänster."""
+
+    async def _async_get_trace(call: ServiceCall) -> ServiceResponse:
+        traces = hass.data.get(DOMAIN, {}).get(DATA_TRACES, {})
+        entry_id = call.data.get(ATTR_ENTRY_ID)
+        if entry_id is not None and not any(entry_id_of_detector(detector_id) == entry_id for detector_id in traces):
+            raise ServiceValidationError(f"Ingen laddad detektor med entry_id '{entry_id}'.")
+        detectors = {}
+        for detector_id, trace in traces.items():
+            if entry_id is not None and entry_id_of_detector(detector_id) != entry_id:
+                continue
+            entry = hass.config_entries.async_get_entry(entry_id_of_detector(detector_id))
+            detectors[detector_id] = {
+                "title": entry.title if entry is not None else None,
+                **trace.as_dict(),
+            }
+        return {"detectors": detectors}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_TRACE,
+        _async_get_trace,
+        schema=GET_TRACE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def _async_profile(call: ServiceCall) -> ServiceResponse:
+        summary = await async_profile(hass, call.data[ATTR_SECONDS], call.data[ATTR_TOP], call.data[ATTR_SORT])
+        return summary if call.return_response else None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        _async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Sätter upp KNX Dubbelklicksdetektor från en config entry."""
     _LOGGER.info("Sätter upp config entry för KNX Dubbelklicksdetektor: %s", entry.title)
 
-    # Säkerställ att katalogen för åtgärdsfiler existerar
-    actions_dir_path = hass.config.path(ACTIONS_DIR_BASENAME)
-    if not await hass.async_add_executor_job(os.path.exists, actions_dir_path):
-        try:
-            _LOGGER.info("Skapar katalog för åtgärdsfiler: %s", actions_dir_path)
-            # ANVÄND PARTIAL HÄR: async_add_executor_job stöder inte kwargs direkt
-            await hass.async_add_executor_job(partial(os.makedirs, actions_dir_path, exist_ok=True))
-        except Exception as e:
-            _LOGGER.error("Kunde inte skapa katalog för åtgärdsfiler %s: %s", actions_dir_path, e)
-            return False
-
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = entry.data
+    # Gemensam dispatcher: en enda knx_event-lyssnare för alla detektorer
+    async_get_dispatcher(hass)
+    # Gemensam bevakare: åtgärdsfiler läses om när de sparas, inte vid klick.
+    # Bevakaren skapar katalogen för åtgärdsfiler första gången den startas.
+    try:
+        await async_start_watcher(hass)
+    except OSError as e:
+        _LOGGER.error("Kunde inte skapa katalog för åtgärdsfiler %s: %s", hass.config.path(ACTIONS_DIR_BASENAME), e)
+        return False
 
     # Vidarebefordra setup till sensor-plattformen
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     # Lägg till en lyssnare för när optioner uppdateras
-    entry.async_on_unload(entry.add_update_listener(async_update_options_listener))
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_HUB:
+        entry.async_on_unload(entry.add_update_listener(async_update_hub_listener))
+    else:
+        entry.async_on_unload(entry.add_update_listener(async_update_options_listener))
 
     _LOGGER.debug("Config entry %s uppsatt.", entry.title)
     return True
@@ -53,11 +234,51 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id, None)
+        hass.data[DOMAIN].get(DATA_HUBS, {}).pop(entry.entry_id, None)
+        for key in (DATA_STATS, DATA_TRACES):
+            per_detector = hass.data[DOMAIN].get(key, {})
+            for detector_id in [d for d in per_detector if entry_id_of_detector(d) == entry.entry_id]:
+                del per_detector[detector_id]
+        if not any(
+            other.entry_id != entry.entry_id and other.state is ConfigEntryState.LOADED
+            for other in hass.config_entries.async_entries(DOMAIN)
+        ):
+            dispatcher = hass.data[DOMAIN].pop(DATA_DISPATCHER, None)
+            if dispatcher is not None:
+                await dispatcher.async_shutdown()
+            watcher = hass.data[DOMAIN].pop(DATA_WATCHER, None)
+            if watcher is not None:
+                await watcher.async_stop()
+            hass.data[DOMAIN].pop(DATA_ACTIONS_LOADER, None)
+            batcher = hass.data[DOMAIN].pop(DATA_SERVICE_BATCHER, None)
+            if batcher is not None:
+                batcher.async_shutdown()
+            wheel = hass.data[DOMAIN].pop(DATA_TIMER_WHEEL, None)
+            if wheel is not None:
+                wheel.stop()
         _LOGGER.debug("Config entry %s urladdad.", entry.title)
 
     return unload_ok
 
 async def async_update_options_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Hanterar uppdateringar av options för config entry."""
-    _LOGGER.info("Optioner uppdaterade för %s, laddar om integrationen.", entry.title)
-    await hass.config_entries.async_reload(entry.entry_id)
\ No newline at end of file
+    """Tar i bruk ändrade options i den körande detektorn, utan omladdning.
+
+    Entry laddas bara om när det inte finns någon körande detektor att
+    uppdatera (t.ex. om sensorn är avstängd).
+    """
+    sensor = hass.data.get(DOMAIN, {}).get(DATA_DETECTORS, {}).get(entry.entry_id)
+    if sensor is None:
+        _LOGGER.info("Optioner uppdaterade för %s, ingen körande detektor; laddar om integrationen.", entry.title)
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    _LOGGER.info("Optioner uppdaterade för %s, tillämpas utan omladdning.", entry.title)
+    sensor.async_apply_config({**entry.data, **entry.options})
+
+
+async def async_update_hub_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Hubbens knapptabell eller gemensamma inställningar har ändrats; ingen omladdning."""
+    hub = hass.data.get(DOMAIN, {}).get(DATA_HUBS, {}).get(entry.entry_id)
+    if hub is None:
+        return
+    _LOGGER.info("Hubb %s uppdaterad, synkar knappar.", entry.title)
+    await hub.async_sync()
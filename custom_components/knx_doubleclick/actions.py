@@ -0,0 +1,872 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - async_call_services loggar spårningen för varje misslyckat anrop på
+#   debug-nivå; den samlade felrapporten innehåller bara feltexten.
+# - ActionFilesLoader loggar oväntade fel med spårning innan väntande
+#   detektorer får felet, och avbryts batchen avbryts även de väntande i
+#   stället för att hänga kvar.
+# - DetectorActions behåller utbytta Script (nytt körläge eller ny plan) så
+#   länge de kör, och async_stop stoppar även dem vid urladdning.
+# - Importerna sorterade (ruff I001).
+# - DirectCall.__slots__ sorterade (ruff RUF023).
+#
+# Version: 0.9.24
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - async_call_services tar ett valfritt batch_window. Med ett fönster > 0
+#   går anropen via den gemensamma ServiceCallBatcher och slås ihop med
+#   likadana anrop från andra detektorer.
+#
+# Version: 0.9.22
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Inläsningen (DetectorActions.async_load) och executor-jobben för läsning
+#   och parsning profileras under en pågående knx_doubleclick.profile.
+#
+# Version: 0.9.19
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Sektioner per värde (value_N) för detektorer som lyssnar på flera värden,
+#   t.ex. scener. Varje värdesektion är en lista eller egna gestsektioner och
+#   ersätter filens övriga sektioner för det värdet. Scripten nycklas på
+#   ActionPlan i stället för på gestnamnet.
+#
+# Version: 0.9.17
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - ActionFilesLoader: åtgärdsfiler som efterfrågas samtidigt (t.ex. vid start)
+#   förbereds i ett enda executor-jobb: ett scandir av katalogen, saknade
+#   standardfiler skrivs och alla filer läses och parsas. DetectorActions.async_load
+#   tar emot det förberedda resultatet och hoppar då över sin egen läsning.
+#
+# Version: 0.9.10
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Åtgärdsfilen kan delas upp i sektioner per gest (single, double, triple,
+#   click_N, hold). En vanlig lista betyder double som tidigare. Varje sektion
+#   blir en egen ActionPlan i filens ActionFilePlan, med eget Script.
+#
+# Version: 0.9.9
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Scriptets körläge och max_runs är konfigurerbara (tidigare alltid single).
+#   Samma Script-instans används för alla körningar tills plan eller läge
+#   ändras. async_run räknar körningar som avvisas eller köas av körläget.
+#
+# Version: 0.9.7
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Direktanropen kompileras en gång när planen byggs (DirectCall): domän och
+#   tjänst delas upp och kontrolleras mot hass.services, data/target slås ihop
+#   och mallar förparsas. Vid klick renderas bara mallarna, med samma
+#   trigger-variabler som Script-vägen får. Mallar tvingar inte längre fram Script.
+#
+# Version: 0.9.6
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - async_call_services: direktanrop körs sekventiellt, samtidigt (gather)
+#   eller utan att vänta (non_blocking), med timeout per anrop och samlad
+#   felrapport i stället för att avbryta och köra om allt via Script.
+#
+# Version: 0.9.5
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ingen stat av åtgärdsfilen vid klick längre. Filen läses om när
+#   katalogbevakaren (watcher.py) ser en ändring; parsning och schemakontroll
+#   körs i executor och den nya planen byts in atomiskt.
+# - Parse- och schemafel visas som attribut och reparationsärende när filen
+#   sparas. Senaste giltiga plan behålls tills filen är giltig igen.
+#
+# Version: 0.9.4
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: läsning, parsning, validering och kompilering av åtgärdsfiler
+#   flyttad från sensor.py. Planer cachas per innehålls-hash och delas mellan
+#   detektorer; varje detektor håller sin kompilerade Script tills filen ändras.
+
+"""Förkompilerade åtgärdsplaner för KNX Dubbelklicksdetektor."""
+import asyncio
+import copy
+import hashlib
+import logging
+import os
+from typing import Any, Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+from weakref import WeakValueDictionary
+
+import voluptuous as vol
+import yaml
+from homeassistant.core import Context, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError, TemplateError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers import template
+from homeassistant.helpers.script import Script, async_validate_actions_config
+
+from .batcher import async_get_service_batcher
+from .const import (
+    ACTIONS_FILE_SUFFIX,
+    DATA_ACTION_PLANS,
+    DATA_ACTIONS_LOADER,
+    DEFAULT_SCRIPT_MAX_RUNS,
+    DEFAULT_SCRIPT_MODE,
+    DIRECT_CALL_ACTION_KEYS,
+    DOMAIN,
+    EXECUTION_MODE_CONCURRENT,
+    EXECUTION_MODE_NON_BLOCKING,
+    ISSUE_INVALID_ACTIONS_FILE,
+    SCRIPT_MODE_QUEUED,
+    SCRIPT_MODE_RESTART,
+    SCRIPT_MODE_SINGLE,
+)
+from .detector import GESTURE_DOUBLE, gesture_clicks
+from .profiler import SCOPE_LOAD, async_add_executor_job, async_get_profiler
+
+_LOGGER = logging.getLogger(__name__)
+
+# (st_mtime_ns, st_size) för en åtgärdsfil
+FileStamp = Tuple[int, int]
+# (domän, tjänst, data) för ett direkt serviceanrop
+ServiceCallSpec = Tuple[str, str, Dict[str, Any]]
+# Värde (None för filens gemensamma sektioner) -> gest -> råa åtgärder
+ParsedSections = Dict[Optional[int], Dict[str, List[Dict[str, Any]]]]
+
+# Sektion med åtgärder för ett visst värde: value_1, value_17 ...
+VALUE_SECTION_PREFIX = "value_"
+
+
+class InvalidActionsFile(HomeAssistantError):
+    """Åtgärdsfilen kunde inte parsas eller valideras."""
+
+
+class PreparedActionsFile(NamedTuple):
+    """En åtgärdsfil som lästs och parsats i ett batchjobb."""
+
+    # Som _read_actions_file: (stämpel, innehåll, sha256), None om filen saknas eller inte gick att läsa
+    result: Optional[Tuple["FileStamp", str, str]]
+    # Åtgärder per gest från _parse_actions_yaml; None om filen saknar åtgärder eller inte parsats
+    sections: Optional[ParsedSections]
+    # Sant om parsningen redan gjorts (planen fanns annars redan i cachen)
+    parsed: bool
+    # Läs- eller parsefel
+    error: Optional[str]
+
+
+class DirectCall:
+    """Ett förkompilerat serviceanrop för direktvägen."""
+
+    __slots__ = ("data", "domain", "has_templates", "service")
+
+    def __init__(self, domain: str, service: str, data: Dict[str, Any], has_templates: bool) -> None:
+        self.domain = domain
+        self.service = service
+        # Sammanslagen data + target + entity_id, med Template-objekt där mallar finns
+        self.data = data
+        self.has_templates = has_templates
+
+    def render(self, variables: Dict[str, Any]) -> ServiceCallSpec:
+        """Bygger anropet för ett klick. Endast mallarna renderas."""
+        if not self.has_templates:
+            return self.domain, self.service, dict(self.data)
+        return self.domain, self.service, template.render_complex(self.data, variables)
+
+
+class ActionPlan:
+    """Parsade och validerade åtgärder för ett visst filinnehåll.
+
+    Planen beror bara på filens innehåll och kan därför delas mellan
+    detektorer vars filer är identiska.
+    """
+
+    def __init__(
+        self,
+        content_hash: str,
+        parsed_actions: List[Dict[str, Any]],
+        validated_actions: List[Dict[str, Any]],
+        direct_calls: Optional[List[DirectCall]],
+    ) -> None:
+        self.content_hash = content_hash
+        # Råa dicts från YAML
+        self.parsed_actions = parsed_actions
+        # Validerad sekvens för Script-hjälparen
+        self.validated_actions = validated_actions
+        # Förkompilerade anrop om alla åtgärder är enkla serviceanrop, annars None
+        self.direct_calls = direct_calls
+
+
+def _click_counts(gestures: Dict[str, Any]) -> FrozenSet[int]:
+    """Antal klick för varje klickgest (håll räknas inte)."""
+    return frozenset(clicks for clicks in map(gesture_clicks, gestures) if clicks)
+
+
+class ActionFilePlan:
+    """Planer per gest (och eventuellt per värde) för ett visst filinnehåll."""
+
+    def __init__(
+        self,
+        content_hash: str,
+        gestures: Dict[str, ActionPlan],
+        value_gestures: Optional[Dict[int, Dict[str, ActionPlan]]] = None,
+    ) -> None:
+        self.content_hash = content_hash
+        # Gemensamma sektioner, för värden utan egen value_N-sektion
+        self.gestures = gestures
+        self.value_gestures = value_gestures or {}
+        self.click_counts = _click_counts(gestures)
+
+    @property
+    def max_clicks(self) -> int:
+        """Högsta konfigurerade antal klick, 0 om bara håll finns."""
+        return max(self.click_counts, default=0)
+
+    def gestures_for(self, value: Optional[int]) -> Dict[str, ActionPlan]:
+        return self.value_gestures.get(value, self.gestures)
+
+    def click_counts_for(self, value: Optional[int]) -> FrozenSet[int]:
+        if value in self.value_gestures:
+            return _click_counts(self.value_gestures[value])
+        return self.click_counts
+
+    def get(self, gesture: str, value: Optional[int] = None) -> Optional[ActionPlan]:
+        return self.value_gestures.get(value, self.gestures).get(gesture)
+
+    def plans(self) -> List[Tuple[Optional[int], str, ActionPlan]]:
+        """Alla planer som (värde eller None, gest, plan)."""
+        return [(None, gesture, plan) for gesture, plan in self.gestures.items()] + [
+            (value, gesture, plan)
+            for value, gestures in self.value_gestures.items()
+            for gesture, plan in gestures.items()
+        ]
+
+
+def _service_key(action: Dict[str, Any]) -> Optional[str]:
+    """Nyckeln för tjänsten: 'action' (nuvarande HA-syntax) eller 'service' (äldre)."""
+    if "action" in action:
+        return "action"
+    if "service" in action:
+        return "service"
+    return None
+
+
+def _compile_templates(hass: HomeAssistant, value: Any) -> Tuple[Any, bool]:
+    """Ersätter mallsträngar med förparsade Template-objekt. Returnerar (värde, har_mallar)."""
+    if isinstance(value, str):
+        if not template.is_template_string(value):
+            return value, False
+        tpl = template.Template(value, hass)
+        try:
+            tpl.ensure_valid()
+        except TemplateError as e:
+            raise InvalidActionsFile(f"Ogiltig mall '{value}': {e}") from e
+        return tpl, True
+    if isinstance(value, list):
+        items = [_compile_templates(hass, item) for item in value]
+        return [item for item, _ in items], any(has for _, has in items)
+    if isinstance(value, dict):
+        compiled: Dict[Any, Any] = {}
+        has_templates = False
+        for key, item in value.items():
+            compiled[key], item_has = _compile_templates(hass, item)
+            has_templates = has_templates or item_has
+        return compiled, has_templates
+    return value, False
+
+
+def _compile_direct_call(hass: HomeAssistant, action: Any) -> Optional[DirectCall]:
+    """Kompilerar en åtgärd till ett DirectCall, None om den kräver Script-hjälparen."""
+    if not isinstance(action, dict) or not set(action) <= DIRECT_CALL_ACTION_KEYS:
+        return None
+    service_key = _service_key(action)
+    if service_key is None:
+        return None
+    service_call_str = str(action[service_key])
+    if template.is_template_string(service_call_str):
+        # Dynamiskt tjänstenamn kan inte delas upp i förväg
+        return None
+    domain, _, service_name = service_call_str.partition(".")
+    if not domain or not service_name:
+        raise InvalidActionsFile(f"Ogiltigt tjänstenamn '{service_call_str}', förväntade 'domän.tjänst'.")
+
+    service_data = dict(action.get("data") or {})
+    target_data = action.get("target") or {}
+    if isinstance(target_data, dict):
+        service_data.update(target_data)
+    elif isinstance(target_data, str) and "entity_id" not in service_data:
+        service_data["entity_id"] = target_data
+    if "entity_id" in action and "entity_id" not in service_data:
+        service_data["entity_id"] = action["entity_id"]
+
+    compiled_data, has_templates = _compile_templates(hass, service_data)
+    return DirectCall(domain, service_name, compiled_data, has_templates)
+
+
+@callback
+def _compile_direct_calls(
+    hass: HomeAssistant, parsed_actions: List[Dict[str, Any]]
+) -> Optional[List[DirectCall]]:
+    """Kompilerar hela listan, None om någon åtgärd kräver Script-hjälparen."""
+    direct_calls: List[DirectCall] = []
+    for action in parsed_actions:
+        if isinstance(action, dict) and action.get("enabled") is False:
+            continue
+        direct_call = _compile_direct_call(hass, action)
+        if direct_call is None:
+            return None
+        direct_calls.append(direct_call)
+
+    missing = sorted(
+        {f"{call.domain}.{call.service}" for call in direct_calls
+         if not hass.services.has_service(call.domain, call.service)}
+    )
+    if missing:
+        # Inte ett fel: tjänsten kan registreras senare under uppstarten
+        _LOGGER.warning("Tjänster som ännu inte finns i Home Assistant: %s", ", ".join(missing))
+    return direct_calls
+
+
+async def async_call_services(
+    hass: HomeAssistant,
+    calls: List[ServiceCallSpec],
+    execution_mode: str,
+    timeout: float,
+    context: Context,
+    batch_window: float = 0.0,
+) -> List[Tuple[int, BaseException]]:
+    """Kör direkta serviceanrop enligt exekveringsläget.
+
+    Returnerar (index, fel) för alla anrop som misslyckades. I sekventiellt
+    läge avbryts körningen vid första felet, i övriga lägen körs alla anrop.
+    Med batch_window > 0 slås anropen ihop med likadana anrop från andra
+    detektorer inom fönstret (ServiceCallBatcher).
+    """
+    errors: List[Tuple[int, BaseException]] = []
+
+    if batch_window > 0:
+        batcher = async_get_service_batcher(hass)
+
+        async def _async_service_call(
+            domain: str, service_name: str, service_data: Dict[str, Any], blocking: bool
+        ) -> None:
+            await batcher.async_call(domain, service_name, service_data, batch_window, blocking, context)
+    else:
+
+        async def _async_service_call(
+            domain: str, service_name: str, service_data: Dict[str, Any], blocking: bool
+        ) -> None:
+            await hass.services.async_call(domain, service_name, service_data, blocking=blocking, context=context)
+
+    if execution_mode == EXECUTION_MODE_NON_BLOCKING:
+        # Tjänsterna körs som egna tasks i HA; här fångas bara t.ex. okänd tjänst eller schemafel
+        for i, (domain, service_name, service_data) in enumerate(calls):
+            try:
+                await _async_service_call(domain, service_name, service_data, False)
+            except Exception as e:
+                _LOGGER.debug("Serviceanrop %s.%s misslyckades.", domain, service_name, exc_info=True)
+                errors.append((i, e))
+        return errors
+
+    async def _async_call(domain: str, service_name: str, service_data: Dict[str, Any]) -> None:
+        async with asyncio.timeout(timeout):
+            await _async_service_call(domain, service_name, service_data, True)
+
+    if execution_mode == EXECUTION_MODE_CONCURRENT:
+        # Total tid blir det långsammaste anropet i stället för summan
+        results = await asyncio.gather(
+            *(_async_call(*call) for call in calls), return_exceptions=True
+        )
+        return [(i, result) for i, result in enumerate(results) if isinstance(result, BaseException)]
+
+    for i, call in enumerate(calls):
+        try:
+            await _async_call(*call)
+        except Exception as e:
+            _LOGGER.debug("Serviceanrop %s.%s misslyckades.", call[0], call[1], exc_info=True)
+            errors.append((i, e))
+            break
+    return errors
+
+
+def _stat_actions_file(path: str) -> Optional[FileStamp]:
+    """Körs i executor. Returnerar filens stämpel eller None om den saknas."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _read_actions_file(path: str) -> Optional[Tuple[FileStamp, str, str]]:
+    """Körs i executor. Returnerar (stämpel, innehåll, sha256) eller None om filen saknas."""
+    stamp = _stat_actions_file(path)
+    if stamp is None:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    return stamp, content, hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _validate_section(gesture: str, actions: Any) -> List[Dict[str, Any]]:
+    if not isinstance(actions, list):
+        raise InvalidActionsFile(f"Sektionen '{gesture}' är inte en YAML-lista.")
+    try:
+        # Schemat skriver om nycklar på plats (service -> action), råa dicts behålls orörda
+        cv.SCRIPT_SCHEMA(copy.deepcopy(actions))
+    except vol.Invalid as e:
+        raise InvalidActionsFile(f"Ogiltig åtgärd i '{gesture}': {e}") from e
+    return actions
+
+
+def _section_value(name: str) -> Optional[int]:
+    """Värdet i en sektion value_N, annars None."""
+    if name.startswith(VALUE_SECTION_PREFIX):
+        suffix = name[len(VALUE_SECTION_PREFIX):]
+        if suffix.isdigit():
+            return int(suffix)
+    return None
+
+
+def _parse_gesture_sections(parsed: Any, prefix: str = "") -> Dict[str, List[Dict[str, Any]]]:
+    """En lista (double) eller sektioner per gest."""
+    if isinstance(parsed, list):
+        parsed = {GESTURE_DOUBLE: parsed}
+    if not isinstance(parsed, dict):
+        raise InvalidActionsFile(f"{prefix or 'Innehållet'} är varken en YAML-lista eller sektioner per gest.")
+    sections: Dict[str, List[Dict[str, Any]]] = {}
+    for gesture, actions in parsed.items():
+        gesture = str(gesture)
+        if gesture_clicks(gesture) is None:
+            raise InvalidActionsFile(
+                f"Okänd sektion '{prefix}{gesture}', förväntade single, double, triple, click_N, hold eller value_N."
+            )
+        if not actions:
+            continue
+        sections[gesture] = _validate_section(f"{prefix}{gesture}", actions)
+    return sections
+
+
+def _parse_actions_yaml(content: str) -> Optional[ParsedSections]:
+    """Körs i executor. Parsar och schemakontrollerar filinnehållet.
+
+    Returnerar åtgärder per värde och gest (värdet None för de gemensamma
+    sektionerna), eller None om filen inte innehåller några åtgärder. En
+    lista på toppnivå gäller double. Kastar InvalidActionsFile om innehållet
+    är ogiltigt.
+    """
+    if not content.strip():
+        return None
+    try:
+        parsed = yaml.safe_load(content)
+    except yaml.YAMLError as e:
+        raise InvalidActionsFile(f"Ogiltig YAML: {e}") from e
+    if parsed is None:
+        return None
+    if isinstance(parsed, dict):
+        value_keys = [key for key in parsed if _section_value(str(key)) is not None]
+    else:
+        value_keys = []
+
+    sections: ParsedSections = {}
+    for key in value_keys:
+        if gestures := _parse_gesture_sections(parsed.pop(key) or {}, f"{key}."):
+            sections[_section_value(str(key))] = gestures
+    if gestures := _parse_gesture_sections(parsed):
+        sections[None] = gestures
+    return sections or None
+
+
+@callback
+def _plan_cache(hass: HomeAssistant) -> "WeakValueDictionary[str, ActionPlan]":
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    cache = domain_data.get(DATA_ACTION_PLANS)
+    if cache is None:
+        cache = domain_data[DATA_ACTION_PLANS] = WeakValueDictionary()
+    return cache
+
+
+async def async_get_action_plan(
+    hass: HomeAssistant, content: str, content_hash: str
+) -> Optional[ActionFilePlan]:
+    """Returnerar en (delad) plan för filinnehållet, bygger den vid behov.
+
+    Kastar InvalidActionsFile om innehållet inte går att parsa eller validera.
+    """
+    file_plan = _plan_cache(hass).get(content_hash)
+    if file_plan is not None:
+        return file_plan
+
+    sections = await async_add_executor_job(hass, _parse_actions_yaml, content)
+    return await async_build_action_plan(hass, content_hash, sections)
+
+
+async def async_build_action_plan(
+    hass: HomeAssistant, content_hash: str, sections: Optional[ParsedSections]
+) -> Optional[ActionFilePlan]:
+    """Som async_get_action_plan, men för ett innehåll som redan parsats i executor."""
+    cache = _plan_cache(hass)
+    file_plan = cache.get(content_hash)
+    if file_plan is not None:
+        return file_plan
+    if sections is None:
+        return None
+    plans: Dict[Optional[int], Dict[str, ActionPlan]] = {}
+    for value, gesture_sections in sections.items():
+        prefix = "" if value is None else f"{VALUE_SECTION_PREFIX}{value}."
+        gestures = plans[value] = {}
+        for gesture, parsed_actions in gesture_sections.items():
+            try:
+                validated_actions = await async_validate_actions_config(
+                    hass, cv.SCRIPT_SCHEMA(copy.deepcopy(parsed_actions))
+                )
+            except (vol.Invalid, HomeAssistantError) as e:
+                raise InvalidActionsFile(f"Ogiltig åtgärd i '{prefix}{gesture}': {e}") from e
+            direct_calls = _compile_direct_calls(hass, parsed_actions)
+            gestures[gesture] = ActionPlan(content_hash, parsed_actions, validated_actions, direct_calls)
+
+    default_gestures = plans.pop(None, {})
+    file_plan = ActionFilePlan(content_hash, default_gestures, plans)
+    cache[content_hash] = file_plan
+    return file_plan
+
+
+def _prepare_actions_files(
+    directory: str, default_contents: Dict[str, str], known_hashes: FrozenSet[str]
+) -> Dict[str, PreparedActionsFile]:
+    """Körs i executor. Förbereder många åtgärdsfiler i ett svep.
+
+    Katalogen skapas vid behov och listas med ett enda scandir. Filer som
+    saknas skrivs med sitt standardinnehåll, därefter läses alla filer och
+    innehåll som inte redan finns i plancachen parsas (en gång per hash).
+    """
+    os.makedirs(directory, exist_ok=True)
+    with os.scandir(directory) as entries:
+        existing = {
+            os.path.normpath(entry.path)
+            for entry in entries
+            if entry.name.endswith(ACTIONS_FILE_SUFFIX) and entry.is_file()
+        }
+
+    prepared: Dict[str, PreparedActionsFile] = {}
+    parsed_by_hash: Dict[str, Tuple[Optional[ParsedSections], Optional[str]]] = {}
+    for path, default_content in default_contents.items():
+        if os.path.normpath(path) not in existing:
+            _LOGGER.info("Åtgärdsfil %s saknas, skapar med standardinnehåll och identifierande header.", path)
+            try:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(default_content)
+            except OSError as e:
+                _LOGGER.error("Kunde inte skapa standard åtgärdsfil %s: %s", path, e)
+        try:
+            result = _read_actions_file(path)
+        except OSError as e:
+            prepared[path] = PreparedActionsFile(None, None, True, f"Kunde inte läsa filen: {e}")
+            continue
+        if result is None or result[2] in known_hashes:
+            prepared[path] = PreparedActionsFile(result, None, False, None)
+            continue
+        content_hash = result[2]
+        if content_hash not in parsed_by_hash:
+            try:
+                parsed_by_hash[content_hash] = (_parse_actions_yaml(result[1]), None)
+            except InvalidActionsFile as e:
+                parsed_by_hash[content_hash] = (None, str(e))
+        sections, error = parsed_by_hash[content_hash]
+        prepared[path] = PreparedActionsFile(result, sections, True, error)
+    return prepared
+
+
+class ActionFilesLoader:
+    """Samlar förfrågningar om åtgärdsfiler och förbereder dem i gemensamma executor-jobb.
+
+    Förfrågningar som görs innan nästa varv i event-loopen, eller medan ett
+    jobb pågår, hamnar i samma batch. Vid start med många detektorer blir det
+    därför en handfull katalogsvep i stället för flera executor-anrop per fil.
+    """
+
+    def __init__(self, hass: HomeAssistant, directory: str) -> None:
+        self.hass = hass
+        self.directory = directory
+        # Sökväg -> standardinnehåll för nästa batch
+        self._pending: Dict[str, str] = {}
+        self._pending_future: Optional["asyncio.Future[Dict[str, PreparedActionsFile]]"] = None
+        self._running = False
+
+    async def async_prepare(self, default_contents: Dict[str, str]) -> Dict[str, PreparedActionsFile]:
+        """Förbereder filerna (sökväg -> standardinnehåll om filen saknas).
+
+        Kastar OSError om katalogen inte kan skapas eller listas. Fel för en
+        enskild fil rapporteras i dess PreparedActionsFile.
+        """
+        if not default_contents:
+            return {}
+        self._pending.update(default_contents)
+        if self._pending_future is None:
+            self._pending_future = self.hass.loop.create_future()
+            if not self._running:
+                self._async_schedule_batch()
+        prepared = await asyncio.shield(self._pending_future)
+        return {path: prepared[path] for path in default_contents}
+
+    @callback
+    def _async_schedule_batch(self) -> None:
+        self.hass.async_create_task(self._async_run_batch(), "knx_doubleclick actions batch", eager_start=False)
+
+    async def _async_run_batch(self) -> None:
+        default_contents, self._pending = self._pending, {}
+        future, self._pending_future = self._pending_future, None
+        self._running = True
+        try:
+            prepared = await async_add_executor_job(
+                self.hass,
+                _prepare_actions_files, self.directory, default_contents, frozenset(_plan_cache(self.hass).keys())
+            )
+        except OSError as e:
+            # Väntande detektorer får felet i stället för att hänga kvar
+            future.set_exception(e)
+        except Exception as e:
+            _LOGGER.exception("Oväntat fel när åtgärdsfiler förbereddes i %s", self.directory)
+            future.set_exception(e)
+        else:
+            future.set_result(prepared)
+            _LOGGER.debug("Förberedde %d åtgärdsfiler i ett svep.", len(prepared))
+        finally:
+            self._running = False
+            if not future.done():
+                # Batchen avbröts: väntande detektorer avbryts också
+                future.cancel()
+            # Förfrågningar som kom under jobbet körs i nästa batch
+            if self._pending_future is not None:
+                self._async_schedule_batch()
+
+
+@callback
+def async_get_actions_loader(hass: HomeAssistant, directory: str) -> ActionFilesLoader:
+    """Integrationens gemensamma ActionFilesLoader."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    loader: Optional[ActionFilesLoader] = domain_data.get(DATA_ACTIONS_LOADER)
+    if loader is None:
+        loader = domain_data[DATA_ACTIONS_LOADER] = ActionFilesLoader(hass, directory)
+    return loader
+
+
+class DetectorActions:
+    """En detektors cachade åtgärdsplan och kompilerade Script per gest.
+
+    Läses in vid start och därefter bara när katalogbevakaren rapporterar
+    att filen ändrats. Klickvägen läser enbart plan och scripts.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: str,
+        name: str,
+        update_callback: Optional[Callable[[], None]] = None,
+        script_mode: str = DEFAULT_SCRIPT_MODE,
+        max_runs: int = DEFAULT_SCRIPT_MAX_RUNS,
+    ) -> None:
+        self.hass = hass
+        self.path = path
+        self.name = name
+        self.plan: Optional[ActionFilePlan] = None
+        # Plan -> Script, bara för planer vars åtgärder kräver Script-hjälparen
+        self.scripts: Dict[ActionPlan, Script] = {}
+        # Utbytta Script med körningar som får slutföras; stoppas med async_stop
+        self._retired_scripts: List[Script] = []
+        self.script_mode = script_mode
+        self.max_runs = max_runs
+        # Körningar som körläget avvisat respektive ställt i kö
+        self.runs_rejected = 0
+        self.runs_queued = 0
+        # Senaste parse-/valideringsfel, None när filen är giltig
+        self.error: Optional[str] = None
+        self._update_callback = update_callback
+        self._content_hash: Optional[str] = None
+        self._issue_id = f"{ISSUE_INVALID_ACTIONS_FILE}_{os.path.basename(path)}"
+
+    async def async_load(self, prepared: Optional[PreparedActionsFile] = None) -> Optional[ActionFilePlan]:
+        """Läser in filen och byter in en ny plan om innehållet ändrats.
+
+        Med prepared (från ActionFilesLoader) används den redan lästa och
+        parsade filen i stället för en egen läsning.
+        """
+        if (profiler := async_get_profiler(self.hass)) is not None:
+            return await profiler.async_run_coroutine(self._async_load(prepared), SCOPE_LOAD)
+        return await self._async_load(prepared)
+
+    async def _async_load(self, prepared: Optional[PreparedActionsFile]) -> Optional[ActionFilePlan]:
+        if prepared is None:
+            try:
+                result = await async_add_executor_job(self.hass, _read_actions_file, self.path)
+            except OSError as e:
+                self._async_set_error(f"Kunde inte läsa filen: {e}")
+                return self.plan
+        elif prepared.result is None and prepared.error is not None:
+            self._async_set_error(prepared.error)
+            return self.plan
+        else:
+            result = prepared.result
+        if result is None:
+            if self.plan is not None:
+                _LOGGER.warning("Åtgärdsfilen %s för %s hittades inte.", self.path, self.name)
+            self._content_hash = None
+            self._async_set_plan(None)
+            self._async_set_error(None)
+            return None
+
+        _stamp, content, content_hash = result
+        if content_hash == self._content_hash:
+            return self.plan
+
+        try:
+            if prepared is not None and prepared.parsed:
+                if prepared.error is not None:
+                    raise InvalidActionsFile(prepared.error)
+                plan = await async_build_action_plan(self.hass, content_hash, prepared.sections)
+            else:
+                plan = await async_get_action_plan(self.hass, content, content_hash)
+        except InvalidActionsFile as e:
+            # Senaste giltiga plan behålls, felet visas direkt när filen sparas
+            self._content_hash = content_hash
+            self._async_set_error(str(e))
+            return self.plan
+
+        self._content_hash = content_hash
+        self._async_set_plan(plan)
+        self._async_set_error(None)
+        if plan is None:
+            _LOGGER.info("Inga åtgärder att utföra från fil %s för %s (tom eller enbart kommentarer).", self.path, self.name)
+        else:
+            _LOGGER.debug(
+                "Åtgärdsplan för %s laddad från %s. Gester: %s",
+                self.name, self.path,
+                ", ".join(gesture if value is None else f"{VALUE_SECTION_PREFIX}{value}.{gesture}"
+                          for value, gesture, _plan in plan.plans()),
+            )
+        return plan
+
+    @callback
+    def async_unload(self) -> None:
+        """Tar bort ett eventuellt reparationsärende när detektorn tas bort."""
+        ir.async_delete_issue(self.hass, DOMAIN, self._issue_id)
+
+    async def async_stop(self) -> None:
+        """Stoppar pågående och köade Script-körningar, även i utbytta Script."""
+        scripts = [*self.scripts.values(), *self._retired_scripts]
+        self._retired_scripts = []
+        for script in scripts:
+            if script.is_running:
+                await script.async_stop()
+
+    @callback
+    def async_set_script_mode(self, script_mode: str, max_runs: int) -> None:
+        """Byter körläge. Scriptet byggs om; pågående körningar får slutföras."""
+        if script_mode == self.script_mode and max_runs == self.max_runs:
+            return
+        self.script_mode = script_mode
+        self.max_runs = max_runs
+        if self.plan is not None:
+            self._async_retire_scripts()
+            self.scripts = self._compile_scripts(self.plan)
+
+    async def async_run(self, plan: ActionPlan, variables: Dict[str, Any], context: Context) -> bool:
+        """Kör planen via dess Script. Returnerar False om körläget avvisade körningen."""
+        script = self.scripts.get(plan)
+        if script is None:
+            return False
+        # Samma regler som Script.async_run, men räknade i stället för bara loggade
+        if script.is_running and script.script_mode != SCRIPT_MODE_RESTART:
+            if script.script_mode == SCRIPT_MODE_SINGLE or script.runs >= script.max_runs:
+                self.runs_rejected += 1
+                _LOGGER.info(
+                    "Skriptet för %s körs redan (läge: %s, körningar: %d), körningen avvisas.",
+                    self.name, script.script_mode, script.runs
+                )
+                return False
+            if script.script_mode == SCRIPT_MODE_QUEUED:
+                self.runs_queued += 1
+        await script.async_run(run_variables=variables, context=context)
+        return True
+
+    @callback
+    def _async_set_plan(self, plan: Optional[ActionFilePlan]) -> None:
+        if plan is self.plan:
+            return
+        # Planen och dess Script byts in tillsammans, klickvägen ser aldrig en halv uppdatering
+        scripts = self._compile_scripts(plan) if plan is not None else {}
+        self._async_retire_scripts()
+        self.plan, self.scripts = plan, scripts
+        if self._update_callback is not None:
+            self._update_callback()
+
+    @callback
+    def _async_retire_scripts(self) -> None:
+        """Behåller de Script som ska bytas ut så länge de kör, så att async_stop når dem."""
+        self._retired_scripts = [
+            script for script in (*self._retired_scripts, *self.scripts.values()) if script.is_running
+        ]
+
+    @callback
+    def _async_set_error(self, error: Optional[str]) -> None:
+        if error == self.error:
+            return
+        self.error = error
+        if error is None:
+            ir.async_delete_issue(self.hass, DOMAIN, self._issue_id)
+        else:
+            _LOGGER.error("Åtgärdsfil %s för %s är ogiltig: %s", self.path, self.name, error)
+            ir.async_create_issue(
+                self.hass,
+                DOMAIN,
+                self._issue_id,
+                is_fixable=False,
+                severity=ir.IssueSeverity.ERROR,
+                translation_key=ISSUE_INVALID_ACTIONS_FILE,
+                translation_placeholders={
+                    "name": self.name,
+                    "path": self.path,
+                    "error": error,
+                },
+            )
+        if self._update_callback is not None:
+            self._update_callback()
+
+    def _compile_scripts(self, file_plan: ActionFilePlan) -> Dict[ActionPlan, Script]:
+        scripts: Dict[ActionPlan, Script] = {}
+        for value, gesture, plan in file_plan.plans():
+            if plan.direct_calls is not None:
+                continue
+            label = gesture if value is None else f"{gesture} ({VALUE_SECTION_PREFIX}{value})"
+            script = self._compile_script(label, plan)
+            if script is not None:
+                scripts[plan] = script
+        return scripts
+
+    def _compile_script(self, gesture: str, plan: ActionPlan) -> Optional[Script]:
+        try:
+            script_runner = Script(
+                self.hass,
+                plan.validated_actions,
+                f"{self.name} {gesture} Åtgärd (från fil)",
+                DOMAIN,
+                script_mode=self.script_mode,
+                max_runs=self.max_runs,
+                max_exceeded="SILENT",
+                logger=_LOGGER,
+            )
+            _LOGGER.debug("Åtgärder för %s (%s) kompilerade. Antal åtgärder: %d", self.name, gesture, len(plan.validated_actions))
+            return script_runner
+        except Exception as e:
+            _LOGGER.error("Oväntat fel vid kompilering av skript för %s (%s) från parsade åtgärder: %s", self.name, gesture, e, exc_info=True)
+        return None
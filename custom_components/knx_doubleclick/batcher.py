@@ -0,0 +1,213 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Batchens future löses via en done-callback på körningen, så att väntande
+#   anrop avbryts i stället för att hänga när körningen avbryts.
+# - Icke-blockerande anrop läggs i batchen och returnerar direkt i stället
+#   för att vänta tills fönstret stängts; fel från sådana batcher loggas.
+# - Importerna och _Batch.__slots__ sorterade (ruff I001, RUF023).
+#
+# Version: 0.9.24
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: valfri sammanslagning av direkta serviceanrop. Anrop till samma
+#   tjänst med samma data (utom entity_id) från olika detektorer inom ett
+#   kort fönster blir ett enda anrop med en gemensam entity_id-lista.
+
+"""Sammanslagning av serviceanrop för KNX Dubbelklicksdetektor."""
+import asyncio
+import logging
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from homeassistant.const import ATTR_ENTITY_ID, ENTITY_MATCH_ALL
+from homeassistant.core import Context, HomeAssistant, callback
+
+from .const import DATA_SERVICE_BATCHER, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# (domän, tjänst, blockerande, fryst data utan entity_id)
+BatchKey = Tuple[str, str, bool, Hashable]
+
+
+def _freeze(value: Any) -> Hashable:
+    """Hashbar form av tjänstedata; kastar TypeError för värden som inte går att jämföra."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(item) for item in value)
+    hash(value)
+    return value
+
+
+def _entity_ids(value: Any) -> Optional[List[str]]:
+    """entity_id som lista, eller None om anropet inte kan slås ihop på entiteter."""
+    if isinstance(value, str):
+        entity_ids = [part.strip() for part in value.split(",") if part.strip()]
+    elif isinstance(value, (list, tuple)) and all(isinstance(part, str) for part in value):
+        entity_ids = list(value)
+    else:
+        return None
+    if not entity_ids or ENTITY_MATCH_ALL in entity_ids:
+        return None
+    return entity_ids
+
+
+class _Batch:
+    """Anrop som väntar på att fönstret ska stängas."""
+
+    __slots__ = ("blocking", "calls", "context", "data", "domain", "entity_ids", "future", "service", "timer")
+
+    def __init__(
+        self, hass: HomeAssistant, domain: str, service: str, data: Dict[str, Any], blocking: bool, context: Context
+    ) -> None:
+        self.domain = domain
+        self.service = service
+        self.data = data
+        self.blocking = blocking
+        # Det första anropets kontext används för det sammanslagna anropet
+        self.context = context
+        # Ordnad och utan dubbletter; dict bevarar insättningsordningen
+        self.entity_ids: Dict[str, None] = {}
+        self.calls = 0
+        self.future: "asyncio.Future[None]" = hass.loop.create_future()
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class ServiceCallBatcher:
+    """Slår ihop likadana serviceanrop som kommer inom ett kort fönster.
+
+    Det första anropet öppnar en batch och bestämmer fönstret; anrop till
+    samma domän och tjänst, med samma blockering och samma data utom
+    entity_id, som kommer innan fönstret stängs läggs till i batchen. När
+    fönstret stängs görs ett enda anrop med alla entiteter, och alla som
+    väntar får dess resultat; icke-blockerande anrop väntar inte alls. Anrop
+    utan entity_id (t.ex. area_id eller device_id), med entity_id "all" eller
+    med data som inte går att jämföra körs direkt.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._batches: Dict[BatchKey, _Batch] = {}
+        # Anrop in, anrop som gick direkt och anrop som faktiskt gjordes för batcher
+        self.calls_received = 0
+        self.calls_direct = 0
+        self.batches_flushed = 0
+
+    async def async_call(
+        self,
+        domain: str,
+        service: str,
+        data: Dict[str, Any],
+        window: float,
+        blocking: bool,
+        context: Context,
+    ) -> None:
+        """Som hass.services.async_call, men slås ihop med likadana anrop inom window sekunder."""
+        self.calls_received += 1
+        entity_ids = _entity_ids(data.get(ATTR_ENTITY_ID))
+        key: Optional[BatchKey] = None
+        if entity_ids is not None:
+            shared_data = {name: value for name, value in data.items() if name != ATTR_ENTITY_ID}
+            try:
+                key = (domain, service, blocking, _freeze(shared_data))
+            except TypeError:
+                key = None
+        if key is None:
+            self.calls_direct += 1
+            await self.hass.services.async_call(domain, service, data, blocking=blocking, context=context)
+            return
+
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch(self.hass, domain, service, shared_data, blocking, context)
+            batch.timer = self.hass.loop.call_later(window, self._async_flush, key)
+        batch.calls += 1
+        batch.entity_ids.update(dict.fromkeys(entity_ids))
+        if not blocking:
+            # Som hass.services.async_call utan blocking: väntar inte på anropet, och alltså inte på fönstret
+            return
+        # En väntande som avbryts (t.ex. timeout) ska inte avbryta de andras anrop
+        await asyncio.shield(batch.future)
+
+    @callback
+    def _async_flush(self, key: BatchKey) -> None:
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+        self.batches_flushed += 1
+        task = self.hass.async_create_background_task(
+            self._async_execute(batch), f"knx_doubleclick batch {batch.domain}.{batch.service}"
+        )
+        task.add_done_callback(lambda task: self._async_resolve(batch, task))
+
+    async def _async_execute(self, batch: _Batch) -> None:
+        entity_ids = list(batch.entity_ids)
+        if batch.calls > 1:
+            _LOGGER.debug(
+                "Slår ihop %d anrop till %s.%s för %d entiteter.",
+                batch.calls, batch.domain, batch.service, len(entity_ids),
+            )
+        await self.hass.services.async_call(
+            batch.domain,
+            batch.service,
+            {**batch.data, ATTR_ENTITY_ID: entity_ids},
+            blocking=batch.blocking,
+            context=batch.context,
+        )
+
+    @staticmethod
+    @callback
+    def _async_resolve(batch: _Batch, task: "asyncio.Task[None]") -> None:
+        """För över körningens utfall, även avbrott, till alla som väntar på batchen."""
+        if batch.future.done():
+            return
+        if task.cancelled():
+            batch.future.cancel()
+            return
+        error = task.exception()
+        if error is None:
+            batch.future.set_result(None)
+            return
+        batch.future.set_exception(error)
+        # Hämtas så att asyncio inte varnar när ingen längre väntar (timeout)
+        batch.future.exception()
+        if not batch.blocking:
+            # Ingen väntar på icke-blockerande anrop; felet syns annars ingenstans
+            _LOGGER.warning(
+                "Sammanslaget anrop till %s.%s misslyckades: %s", batch.domain, batch.service, error
+            )
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Kör väntande batcher direkt i stället för att vänta ut fönstren."""
+        for key, batch in list(self._batches.items()):
+            if batch.timer is not None:
+                batch.timer.cancel()
+            self._async_flush(key)
+
+    @callback
+    def async_diagnostics(self) -> Dict[str, Any]:
+        return {
+            "calls_received": self.calls_received,
+            "calls_direct": self.calls_direct,
+            "batches_flushed": self.batches_flushed,
+            # Anrop som inte blev egna serviceanrop tack vare sammanslagningen
+            "calls_saved": self.calls_received - self.calls_direct - self.batches_flushed - len(self._batches),
+            "pending_batches": len(self._batches),
+        }
+
+
+@callback
+def async_get_service_batcher(hass: HomeAssistant) -> ServiceCallBatcher:
+    """Integrationens gemensamma ServiceCallBatcher."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    batcher: Optional[ServiceCallBatcher] = domain_data.get(DATA_SERVICE_BATCHER)
+    if batcher is None:
+        batcher = domain_data[DATA_SERVICE_BATCHER] = ServiceCallBatcher(hass)
+    return batcher
@@ -1,4 +1,77 @@
 # knx_doubleclick/config_flow.py
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Ändringar:
+# - Gruppadressen kontrolleras (parse_group_address) i samma validering som
+#   värdena. Hubbens knappar (lägg till, ändra och import) använder den
+#   valideringen med hubbens datapunktstyp, liksom flödet för en enskild knapp.
+#
+# Version: 0.9.25
+# Datum: 2026-10-18
+# Ändringar:
+# - Nya fält för inlärt fönster (automatiskt läge och gränser). Minsta
+#   fönstret får inte vara större än största.
+#
+# Version: 0.9.24
+# Datum: 2026-10-18
+# Ändringar:
+# - Nytt fält för sammanslagning av serviceanrop (0 = av).
+#
+# Version: 0.9.20
+# Datum: 2026-10-18
+# Ändringar:
+# - Nytt fält för dubblettfönstret (0 = av).
+#
+# Version: 0.9.19
+# Datum: 2026-10-18
+# Ändringar:
+# - Nya fält för datapunktstyp och ytterligare värden ("2, 3"). Värdena
+#   kontrolleras mot datapunktstypens tillåtna intervall.
+#
+# Version: 0.9.16
+# Datum: 2026-10-18
+# Ändringar:
+# - Nytt flöde för en hubb: en entry med en tabell av knappar som kan
+#   importeras från CSV eller ETS-export. Startsteget är en meny (en knapp
+#   eller en hubb); options för en hubb har steg för gemensamma inställningar
+#   och för att lägga till, ändra, importera och ta bort knappar.
+# - Options-schemat byggs av _detector_options_schema och delas av båda lägena.
+#
+# Version: 0.9.13
+# Datum: 2026-10-18
+# Ändringar:
+# - Nya fält för skrivintervall och uppdatering av tillståndet endast vid gester.
+#
+# Version: 0.9.12
+# Datum: 2026-10-18
+# Ändringar:
+# - Nytt fält för samplingsgrad i spårbufferten.
+#
+# Version: 0.9.10
+# Datum: 2026-10-18
+# Ändringar:
+# - Nya fält för släppvärde (valfritt) och hålltid för gesten hold.
+#
+# Version: 0.9.9
+# Datum: 2026-10-18
+# Ändringar:
+# - Nya fält för Scriptets körläge och max_runs.
+#
+# Version: 0.9.8
+# Datum: 2026-10-18
+# Ändringar:
+# - Nya fält för överlappspolicy och ködjup för åtgärdskörningar.
+#
+# Version: 0.9.6
+# Datum: 2026-10-18
+# Ändringar:
+# - Nya fält för exekveringsläge och timeout per serviceanrop.
+#
+# Version: 0.9.3
+# Datum: 2026-10-18
+# Ändringar:
+# - Nytt fält för intagsläge (knx_event eller direkt xknx) i options-flödet.
+#
 # Version: 0.8.20
 # Datum: 2026-01-15
 # Ändringar:
@@ -7,12 +80,14 @@
 # - Tog bort steget edit_yaml_dialog helt.
 
 import logging
-from typing import Any, Dict, Optional
+import os
+from typing import Any, Dict, List, Optional, Tuple
 
 import voluptuous as vol
 from homeassistant import config_entries, core
 from homeassistant.core import callback
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
 
 from .const import (
     DOMAIN,
@@ -20,11 +95,62 @@ from .const import (
     CONF_KNX_GROUP_ADDRESS,
     CONF_KNX_VALUE,
     CONF_DOUBLE_CLICK_WINDOW_SECONDS,
+    CONF_INTAKE_MODE,
+    INTAKE_MODES,
+    CONF_EXECUTION_MODE,
+    EXECUTION_MODES,
+    CONF_SERVICE_CALL_TIMEOUT,
+    CONF_BATCH_WINDOW,
+    CONF_WINDOW_AUTO_TUNE,
+    CONF_WINDOW_MIN_SECONDS,
+    CONF_WINDOW_MAX_SECONDS,
+    DEFAULT_WINDOW_AUTO_TUNE,
+    DEFAULT_WINDOW_MIN_SECONDS,
+    DEFAULT_WINDOW_MAX_SECONDS,
+    DEFAULT_INTAKE_MODE,
+    DEFAULT_EXECUTION_MODE,
+    DEFAULT_SERVICE_CALL_TIMEOUT,
+    DEFAULT_BATCH_WINDOW,
+    CONF_OVERLAP_POLICY,
+    OVERLAP_POLICIES,
+    CONF_MAX_QUEUE_DEPTH,
+    DEFAULT_OVERLAP_POLICY,
+    DEFAULT_MAX_QUEUE_DEPTH,
+    CONF_SCRIPT_MODE,
+    SCRIPT_MODES,
+    CONF_SCRIPT_MAX_RUNS,
+    DEFAULT_SCRIPT_MODE,
+    DEFAULT_SCRIPT_MAX_RUNS,
+    CONF_KNX_RELEASE_VALUE,
+    CONF_HOLD_SECONDS,
+    DEFAULT_HOLD_SECONDS,
+    CONF_TRACE_SAMPLE_RATE,
+    DEFAULT_TRACE_SAMPLE_RATE,
+    CONF_STATE_WRITE_INTERVAL,
+    CONF_STATE_ON_GESTURE_ONLY,
+    DEFAULT_STATE_WRITE_INTERVAL,
+    DEFAULT_STATE_ON_GESTURE_ONLY,
     DEFAULT_KNX_VALUE,
     DEFAULT_DOUBLE_CLICK_WINDOW_SECONDS,
     DEFAULT_NAME_SUFFIX,
-    ACTIONS_DIR_BASENAME
+    ACTIONS_DIR_BASENAME,
+    CONF_ENTRY_TYPE,
+    ENTRY_TYPE_BUTTON,
+    ENTRY_TYPE_HUB,
+    CONF_BUTTONS,
+    CONF_BUTTON_ID,
+    CONF_ACTIONS_FILE,
+    CONF_IMPORT_TEXT,
+    CONF_IMPORT_PATH,
+    CONF_REMOVE_BUTTONS,
+    CONF_KNX_DPT,
+    CONF_KNX_ADDITIONAL_VALUES,
+    DEFAULT_KNX_DPT,
+    CONF_DEDUPE_WINDOW,
+    DEFAULT_DEDUPE_WINDOW,
 )
+from .detector import DPTS, dpt_value_range, parse_group_address
+from .importer import InvalidButtonImport, merge_buttons, new_button_id, parse_button_import
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,6 +162,249 @@ def _config_flow_get_actions_file_path(hass: core.HomeAssistant, entry: config_e
     filename = f"{s_name_suffix}--{entry.entry_id}.yaml"
     return hass.config.path(ACTIONS_DIR_BASENAME, filename)
 
+
+def _read_import_file(path: str, config_dir: str) -> str:
+    """Körs i executor. Läser en importfil; bara filer under konfigurationskatalogen."""
+    real_path = os.path.realpath(path)
+    if os.path.commonpath([real_path, os.path.realpath(config_dir)]) != os.path.realpath(config_dir):
+        raise PermissionError(path)
+    with open(real_path, encoding="utf-8-sig") as file:
+        return file.read()
+
+
+async def _async_import_buttons(
+    hass: core.HomeAssistant,
+    user_input: Dict[str, Any],
+    existing: List[Dict[str, Any]],
+    default_value: int,
+    dpt: str,
+    errors: Dict[str, str],
+) -> Optional[Tuple[List[Dict[str, Any]], int, int]]:
+    """Importerar knappar från inklistrad text eller en fil och slår ihop dem med existing.
+
+    Returnerar None och fyller i errors om importen inte gick att läsa eller
+    om någon rad har ett värde utanför datapunktstypens intervall.
+    """
+    text = user_input.get(CONF_IMPORT_TEXT) or ""
+    if import_path := (user_input.get(CONF_IMPORT_PATH) or "").strip():
+        try:
+            text = await hass.async_add_executor_job(
+                _read_import_file, hass.config.path(import_path), hass.config.config_dir
+            )
+        except PermissionError:
+            errors[CONF_IMPORT_PATH] = "import_path_not_allowed"
+            return None
+        except OSError:
+            errors[CONF_IMPORT_PATH] = "import_path_not_found"
+            return None
+    if not text.strip():
+        return list(existing), 0, 0
+    try:
+        result = parse_button_import(text, default_value)
+    except InvalidButtonImport as err:
+        _LOGGER.warning("Knappimporten kunde inte tolkas: %s", err)
+        errors["base"] = "invalid_import"
+        return None
+    invalid = [
+        f"{row[CONF_KNX_GROUP_ADDRESS]} ({row[CONF_KNX_VALUE]})"
+        for row in result.rows
+        if _button_errors(row, dpt)
+    ]
+    if invalid:
+        _LOGGER.warning("Knappimporten har värden utanför datapunktstypens intervall: %s", ", ".join(invalid))
+        errors["base"] = "import_value_out_of_range"
+        return None
+    buttons, added, updated = merge_buttons(existing, result.rows)
+    _LOGGER.info(
+        "Knappimport: %d nya, %d uppdaterade, %d rader överhoppade.", added, updated, result.skipped
+    )
+    return buttons, added, updated
+
+
+def _import_schema_fields() -> Dict[Any, Any]:
+    return {
+        vol.Optional(CONF_IMPORT_TEXT): TextSelector(TextSelectorConfig(multiline=True)),
+        vol.Optional(CONF_IMPORT_PATH): cv.string,
+    }
+
+
+def _button_label(row: Dict[str, Any]) -> str:
+    return f"{row.get(CONF_NAME_SUFFIX)} ({row.get(CONF_KNX_GROUP_ADDRESS)}, {row.get(CONF_KNX_VALUE)})"
+
+
+def _validate_detector_values(user_input: Dict[str, Any], errors: Dict[str, str]) -> None:
+    """Tolkar ytterligare värden till en lista och kontrollerar alla värden mot DPT:n.
+
+    Ändrar user_input på plats; en tom lista tas bort. Kontrollerar också
+    gruppadressens format och gränserna för det inlärda fönstret.
+    """
+    if CONF_KNX_GROUP_ADDRESS in user_input and parse_group_address(user_input[CONF_KNX_GROUP_ADDRESS]) is None:
+        errors[CONF_KNX_GROUP_ADDRESS] = "invalid_group_address"
+
+    if CONF_KNX_ADDITIONAL_VALUES in user_input:
+        raw_values = user_input.pop(CONF_KNX_ADDITIONAL_VALUES)
+        if isinstance(raw_values, str):
+            try:
+                values = [int(part) for part in raw_values.replace(";", ",").split(",") if part.strip()]
+            except ValueError:
+                user_input[CONF_KNX_ADDITIONAL_VALUES] = raw_values
+                errors[CONF_KNX_ADDITIONAL_VALUES] = "invalid_values"
+                return
+        else:
+            values = [int(value) for value in raw_values]
+        if values:
+            user_input[CONF_KNX_ADDITIONAL_VALUES] = values
+
+    low, high = dpt_value_range(user_input.get(CONF_KNX_DPT, DEFAULT_KNX_DPT)) or (0, None)
+    for key in (CONF_KNX_VALUE, CONF_KNX_RELEASE_VALUE, CONF_KNX_ADDITIONAL_VALUES):
+        if key not in user_input:
+            continue
+        values = user_input[key] if isinstance(user_input[key], list) else [user_input[key]]
+        if any(value < low or (high is not None and value > high) for value in values):
+            errors[key] = "value_out_of_range"
+
+    window_min = user_input.get(CONF_WINDOW_MIN_SECONDS, DEFAULT_WINDOW_MIN_SECONDS)
+    window_max = user_input.get(CONF_WINDOW_MAX_SECONDS, DEFAULT_WINDOW_MAX_SECONDS)
+    if window_min > window_max:
+        errors[CONF_WINDOW_MAX_SECONDS] = "invalid_window_bounds"
+
+
+def _button_errors(row: Dict[str, Any], dpt: str) -> Dict[str, str]:
+    """Fel för en knapprad i en hubb: gruppadress och värde mot hubbens DPT."""
+    errors: Dict[str, str] = {}
+    _validate_detector_values(
+        {
+            CONF_KNX_GROUP_ADDRESS: row[CONF_KNX_GROUP_ADDRESS],
+            CONF_KNX_VALUE: row[CONF_KNX_VALUE],
+            CONF_KNX_DPT: dpt,
+        },
+        errors,
+    )
+    return errors
+
+
+def _detector_options_schema(current_config: Dict[str, Any], include_address: bool = True) -> vol.Schema:
+    """Options för en detektor. Utan adressfälten används schemat för hubbens gemensamma inställningar."""
+    current_ga = current_config.get(CONF_KNX_GROUP_ADDRESS, "")
+    current_val = current_config.get(CONF_KNX_VALUE, DEFAULT_KNX_VALUE)
+    current_dpt = current_config.get(CONF_KNX_DPT, DEFAULT_KNX_DPT)
+    current_additional = current_config.get(CONF_KNX_ADDITIONAL_VALUES)
+    if isinstance(current_additional, list):
+        current_additional = ", ".join(str(value) for value in current_additional)
+    current_win = current_config.get(CONF_DOUBLE_CLICK_WINDOW_SECONDS, DEFAULT_DOUBLE_CLICK_WINDOW_SECONDS)
+    current_auto_tune = current_config.get(CONF_WINDOW_AUTO_TUNE, DEFAULT_WINDOW_AUTO_TUNE)
+    current_win_min = current_config.get(CONF_WINDOW_MIN_SECONDS, DEFAULT_WINDOW_MIN_SECONDS)
+    current_win_max = current_config.get(CONF_WINDOW_MAX_SECONDS, DEFAULT_WINDOW_MAX_SECONDS)
+    current_release = current_config.get(CONF_KNX_RELEASE_VALUE)
+    current_hold = current_config.get(CONF_HOLD_SECONDS, DEFAULT_HOLD_SECONDS)
+    current_intake = current_config.get(CONF_INTAKE_MODE, DEFAULT_INTAKE_MODE)
+    current_dedupe = current_config.get(CONF_DEDUPE_WINDOW, DEFAULT_DEDUPE_WINDOW)
+    current_execution = current_config.get(CONF_EXECUTION_MODE, DEFAULT_EXECUTION_MODE)
+    current_timeout = current_config.get(CONF_SERVICE_CALL_TIMEOUT, DEFAULT_SERVICE_CALL_TIMEOUT)
+    current_batch = current_config.get(CONF_BATCH_WINDOW, DEFAULT_BATCH_WINDOW)
+    current_overlap = current_config.get(CONF_OVERLAP_POLICY, DEFAULT_OVERLAP_POLICY)
+    current_depth = current_config.get(CONF_MAX_QUEUE_DEPTH, DEFAULT_MAX_QUEUE_DEPTH)
+    current_sample_rate = current_config.get(CONF_TRACE_SAMPLE_RATE, DEFAULT_TRACE_SAMPLE_RATE)
+    current_write_interval = current_config.get(CONF_STATE_WRITE_INTERVAL, DEFAULT_STATE_WRITE_INTERVAL)
+    current_gesture_only = current_config.get(CONF_STATE_ON_GESTURE_ONLY, DEFAULT_STATE_ON_GESTURE_ONLY)
+    current_script_mode = current_config.get(CONF_SCRIPT_MODE, DEFAULT_SCRIPT_MODE)
+    current_max_runs = current_config.get(CONF_SCRIPT_MAX_RUNS, DEFAULT_SCRIPT_MAX_RUNS)
+
+    fields: Dict[Any, Any] = {}
+    if include_address:
+        fields[vol.Required(
+            CONF_KNX_GROUP_ADDRESS,
+            default=current_ga
+        )] = cv.string
+        fields[vol.Required(
+            CONF_KNX_VALUE,
+            default=int(current_val)
+        )] = vol.Coerce(int)
+        fields[vol.Optional(
+            CONF_KNX_ADDITIONAL_VALUES,
+            description={"suggested_value": current_additional}
+        )] = cv.string
+    fields.update({
+        vol.Required(
+            CONF_KNX_DPT,
+            default=current_dpt
+        ): vol.In(DPTS),
+        vol.Required(
+            CONF_DOUBLE_CLICK_WINDOW_SECONDS,
+            default=float(current_win)
+        ): vol.Coerce(float),
+        vol.Required(
+            CONF_WINDOW_AUTO_TUNE,
+            default=bool(current_auto_tune)
+        ): cv.boolean,
+        vol.Required(
+            CONF_WINDOW_MIN_SECONDS,
+            default=float(current_win_min)
+        ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=5.0)),
+        vol.Required(
+            CONF_WINDOW_MAX_SECONDS,
+            default=float(current_win_max)
+        ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=5.0)),
+        vol.Optional(
+            CONF_KNX_RELEASE_VALUE,
+            description={"suggested_value": current_release}
+        ): vol.Coerce(int),
+        vol.Required(
+            CONF_HOLD_SECONDS,
+            default=float(current_hold)
+        ): vol.All(vol.Coerce(float), vol.Range(min=0.1)),
+        vol.Required(
+            CONF_INTAKE_MODE,
+            default=current_intake
+        ): vol.In(INTAKE_MODES),
+        vol.Required(
+            CONF_DEDUPE_WINDOW,
+            default=float(current_dedupe)
+        ): vol.All(vol.Coerce(float), vol.Range(min=0.0, max=0.5)),
+        vol.Required(
+            CONF_EXECUTION_MODE,
+            default=current_execution
+        ): vol.In(EXECUTION_MODES),
+        vol.Required(
+            CONF_SERVICE_CALL_TIMEOUT,
+            default=float(current_timeout)
+        ): vol.All(vol.Coerce(float), vol.Range(min=0.1)),
+        vol.Required(
+            CONF_BATCH_WINDOW,
+            default=float(current_batch)
+        ): vol.All(vol.Coerce(float), vol.Range(min=0.0, max=0.5)),
+        vol.Required(
+            CONF_OVERLAP_POLICY,
+            default=current_overlap
+        ): vol.In(OVERLAP_POLICIES),
+        vol.Required(
+            CONF_MAX_QUEUE_DEPTH,
+            default=int(current_depth)
+        ): vol.All(vol.Coerce(int), vol.Range(min=1, max=20)),
+        vol.Required(
+            CONF_SCRIPT_MODE,
+            default=current_script_mode
+        ): vol.In(SCRIPT_MODES),
+        vol.Required(
+            CONF_SCRIPT_MAX_RUNS,
+            default=int(current_max_runs)
+        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Required(
+            CONF_TRACE_SAMPLE_RATE,
+            default=float(current_sample_rate)
+        ): vol.All(vol.Coerce(float), vol.Range(min=0.0, max=1.0)),
+        vol.Required(
+            CONF_STATE_WRITE_INTERVAL,
+            default=float(current_write_interval)
+        ): vol.All(vol.Coerce(float), vol.Range(min=0.0, max=10.0)),
+        vol.Required(
+            CONF_STATE_ON_GESTURE_ONLY,
+            default=bool(current_gesture_only)
+        ): cv.boolean,
+    })
+    return vol.Schema(fields)
+
+
 class KnxDoubleClickConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Hanterar den initiala konfigurationen."""
     VERSION = 1
@@ -43,6 +412,17 @@ class KnxDoubleClickConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_user(
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> config_entries.FlowResult:
+        """Välj mellan en enskild knapp och en hubb med många knappar."""
+        return self.async_show_menu(step_id="user", menu_options=[ENTRY_TYPE_BUTTON, ENTRY_TYPE_HUB])
+
+    def _name_suffix_taken(self, name_suffix: str) -> bool:
+        current_entries = self._async_current_entries(include_ignore=False)
+        return any(entry.data.get(CONF_NAME_SUFFIX) == name_suffix for entry in current_entries)
+
+    async def async_step_button(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> config_entries.FlowResult:
+        """En enskild knapp, en entry."""
         errors: Dict[str, str] = {}
 
         if user_input is not None:
@@ -51,9 +431,9 @@ class KnxDoubleClickConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 name_suffix = DEFAULT_NAME_SUFFIX
 
             # Kontrollera dubbletter
-            current_entries = self._async_current_entries(include_ignore=False)
-            if any(entry.data.get(CONF_NAME_SUFFIX) == name_suffix for entry in current_entries):
+            if self._name_suffix_taken(name_suffix):
                 errors["base"] = "name_suffix_already_configured"
+            _validate_detector_values(user_input, errors)
 
             if not errors:
                 data_to_save = {
@@ -78,8 +458,49 @@ class KnxDoubleClickConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
         return self.async_show_form(
-            step_id="user", data_schema=data_schema, errors=errors
+            step_id="button", data_schema=data_schema, errors=errors
+        )
+
+    async def async_step_hub(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> config_entries.FlowResult:
+        """En hubb: en entry med en tabell av knappar, valfritt importerad direkt."""
+        errors: Dict[str, str] = {}
+
+        if user_input is not None:
+            name_suffix = user_input.get(CONF_NAME_SUFFIX, "").strip() or DEFAULT_NAME_SUFFIX
+            if self._name_suffix_taken(name_suffix):
+                errors["base"] = "name_suffix_already_configured"
+
+            imported = None
+            if not errors:
+                imported = await _async_import_buttons(
+                    self.hass, user_input, [], user_input[CONF_KNX_VALUE], DEFAULT_KNX_DPT, errors
+                )
+            if imported is not None and not errors:
+                return self.async_create_entry(
+                    title=f"KNX Dubbelklick: {name_suffix}",
+                    data={
+                        CONF_ENTRY_TYPE: ENTRY_TYPE_HUB,
+                        CONF_NAME_SUFFIX: name_suffix,
+                        CONF_KNX_VALUE: user_input[CONF_KNX_VALUE],
+                        CONF_DOUBLE_CLICK_WINDOW_SECONDS: user_input[CONF_DOUBLE_CLICK_WINDOW_SECONDS],
+                    },
+                    options={CONF_BUTTONS: imported[0]},
+                )
+
+        data_schema = vol.Schema(
+            {
+                vol.Required(CONF_NAME_SUFFIX, default=DEFAULT_NAME_SUFFIX): cv.string,
+                vol.Required(CONF_KNX_VALUE, default=DEFAULT_KNX_VALUE): vol.Coerce(int),
+                vol.Required(
+                    CONF_DOUBLE_CLICK_WINDOW_SECONDS,
+                    default=DEFAULT_DOUBLE_CLICK_WINDOW_SECONDS,
+                ): vol.Coerce(float),
+                **_import_schema_fields(),
+            }
         )
+        return self.async_show_form(step_id="hub", data_schema=data_schema, errors=errors)
 
     @staticmethod
     @callback
@@ -92,50 +513,217 @@ class KnxDoubleClickOptionsFlowHandler(config_entries.OptionsFlow):
     """Hanterar ändringar av inställningar (kugghjulet)."""
 
     def __init__(self, config_entry: config_entries.ConfigEntry):
-        pass
+        self._edit_button_id: Optional[str] = None
 
     async def async_step_init(
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> config_entries.FlowResult:
         """
         Startsteget för options.
-        Hoppar direkt till basic_options, ingen meny visas.
+        En knapp hoppar direkt till basic_options; en hubb får en meny.
         """
+        if self.config_entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_HUB:
+            return self.async_show_menu(
+                step_id="init",
+                menu_options=["hub_settings", "add_button", "edit_button", "import_buttons", "remove_buttons"],
+            )
         return await self.async_step_basic_options(user_input)
 
-    async def async_step_basic_options(
+    def _buttons(self) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.config_entry.options.get(CONF_BUTTONS, [])]
+
+    def _hub_dpt(self) -> str:
+        """Hubbens gemensamma datapunktstyp, som knapparnas värden tolkas enligt."""
+        return self.config_entry.options.get(
+            CONF_KNX_DPT, self.config_entry.data.get(CONF_KNX_DPT, DEFAULT_KNX_DPT)
+        )
+
+    def _async_save_buttons(self, buttons: List[Dict[str, Any]]) -> config_entries.FlowResult:
+        """Sparar knapptabellen; hubbens lyssnare synkar bara det som ändrats."""
+        return self.async_create_entry(title="", data={**self.config_entry.options, CONF_BUTTONS: buttons})
+
+    async def async_step_hub_settings(
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> config_entries.FlowResult:
-        """Redigera grundläggande parametrar."""
+        """Inställningar som gäller alla knappar i hubben (fönstret är standard för knappar utan eget)."""
         errors: Dict[str, str] = {}
-
         if user_input is not None:
-            # Spara inställningarna
-            return self.async_create_entry(title="", data=user_input)
-
-        # Hämta nuvarande värden
-        current_config = {**self.config_entry.data, **self.config_entry.options}
-        current_ga = current_config.get(CONF_KNX_GROUP_ADDRESS, "")
-        current_val = current_config.get(CONF_KNX_VALUE, DEFAULT_KNX_VALUE)
-        current_win = current_config.get(CONF_DOUBLE_CLICK_WINDOW_SECONDS, DEFAULT_DOUBLE_CLICK_WINDOW_SECONDS)
+            _validate_detector_values(user_input, errors)
+            if not errors:
+                return self.async_create_entry(
+                    title="", data={**user_input, CONF_BUTTONS: self._buttons()}
+                )
+        current_config = {
+            key: value
+            for key, value in {**self.config_entry.data, **self.config_entry.options, **(user_input or {})}.items()
+            if key != CONF_BUTTONS
+        }
+        return self.async_show_form(
+            step_id="hub_settings",
+            data_schema=_detector_options_schema(current_config, include_address=False),
+            errors=errors,
+            description_placeholders={"config_entry_name": self.config_entry.title},
+            last_step=True,
+        )
 
-        options_schema = vol.Schema(
+    def _button_schema(self, row: Dict[str, Any]) -> vol.Schema:
+        return vol.Schema(
             {
-                vol.Required(
-                    CONF_KNX_GROUP_ADDRESS,
-                    default=current_ga
-                ): cv.string,
+                vol.Required(CONF_NAME_SUFFIX, default=row.get(CONF_NAME_SUFFIX, "")): cv.string,
+                vol.Required(CONF_KNX_GROUP_ADDRESS, default=row.get(CONF_KNX_GROUP_ADDRESS, "")): cv.string,
                 vol.Required(
                     CONF_KNX_VALUE,
-                    default=int(current_val)
+                    default=int(row.get(CONF_KNX_VALUE, self.config_entry.data.get(CONF_KNX_VALUE, DEFAULT_KNX_VALUE)))
                 ): vol.Coerce(int),
-                vol.Required(
+                vol.Optional(
                     CONF_DOUBLE_CLICK_WINDOW_SECONDS,
-                    default=float(current_win)
+                    description={"suggested_value": row.get(CONF_DOUBLE_CLICK_WINDOW_SECONDS)}
                 ): vol.Coerce(float),
+                vol.Optional(
+                    CONF_ACTIONS_FILE,
+                    description={"suggested_value": row.get(CONF_ACTIONS_FILE)}
+                ): cv.string,
             }
         )
 
+    def _validate_button(
+        self, user_input: Dict[str, Any], buttons: List[Dict[str, Any]], button_id: Optional[str]
+    ) -> Dict[str, str]:
+        errors = _button_errors(
+            {**user_input, CONF_KNX_GROUP_ADDRESS: user_input[CONF_KNX_GROUP_ADDRESS].strip()}, self._hub_dpt()
+        )
+        key = (user_input[CONF_KNX_GROUP_ADDRESS].strip(), user_input[CONF_KNX_VALUE])
+        if any(
+            (row[CONF_KNX_GROUP_ADDRESS], row[CONF_KNX_VALUE]) == key and row[CONF_BUTTON_ID] != button_id
+            for row in buttons
+        ):
+            errors["base"] = "button_already_configured"
+        return errors
+
+    @staticmethod
+    def _button_row(button_id: str, user_input: Dict[str, Any]) -> Dict[str, Any]:
+        row: Dict[str, Any] = {
+            CONF_BUTTON_ID: button_id,
+            CONF_NAME_SUFFIX: user_input[CONF_NAME_SUFFIX].strip(),
+            CONF_KNX_GROUP_ADDRESS: user_input[CONF_KNX_GROUP_ADDRESS].strip(),
+            CONF_KNX_VALUE: user_input[CONF_KNX_VALUE],
+        }
+        # Utan eget fönster eller egen fil gäller hubbens fönster och en fil per knapp
+        if user_input.get(CONF_DOUBLE_CLICK_WINDOW_SECONDS) is not None:
+            row[CONF_DOUBLE_CLICK_WINDOW_SECONDS] = user_input[CONF_DOUBLE_CLICK_WINDOW_SECONDS]
+        if (actions_file := (user_input.get(CONF_ACTIONS_FILE) or "").strip()):
+            row[CONF_ACTIONS_FILE] = actions_file
+        return row
+
+    async def async_step_add_button(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> config_entries.FlowResult:
+        errors: Dict[str, str] = {}
+        buttons = self._buttons()
+        if user_input is not None:
+            errors = self._validate_button(user_input, buttons, None)
+            if not errors:
+                buttons.append(self._button_row(new_button_id(), user_input))
+                return self._async_save_buttons(buttons)
+        return self.async_show_form(
+            step_id="add_button", data_schema=self._button_schema(user_input or {}), errors=errors, last_step=True
+        )
+
+    async def async_step_edit_button(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> config_entries.FlowResult:
+        buttons = self._buttons()
+        if not buttons:
+            return self.async_abort(reason="no_buttons")
+        if user_input is not None:
+            self._edit_button_id = user_input[CONF_BUTTON_ID]
+            return await self.async_step_edit_button_details()
+        return self.async_show_form(
+            step_id="edit_button",
+            data_schema=vol.Schema(
+                {vol.Required(CONF_BUTTON_ID): vol.In({row[CONF_BUTTON_ID]: _button_label(row) for row in buttons})}
+            ),
+        )
+
+    async def async_step_edit_button_details(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> config_entries.FlowResult:
+        errors: Dict[str, str] = {}
+        buttons = self._buttons()
+        index = next(
+            (i for i, row in enumerate(buttons) if row[CONF_BUTTON_ID] == self._edit_button_id), None
+        )
+        if index is None:
+            return self.async_abort(reason="no_buttons")
+        if user_input is not None:
+            errors = self._validate_button(user_input, buttons, self._edit_button_id)
+            if not errors:
+                buttons[index] = self._button_row(self._edit_button_id, user_input)
+                return self._async_save_buttons(buttons)
+        return self.async_show_form(
+            step_id="edit_button_details",
+            data_schema=self._button_schema(user_input or buttons[index]),
+            errors=errors,
+            last_step=True,
+        )
+
+    async def async_step_import_buttons(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> config_entries.FlowResult:
+        errors: Dict[str, str] = {}
+        if user_input is not None:
+            imported = await _async_import_buttons(
+                self.hass,
+                user_input,
+                self._buttons(),
+                self.config_entry.data.get(CONF_KNX_VALUE, DEFAULT_KNX_VALUE),
+                self._hub_dpt(),
+                errors,
+            )
+            if imported is not None:
+                return self._async_save_buttons(imported[0])
+        return self.async_show_form(
+            step_id="import_buttons",
+            data_schema=vol.Schema(_import_schema_fields()),
+            errors=errors,
+            last_step=True,
+        )
+
+    async def async_step_remove_buttons(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> config_entries.FlowResult:
+        buttons = self._buttons()
+        if user_input is not None:
+            remove = set(user_input.get(CONF_REMOVE_BUTTONS, []))
+            return self._async_save_buttons([row for row in buttons if row[CONF_BUTTON_ID] not in remove])
+        return self.async_show_form(
+            step_id="remove_buttons",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(CONF_REMOVE_BUTTONS, default=[]): cv.multi_select(
+                        {row[CONF_BUTTON_ID]: _button_label(row) for row in buttons}
+                    )
+                }
+            ),
+            last_step=True,
+        )
+
+    async def async_step_basic_options(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> config_entries.FlowResult:
+        """Redigera grundläggande parametrar."""
+        errors: Dict[str, str] = {}
+
+        if user_input is not None:
+            _validate_detector_values(user_input, errors)
+            if not errors:
+                # Spara inställningarna
+                return self.async_create_entry(title="", data=user_input)
+
+        # Hämta nuvarande värden (eller de inmatade när något var fel)
+        current_config = {**self.config_entry.data, **self.config_entry.options, **(user_input or {})}
+        options_schema = _detector_options_schema(current_config)
+
         # Förbered placeholders för description (visar filsökväg)
         actions_file_path = _config_flow_get_actions_file_path(self.hass, self.config_entry)
         config_entry_name = self.config_entry.title or self.config_entry.data.get(CONF_NAME_SUFFIX, "Okänd")
@@ -1,4 +1,166 @@
 # Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - DATA_XKNX: valfri xknx-instans som dispatchern använder i stället för
+#   KNX-integrationens (t.ex. en fejk i tester).
+# - SUMMARY_UNIQUE_ID_SUFFIX för sammanfattningssensorn per config entry.
+# - DATA_DETECTOR_TABLE borttagen tillsammans med DetectorTable.
+# - continue_on_error är inte längre en direktanropsnyckel: direktvägen
+#   följer den inte, så sådana åtgärder körs via Script-hjälparen.
+# - DEFAULT_WINDOW_MAX_SECONDS gränsar det inlärda fönstret och tiderna
+#   utanför fönstret som kan vidga det.
+#
+# Version: 0.9.25
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Optioner för inlärt fönster (CONF_WINDOW_AUTO_TUNE med gränserna
+#   CONF_WINDOW_MIN_SECONDS/CONF_WINDOW_MAX_SECONDS), konstanterna för
+#   förslaget och attributet ATTR_SUGGESTED_WINDOW.
+#
+# Version: 0.9.24
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Option för sammanslagning av serviceanrop (CONF_BATCH_WINDOW) och
+#   DATA_SERVICE_BATCHER för den gemensamma ServiceCallBatcher.
+#
+# Version: 0.9.22
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Tjänsten profile (SERVICE_PROFILE) med sina fält och standardvärden,
+#   DATA_PROFILER för den pågående profileringen och filnamnet för resultatet.
+#
+# Version: 0.9.21
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - DATA_DETECTOR_TABLE för detektorernas gemensamma tillståndstabell.
+#
+# Version: 0.9.20
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Option för dubblettfönster (CONF_DEDUPE_WINDOW) och storleken på
+#   dispatcherns dubblettabell.
+#
+# Version: 0.9.19
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Options för datapunktstyp (CONF_KNX_DPT) och ytterligare värden per
+#   detektor (CONF_KNX_ADDITIONAL_VALUES), attribut för dem och exempel på
+#   value_N-sektioner i standardfilen.
+#
+# Version: 0.9.18
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - DATA_DETECTORS: detektor-id -> körande sensor, för att ta i bruk ändrade
+#   options utan omladdning.
+#
+# Version: 0.9.17
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - DATA_ACTIONS_LOADER för den gemensamma batchinläsningen av åtgärdsfiler.
+#
+# Version: 0.9.16
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Konstanter för hubbläget: en config entry med en tabell av knappar
+#   (CONF_BUTTONS) och import från CSV eller ETS-export.
+#
+# Version: 0.9.13
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Options för skrivintervall för tillståndet och för att bara uppdatera
+#   tidsstämpeln vid avgjorda gester.
+#
+# Version: 0.9.12
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Option för samplingsgrad i spårbufferten, DATA_TRACES och tjänsten
+#   get_trace.
+#
+# Version: 0.9.11
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - DATA_STATS för detektorernas statistik (diagnostiksensorer och diagnostik).
+#
+# Version: 0.9.10
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Nya options för släppvärde och hålltid (gesten hold), delat timerhjul
+#   (DATA_TIMER_WHEEL) och attributet last_gesture.
+#
+# Version: 0.9.9
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Nya options för Scriptets körläge och max_runs, samt attribut för
+#   avvisade och köade Script-körningar.
+#
+# Version: 0.9.8
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Nya options för överlappspolicy (drop/queue/restart) och ködjup för
+#   detektorns åtgärdskörningar.
+#
+# Version: 0.9.7
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - COMPLEX_ACTION_KEYS ersatt av DIRECT_CALL_ACTION_KEYS: en tillåtelselista
+#   över nycklar som kan köras som förkompilerat direktanrop.
+#
+# Version: 0.9.6
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Nya options för exekveringsläge och timeout per serviceanrop, samt
+#   attributet last_action_errors.
+#
+# Version: 0.9.5
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Konstanter för katalogbevakningen av åtgärdsfiler, attributet
+#   actions_error och reparationsärendet för ogiltiga åtgärdsfiler.
+#
+# Version: 0.9.4
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - DATA_ACTION_PLANS för den delade cachen av åtgärdsplaner.
+#
+# Version: 0.9.3
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Nytt option CONF_INTAKE_MODE (knx_event via eventbussen eller direkt xknx).
+#
+# Version: 0.9.2
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Konstanter för KNX-integrationens tjänst knx.event_register.
+#
+# Version: 0.9.1
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Lagt till DATA_DISPATCHER för den gemensamma knx_event-dispatchern.
+#
 # Version: 0.8.20
 # Datum: 2026-01-15
 # Upphovsman: Home Assistant Expert
@@ -13,19 +175,164 @@ DOMAIN = "knx_doubleclick"
 # Plattformar
 PLATFORMS = ["sensor"]
 
+# Nycklar i hass.data[DOMAIN] för integrationsgemensamma objekt
+DATA_DISPATCHER = "dispatcher"
+DATA_ACTION_PLANS = "action_plans"
+DATA_WATCHER = "watcher"
+DATA_TIMER_WHEEL = "timer_wheel"
+DATA_STATS = "stats"
+DATA_TRACES = "traces"
+DATA_HUBS = "hubs"
+DATA_ACTIONS_LOADER = "actions_loader"
+DATA_DETECTORS = "detectors"
+DATA_PROFILER = "profiler"
+DATA_SERVICE_BATCHER = "service_batcher"
+# Ersätter KNX-integrationens xknx-instans om satt (t.ex. en fejk i tester)
+DATA_XKNX = "xknx"
+
+# Sammanfattningssensorns unique_id är entry_id följt av detta
+SUMMARY_UNIQUE_ID_SUFFIX = "_summary"
+
+# KNX-integrationens tjänst för att begränsa vilka GA som ger knx_event
+KNX_DOMAIN = "knx"
+KNX_SERVICE_EVENT_REGISTER = "event_register"
+KNX_ATTR_ADDRESS = "address"
+KNX_ATTR_REMOVE = "remove"
+# Väntetid innan ändrade GA-registreringar skickas till KNX-integrationen
+EVENT_REGISTER_COOLDOWN_SECONDS = 0.5
+
 # Konfigurationsnycklar
 CONF_NAME_SUFFIX = "name_suffix"
 CONF_KNX_GROUP_ADDRESS = "knx_group_address"
 CONF_KNX_VALUE = "knx_value"
 CONF_DOUBLE_CLICK_WINDOW_SECONDS = "double_click_window_seconds"
+CONF_INTAKE_MODE = "intake_mode"
+CONF_KNX_RELEASE_VALUE = "knx_release_value"
+CONF_HOLD_SECONDS = "hold_seconds"
+CONF_TRACE_SAMPLE_RATE = "trace_sample_rate"
+CONF_STATE_WRITE_INTERVAL = "state_write_interval_seconds"
+CONF_STATE_ON_GESTURE_ONLY = "state_on_gesture_only"
+CONF_KNX_DPT = "knx_dpt"
+CONF_KNX_ADDITIONAL_VALUES = "knx_additional_values"
+CONF_DEDUPE_WINDOW = "dedupe_window_seconds"
+# Fönstret ställs in efter uppmätta tider mellan tryck, inom gränserna
+CONF_WINDOW_AUTO_TUNE = "window_auto_tune"
+CONF_WINDOW_MIN_SECONDS = "window_min_seconds"
+CONF_WINDOW_MAX_SECONDS = "window_max_seconds"
+
+# Hubbläge: en config entry med många knappar
+CONF_ENTRY_TYPE = "entry_type"
+ENTRY_TYPE_BUTTON = "button"
+ENTRY_TYPE_HUB = "hub"
+CONF_BUTTONS = "buttons"
+CONF_BUTTON_ID = "button_id"
+CONF_ACTIONS_FILE = "actions_file"
+CONF_IMPORT_TEXT = "import_text"
+CONF_IMPORT_PATH = "import_path"
+CONF_REMOVE_BUTTONS = "remove_buttons"
+
+# Intagslägen för telegram
+INTAKE_MODE_EVENT_BUS = "event_bus"
+INTAKE_MODE_XKNX = "xknx"
+INTAKE_MODES = [INTAKE_MODE_EVENT_BUS, INTAKE_MODE_XKNX]
+
+# Exekveringslägen för enkla serviceanrop
+CONF_EXECUTION_MODE = "execution_mode"
+CONF_SERVICE_CALL_TIMEOUT = "service_call_timeout_seconds"
+# Fönster för att slå ihop likadana serviceanrop från flera detektorer (0 = av)
+CONF_BATCH_WINDOW = "batch_window_seconds"
+EXECUTION_MODE_SEQUENTIAL = "sequential"
+EXECUTION_MODE_CONCURRENT = "concurrent"
+EXECUTION_MODE_NON_BLOCKING = "non_blocking"
+EXECUTION_MODES = [EXECUTION_MODE_SEQUENTIAL, EXECUTION_MODE_CONCURRENT, EXECUTION_MODE_NON_BLOCKING]
+
+# Överlappspolicy när ett dubbelklick kommer medan åtgärder fortfarande körs
+CONF_OVERLAP_POLICY = "overlap_policy"
+CONF_MAX_QUEUE_DEPTH = "max_queue_depth"
+OVERLAP_POLICY_DROP = "drop"
+OVERLAP_POLICY_QUEUE = "queue"
+OVERLAP_POLICY_RESTART = "restart"
+OVERLAP_POLICIES = [OVERLAP_POLICY_DROP, OVERLAP_POLICY_QUEUE, OVERLAP_POLICY_RESTART]
+
+# Körlägen för Script-hjälparen (samma värden som homeassistant.helpers.script)
+CONF_SCRIPT_MODE = "script_mode"
+CONF_SCRIPT_MAX_RUNS = "script_max_runs"
+SCRIPT_MODE_SINGLE = "single"
+SCRIPT_MODE_RESTART = "restart"
+SCRIPT_MODE_QUEUED = "queued"
+SCRIPT_MODE_PARALLEL = "parallel"
+SCRIPT_MODES = [SCRIPT_MODE_SINGLE, SCRIPT_MODE_RESTART, SCRIPT_MODE_QUEUED, SCRIPT_MODE_PARALLEL]
 
 # Standardvärden
 DEFAULT_KNX_VALUE = 1
 DEFAULT_DOUBLE_CLICK_WINDOW_SECONDS = 0.7
 DEFAULT_NAME_SUFFIX = "Min Knapp"
+DEFAULT_INTAKE_MODE = INTAKE_MODE_EVENT_BUS
+DEFAULT_EXECUTION_MODE = EXECUTION_MODE_SEQUENTIAL
+DEFAULT_SERVICE_CALL_TIMEOUT = 10.0
+DEFAULT_BATCH_WINDOW = 0.0
+DEFAULT_OVERLAP_POLICY = OVERLAP_POLICY_QUEUE
+DEFAULT_MAX_QUEUE_DEPTH = 1
+DEFAULT_SCRIPT_MODE = SCRIPT_MODE_SINGLE
+DEFAULT_SCRIPT_MAX_RUNS = 10
+DEFAULT_HOLD_SECONDS = 0.8
+DEFAULT_TRACE_SAMPLE_RATE = 1.0
+DEFAULT_STATE_WRITE_INTERVAL = 0.5
+DEFAULT_STATE_ON_GESTURE_ONLY = False
+# Samma som detector.DPT_AUTO: tolkning som före DPT-stödet
+DEFAULT_KNX_DPT = "auto"
+# Repetitioner och kopior via flera kopplare kommer inom millisekunder; ett
+# snabbt dubbelklick av en människa tar minst ~100 ms
+DEFAULT_DEDUPE_WINDOW = 0.05
+DEFAULT_WINDOW_AUTO_TUNE = False
+DEFAULT_WINDOW_MIN_SECONDS = 0.3
+# Tider mellan tryck över maxgränsen räknas som separata tryck och lärs inte in
+DEFAULT_WINDOW_MAX_SECONDS = 1.2
+
+# Föreslaget fönster: kvantilen stats.PRESS_INTERVAL_QUANTILE av tiderna
+# mellan tryck i samma sekvens gånger marginalen, inom gränserna. Har fler
+# tryck hamnat strax utanför fönstret (upp till maxgränsen) än inom det är
+# fönstret för smalt, och förslaget blir minst kvantilen
+# stats.PRESS_MISS_QUANTILE av de tiderna gånger marginalen. Inget förslag
+# före WINDOW_TUNE_MIN_SAMPLES tider, och automatiskt läge byter fönster
+# först när förslaget skiljer minst WINDOW_TUNE_MIN_CHANGE sekunder.
+WINDOW_TUNE_MARGIN = 1.2
+WINDOW_TUNE_MIN_SAMPLES = 20
+WINDOW_TUNE_MIN_CHANGE = 0.05
+
+# Max antal (källa, GA, payload) som dubblettfiltret minns per intagsväg
+DEDUPE_MAX_ENTRIES = 1024
+
+# Antal poster i varje detektors spårbuffert
+TRACE_BUFFER_SIZE = 256
+
+# Tjänster
+SERVICE_GET_TRACE = "get_trace"
+SERVICE_PROFILE = "profile"
+ATTR_ENTRY_ID = "entry_id"
+ATTR_SECONDS = "seconds"
+ATTR_TOP = "top"
+ATTR_SORT = "sort"
+
+# Profilering på begäran: längd, antal funktioner i svaret och sorteringsnyckel
+DEFAULT_PROFILE_SECONDS = 10
+MAX_PROFILE_SECONDS = 600
+DEFAULT_PROFILE_TOP = 20
+PROFILE_SORT_KEYS = ["tottime", "cumulative", "calls"]
+DEFAULT_PROFILE_SORT = "tottime"
+# Resultatfilen hamnar i konfigurationskatalogen: knx_doubleclick_profile_<tid>.prof
+PROFILE_FILE_PREFIX = "knx_doubleclick_profile_"
+
+# Upplösning för det gemensamma timerhjulet för gestfönster
+TIMER_WHEEL_TICK_SECONDS = 0.02
 
 # Katalog och standardinnehåll för åtgärdsfiler
 ACTIONS_DIR_BASENAME = "knx_doubleclick_actions"
+ACTIONS_FILE_SUFFIX = ".yaml"
+# Intervall för reservskanning av katalogen när inotify (watchdog) saknas
+ACTIONS_SCAN_INTERVAL_SECONDS = 10
+# Fördröjning innan en ändrad fil läses om (en sparning ger flera filhändelser)
+ACTIONS_RELOAD_DELAY_SECONDS = 0.3
 
 # DEFAULT_ACTIONS_FILE_CONTENT
 DEFAULT_ACTIONS_FILE_CONTENT = """#---------------------------------------------------------------------------
@@ -39,22 +346,53 @@ DEFAULT_ACTIONS_FILE_CONTENT = """#---------------------------------------------
 # - service: switch.turn_on
 #   target:
 #     entity_id: switch.min_switch_entitet
+
+# En lista som ovan körs vid dubbelklick. Olika åtgärder per gest anges
+# i stället som sektioner (single, double, triple, click_4 ..., hold):
+# single:
+#   - service: light.toggle
+#     target:
+#       entity_id: light.hall
+# triple:
+#   - service: scene.turn_on
+#     target:
+#       entity_id: scene.kvall
+
+# Lyssnar detektorn på flera värden (t.ex. scennummer) kan varje värde få
+# egna åtgärder i en sektion value_N, som en lista eller med gestsektioner:
+# value_2:
+#   single:
+#     - service: scene.turn_on
+#       target:
+#         entity_id: scene.film
 """
 
 # Attribut
 ATTR_LAST_CLICK_TIME = "last_click_time"
 ATTR_KNX_GROUP_ADDRESS = "knx_group_address"
 ATTR_KNX_LISTEN_VALUE = "knx_listen_value"
+ATTR_KNX_LISTEN_VALUES = "knx_listen_values"
+ATTR_KNX_DPT = "knx_dpt"
 ATTR_DOUBLE_CLICK_WINDOW = "double_click_window_seconds"
 ATTR_ACTIONS_FILE_PATH = "actions_file_path"
 ATTR_LAST_TIME_DIFFERENCE = "last_time_difference_seconds"
+ATTR_ACTIONS_ERROR = "actions_error"
+ATTR_LAST_ACTION_ERRORS = "last_action_errors"
+ATTR_SCRIPT_RUNS_REJECTED = "script_runs_rejected"
+ATTR_SCRIPT_RUNS_QUEUED = "script_runs_queued"
+ATTR_LAST_GESTURE = "last_gesture"
+ATTR_SUGGESTED_WINDOW = "suggested_window_seconds"
+
+# Reparationsärenden
+ISSUE_INVALID_ACTIONS_FILE = "invalid_actions_file"
 
-# Nycklar som indikerar att en åtgärd är mer komplex än ett enkelt serviceanrop
-COMPLEX_ACTION_KEYS = [
-    "condition", "delay", "repeat", "choose", "sequence",
-    "wait_template", "wait_for_trigger", "event", "event_template",
-    "variables", "stop", "parallel", "scene"
-]
+# Nycklar som en åtgärd får ha för att köras som direkt serviceanrop.
+# Allt annat (condition, delay, choose, service_template, continue_on_error ...)
+# går via Script-hjälparen.
+DIRECT_CALL_ACTION_KEYS = frozenset({
+    "action", "service", "data", "target", "entity_id",
+    "alias", "enabled", "metadata",
+})
 
 # Felnycklar
 ERROR_CANNOT_READ_ACTIONS_FILE = "cannot_read_actions_file"
@@ -0,0 +1,102 @@
+# Versionshistorik:
+# Version: 0.9.21
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Källa och GA kan vara 16-bitars heltal (xknx raw); de formateras först
+#   i as_dict().
+#
+# Version: 0.9.20
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: filtrerar bort dubbletter av telegram (KNX-repetitioner och
+#   samma telegram via flera linjekopplare eller tunnlar) med en begränsad
+#   LRU-tabell, och räknar bortfiltrerade telegram per källa och linje.
+#   Ren Python utan beroenden till Home Assistant.
+
+"""Dubblettfilter för KNX-telegram till dubbelklicksdetektorer."""
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple, Union
+
+# Individuell adress eller GA som sträng (knx_event) eller 16-bitars heltal (xknx)
+Address = Union[str, int]
+# (källadress, gruppadress, payload)
+TelegramKey = Tuple[Optional[Address], Address, Hashable]
+
+
+def format_individual_address(source: Optional[Address]) -> Optional[str]:
+    """Individuell adress som "område.linje.enhet"; heltal (xknx raw) formateras."""
+    if isinstance(source, int):
+        return f"{source >> 12}.{(source >> 8) & 0x0F}.{source & 0xFF}"
+    return source
+
+
+def source_line(source: Optional[Address]) -> Optional[str]:
+    """Linjen (område.linje) för en individuell adress, "1.1.5" -> "1.1"."""
+    source = format_individual_address(source)
+    if not source or source.count(".") != 2:
+        return source
+    return source.rsplit(".", 1)[0]
+
+
+class TelegramDeduplicator:
+    """Känner igen samma telegram som kommer igen inom ett kort fönster.
+
+    Ett telegram är en dubblett om samma källa skickat samma payload till
+    samma GA inom fönstret, räknat från första kopian. Tabellen är en LRU
+    med högst max_entries nycklar, så minnet är begränsat oavsett trafik.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        # Nyckel -> loop.time() för första kopian, äldst först
+        self._seen: "OrderedDict[TelegramKey, float]" = OrderedDict()
+        self.suppressed = 0
+        self.suppressed_by_source: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def is_duplicate(
+        self, source: Optional[Address], group_address: Address, payload: Any, now: float, window: float
+    ) -> bool:
+        """Sant om telegrammet är en dubblett; annars registreras det som första kopia.
+
+        Utan källadress går kopior inte att skilja från nya tryck, och
+        telegrammet släpps alltid igenom.
+        """
+        if source is None:
+            return False
+        if isinstance(payload, list):
+            # knx_event har DPTArray som lista
+            payload = tuple(payload)
+        key = (source, group_address, payload)
+        seen = self._seen
+        first = seen.get(key)
+        if first is not None and now - first < window:
+            self.suppressed += 1
+            self.suppressed_by_source[source] += 1
+            return True
+        seen[key] = now
+        seen.move_to_end(key)
+        if len(seen) > self._max_entries:
+            seen.popitem(last=False)
+        return False
+
+    def clear(self) -> None:
+        self._seen.clear()
+
+    def as_dict(self) -> Dict[str, Any]:
+        by_line: Counter = Counter()
+        for source, count in self.suppressed_by_source.items():
+            by_line[source_line(source)] += count
+        return {
+            "suppressed": self.suppressed,
+            "tracked_keys": len(self._seen),
+            "suppressed_by_line": {str(line): count for line, count in by_line.most_common()},
+            "suppressed_by_source": {
+                str(format_individual_address(source)): count
+                for source, count in self.suppressed_by_source.most_common()
+            },
+        }
@@ -0,0 +1,517 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - DetectorTable borttagen; sensorn håller sina tider som vanliga attribut.
+# - GestureClassifier.last_gap är bara tiden sedan föregående tryck;
+#   sensorn avgör själv vilka tider som lärs in.
+# - WheelTimer.__slots__ och GestureClassifier.__slots__ sorterade (ruff
+#   RUF023).
+#
+# Version: 0.9.25
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - GestureClassifier.last_gap: tid sedan föregående tryck oavsett fönstret,
+#   för inlärningen av fönstret (last_interval finns bara inom fönstret).
+#
+# Version: 0.9.21
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - parse_group_address()/format_group_address(): GA som 16-bitars heltal
+#   (samma som xknx raw).
+# - DetectorTable: gemensam tabell med detektorernas tider i array-kolumner,
+#   en rad per detektor, i stället för datetime-objekt per tryck.
+# - GestureClassifier har __slots__.
+#
+# Version: 0.9.19
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Avkodare per DPT (1 brytare, 5 räknare, 17/18 scennummer, rå payload och
+#   auto) som väljs en gång vid registreringen. De jämför typer i stället för
+#   att prova int() med try/except. coerce_event_value() har samma snabbväg.
+#
+# Version: 0.9.18
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - configure() avbryter inte längre en pågående sekvens. Fönster, gester
+#   och hålltid byts på plats och sekvensen avgörs med de nya värdena, så att
+#   ändrade options kan tas i bruk utan att tryck går förlorade.
+#
+# Version: 0.9.15
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - coerce_event_value() flyttad hit från dispatcher.py. Modulen förblir ren
+#   Python och kan laddas fristående av tools/replay.py.
+#
+# Version: 0.9.10
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: gestklassificering per detektor (enkel-, dubbel-, trippel- och
+#   N-klick samt håll) och ett gemensamt hashat timerhjul för alla detektorers
+#   fönster. Modulen är ren Python utan beroenden till Home Assistant.
+
+"""Gestklassificering, värdeavkodning och timerhjul för KNX Dubbelklicksdetektor."""
+import math
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+GESTURE_SINGLE = "single"
+GESTURE_DOUBLE = "double"
+GESTURE_TRIPLE = "triple"
+GESTURE_HOLD = "hold"
+GESTURE_CLICK_PREFIX = "click_"
+
+_NAMED_CLICKS = {GESTURE_SINGLE: 1, GESTURE_DOUBLE: 2, GESTURE_TRIPLE: 3}
+_CLICK_NAMES = {clicks: name for name, clicks in _NAMED_CLICKS.items()}
+
+# (gest, antal klick); antal klick är 0 för håll
+GestureCallback = Callable[[str, int], None]
+
+# Hur ett telegrams payload tolkas till ett jämförbart heltal
+DPT_AUTO = "auto"
+DPT_SWITCH = "1"
+DPT_COUNTER = "5"
+DPT_SCENE_NUMBER = "17"
+DPT_SCENE_CONTROL = "18"
+DPT_RAW = "raw"
+DPTS = [DPT_AUTO, DPT_SWITCH, DPT_COUNTER, DPT_SCENE_NUMBER, DPT_SCENE_CONTROL, DPT_RAW]
+
+# Tillåtna värden per DPT; scener anges som 1-64 precis som i ETS
+_DPT_VALUE_RANGES: Dict[str, Tuple[int, int]] = {
+    DPT_SWITCH: (0, 1),
+    DPT_COUNTER: (0, 255),
+    DPT_SCENE_NUMBER: (1, 64),
+    DPT_SCENE_CONTROL: (1, 64),
+}
+
+# Payload (int för små värden, lista/tupel av byte annars) -> heltal eller None
+ValueDecoder = Callable[[Any], Optional[int]]
+
+
+def _decode_auto(payload: Any) -> Optional[int]:
+    """Heltal eller en enda byte, som tidigare."""
+    if type(payload) is int:
+        return payload
+    if type(payload) in (list, tuple) and len(payload) == 1:
+        return payload[0]
+    return None
+
+
+def _decode_switch(payload: Any) -> Optional[int]:
+    """DPT 1: 0 eller 1."""
+    if type(payload) is int and payload <= 1:
+        return payload
+    return None
+
+
+def _decode_counter(payload: Any) -> Optional[int]:
+    """DPT 5: en byte, 0-255."""
+    if type(payload) in (list, tuple) and len(payload) == 1:
+        return payload[0]
+    return None
+
+
+def _decode_scene_number(payload: Any) -> Optional[int]:
+    """DPT 17: scen 1-64 (bussen skickar 0-63)."""
+    if type(payload) in (list, tuple) and len(payload) == 1:
+        return (payload[0] & 0x3F) + 1
+    return None
+
+
+def _decode_scene_control(payload: Any) -> Optional[int]:
+    """DPT 18: scen 1-64 vid aktivering; inlärningstelegram (bit 7) ignoreras."""
+    if type(payload) in (list, tuple) and len(payload) == 1 and not payload[0] & 0x80:
+        return (payload[0] & 0x3F) + 1
+    return None
+
+
+def _decode_raw(payload: Any) -> Optional[int]:
+    """Rå payload: heltalet, eller byten som ett big endian-heltal."""
+    if type(payload) is int:
+        return payload
+    if type(payload) in (list, tuple) and payload:
+        return int.from_bytes(bytes(payload), "big")
+    return None
+
+
+_PAYLOAD_DECODERS: Dict[str, ValueDecoder] = {
+    DPT_AUTO: _decode_auto,
+    DPT_SWITCH: _decode_switch,
+    DPT_COUNTER: _decode_counter,
+    DPT_SCENE_NUMBER: _decode_scene_number,
+    DPT_SCENE_CONTROL: _decode_scene_control,
+    DPT_RAW: _decode_raw,
+}
+
+
+def _event_decoder(decode: ValueDecoder) -> ValueDecoder:
+    def _decode_event(event_data: Dict[str, Any]) -> Optional[int]:
+        return decode(event_data.get("data"))
+    return _decode_event
+
+
+def dpt_value_range(dpt: str) -> Optional[Tuple[int, int]]:
+    """(min, max) för värden med en viss DPT, None om alla heltal ≥ 0 går."""
+    return _DPT_VALUE_RANGES.get(dpt)
+
+
+def payload_value_decoder(dpt: str) -> ValueDecoder:
+    """Avkodare för en payload direkt från xknx (DPTBinary.value / DPTArray.value)."""
+    return _PAYLOAD_DECODERS.get(dpt, _decode_auto)
+
+
+def event_value_decoder(dpt: str) -> ValueDecoder:
+    """Avkodare för ett knx_event. Samma DPT ger alltid samma funktionsobjekt."""
+    return _EVENT_DECODERS.get(dpt, coerce_event_value)
+
+
+def coerce_event_value(event_data: Dict[str, Any]) -> Optional[int]:
+    """Plockar ut ett jämförbart heltal ur ett knx_event (value, annars data)."""
+    raw_value = event_data.get("value")
+    if raw_value is None:
+        raw_value = event_data.get("data")
+    if raw_value is None:
+        return None
+    if type(raw_value) is int:
+        return raw_value
+    if type(raw_value) in (list, tuple) and len(raw_value) == 1 and type(raw_value[0]) is int:
+        return raw_value[0]
+    # Ovanliga typer (t.ex. en avkodad sträng eller float i value)
+    try:
+        if isinstance(raw_value, list) and len(raw_value) == 1:
+            return int(raw_value[0])
+        return int(raw_value)
+    except (ValueError, TypeError):
+        return None
+
+
+# Auto behåller tidigare tolkning: det avkodade value i första hand, annars data
+_EVENT_DECODERS: Dict[str, ValueDecoder] = {
+    DPT_AUTO: coerce_event_value,
+    **{dpt: _event_decoder(decode) for dpt, decode in _PAYLOAD_DECODERS.items() if dpt != DPT_AUTO},
+}
+
+
+def parse_group_address(group_address: str) -> Optional[int]:
+    """GA som 16-bitars heltal: "1/2/3" (5/3/8 bitar), "1/2" (5/11 bitar) eller "4660".
+
+    Returnerar None om adressen inte är en giltig gruppadress.
+    """
+    try:
+        parts = [int(part) for part in group_address.strip().split("/")]
+    except (AttributeError, ValueError):
+        return None
+    if len(parts) == 3:
+        main, middle, sub = parts
+        if 0 <= main <= 31 and 0 <= middle <= 7 and 0 <= sub <= 255:
+            return (main << 11) | (middle << 8) | sub
+    elif len(parts) == 2:
+        main, sub = parts
+        if 0 <= main <= 31 and 0 <= sub <= 2047:
+            return (main << 11) | sub
+    elif len(parts) == 1 and 0 <= parts[0] <= 0xFFFF:
+        return parts[0]
+    return None
+
+
+def format_group_address(raw: int) -> str:
+    """16-bitars GA i trenivåformat, 2563 -> "1/2/3"."""
+    return f"{raw >> 11}/{(raw >> 8) & 0x07}/{raw & 0xFF}"
+
+
+def gesture_name(clicks: int) -> str:
+    """Namnet på gesten för ett antal klick: single, double, triple, click_4 ..."""
+    return _CLICK_NAMES.get(clicks, f"{GESTURE_CLICK_PREFIX}{clicks}")
+
+
+def gesture_clicks(name: str) -> Optional[int]:
+    """Antal klick för ett gestnamn, 0 för håll och None om namnet är okänt."""
+    if name == GESTURE_HOLD:
+        return 0
+    if name in _NAMED_CLICKS:
+        return _NAMED_CLICKS[name]
+    if name.startswith(GESTURE_CLICK_PREFIX):
+        suffix = name[len(GESTURE_CLICK_PREFIX):]
+        if suffix.isdigit() and int(suffix) >= 1:
+            return int(suffix)
+    return None
+
+
+class WheelTimer:
+    """En schemalagd deadline i ett TimerWheel."""
+
+    __slots__ = ("_wheel", "callback", "tick")
+
+    def __init__(self, wheel: "TimerWheel", tick: int, callback: Callable[[], None]) -> None:
+        self.tick = tick
+        self.callback: Optional[Callable[[], None]] = callback
+        self._wheel: Optional[TimerWheel] = wheel
+
+    def cancel(self) -> None:
+        if self._wheel is not None:
+            self._wheel._cancel(self)
+            self._wheel = None
+        self.callback = None
+
+
+class TimerWheel:
+    """Hashat timerhjul som drivs av en enda loop.call_at.
+
+    Deadlines avrundas uppåt till närmaste tick och sorteras in i en av
+    ett fast antal fack. Så länge någon timer väntar körs en callback per
+    tick, oavsett hur många detektorer som har öppna fönster; annars står
+    hjulet still. loop behöver bara time() och call_at().
+    """
+
+    def __init__(self, loop: Any, tick_seconds: float = 0.02, slots: int = 512) -> None:
+        self._loop = loop
+        self._tick_seconds = tick_seconds
+        self._slots: List[List[WheelTimer]] = [[] for _ in range(slots)]
+        self._current_tick = self._tick_of(loop.time())
+        self._handle: Any = None
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _tick_of(self, when: float) -> int:
+        return math.floor(when / self._tick_seconds)
+
+    def schedule(self, deadline: float, callback: Callable[[], None]) -> WheelTimer:
+        """Kör callback vid första tick på eller efter deadline (loop.time())."""
+        if self._handle is None:
+            # Hjulet har stått still, inga fack behöver gås igenom i efterhand
+            self._current_tick = self._tick_of(self._loop.time())
+        tick = max(math.ceil(deadline / self._tick_seconds), self._current_tick + 1)
+        timer = WheelTimer(self, tick, callback)
+        self._slots[tick % len(self._slots)].append(timer)
+        self._count += 1
+        if self._handle is None:
+            self._handle = self._loop.call_at(
+                (self._current_tick + 1) * self._tick_seconds, self._run
+            )
+        return timer
+
+    def _cancel(self, timer: WheelTimer) -> None:
+        slot = self._slots[timer.tick % len(self._slots)]
+        try:
+            slot.remove(timer)
+        except ValueError:
+            return
+        self._count -= 1
+        if not self._count and self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _run(self) -> None:
+        self._handle = None
+        # Anropet gällde nästa tick; loopen kan köra det en aning tidigt
+        now_tick = max(self._tick_of(self._loop.time()), self._current_tick + 1)
+        n_slots = len(self._slots)
+        first = self._current_tick + 1
+        # Har loopen legat efter mer än ett varv räcker ett varv över alla fack
+        ticks = range(max(first, now_tick - n_slots + 1), now_tick + 1)
+        self._current_tick = now_tick
+
+        due: List[WheelTimer] = []
+        for tick in ticks:
+            slot = self._slots[tick % n_slots]
+            if not slot:
+                continue
+            keep = [timer for timer in slot if timer.tick > now_tick]
+            if len(keep) != len(slot):
+                due.extend(timer for timer in slot if timer.tick <= now_tick)
+                slot[:] = keep
+
+        self._count -= len(due)
+        for timer in due:
+            timer._wheel = None
+        for timer in due:
+            # En tidigare callback i samma tick kan ha avbrutit timern
+            if (callback := timer.callback) is not None:
+                timer.callback = None
+                callback()
+
+        if self._count and self._handle is None:
+            self._handle = self._loop.call_at(
+                (self._current_tick + 1) * self._tick_seconds, self._run
+            )
+
+    def stop(self) -> None:
+        """Släpper alla väntande timers."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        for slot in self._slots:
+            for timer in slot:
+                timer._wheel = None
+                timer.callback = None
+            slot.clear()
+        self._count = 0
+
+
+class GestureClassifier:
+    """Klassificerar tryck för en detektor till gester.
+
+    Tryck inom fönstret (räknat från föregående tryck) bygger upp en
+    sekvens. Sekvensen avgörs direkt när max_clicks nås, och annars när
+    fönstret löpt ut, men bara om antalet klick har en egen gest
+    (resolve_counts); övriga sekvenser kräver ingen timer alls. Med
+    hold_seconds satt väntar klicket på släppet, och ett tryck som hålls
+    längre än hold_seconds blir gesten håll.
+    """
+
+    __slots__ = (
+        "_count",
+        "_hold_fired",
+        "_hold_timer",
+        "_last_press",
+        "_on_gesture",
+        "_pressed",
+        "_resolve_timer",
+        "_wheel",
+        "hold_seconds",
+        "last_gap",
+        "last_interval",
+        "max_clicks",
+        "resolve_counts",
+        "window_seconds",
+    )
+
+    def __init__(self, wheel: TimerWheel, on_gesture: GestureCallback) -> None:
+        self._wheel = wheel
+        self._on_gesture = on_gesture
+        self.window_seconds = 0.0
+        self.max_clicks = 2
+        self.resolve_counts: FrozenSet[int] = frozenset()
+        self.hold_seconds: Optional[float] = None
+        self._count = 0
+        self._last_press: Optional[float] = None
+        # Tid mellan de två senaste trycken i sekvensen, None vid första trycket
+        self.last_interval: Optional[float] = None
+        # Tid sedan föregående tryck även när det låg utanför fönstret
+        self.last_gap: Optional[float] = None
+        self._pressed = False
+        self._hold_fired = False
+        self._resolve_timer: Optional[WheelTimer] = None
+        self._hold_timer: Optional[WheelTimer] = None
+
+    @property
+    def clicks(self) -> int:
+        """Antal klick i pågående sekvens."""
+        return self._count
+
+    def configure(
+        self,
+        window_seconds: float,
+        max_clicks: int,
+        resolve_counts: FrozenSet[int],
+        hold_seconds: Optional[float] = None,
+    ) -> None:
+        """Ny konfiguration. En pågående sekvens behålls och avgörs med de nya värdena."""
+        if (window_seconds, max_clicks, resolve_counts, hold_seconds) == (
+            self.window_seconds, self.max_clicks, self.resolve_counts, self.hold_seconds
+        ):
+            return
+        hold_changed = hold_seconds != self.hold_seconds
+        self.window_seconds = window_seconds
+        self.max_clicks = max_clicks
+        self.resolve_counts = resolve_counts
+        self.hold_seconds = hold_seconds
+        if hold_changed and self._hold_timer is not None:
+            # Ett tryck som hålls: räkna hålltiden från trycket med det nya värdet
+            self._hold_timer.cancel()
+            self._hold_timer = None
+            if hold_seconds is not None and self._last_press is not None:
+                self._hold_timer = self._wheel.schedule(self._last_press + hold_seconds, self._hold_elapsed)
+        self._cancel_resolve()
+        if self._count and not self._pressed and self._last_press is not None:
+            # Nytt fönster eller nya gester: avgör sekvensen på nytt från senaste trycket
+            self._after_click(self._last_press)
+
+    def reset(self) -> None:
+        self._cancel_timers()
+        self._count = 0
+        self._pressed = False
+        self._hold_fired = False
+
+    def press(self, now: float) -> Optional[float]:
+        """Ett tryck. Returnerar tid sedan föregående tryck om det ingår i sekvensen."""
+        self._cancel_resolve()
+        interval: Optional[float] = None
+        if self._count and self._last_press is not None and now - self._last_press <= self.window_seconds:
+            interval = now - self._last_press
+            self._count += 1
+        else:
+            self._count = 1
+        self.last_gap = None if self._last_press is None else now - self._last_press
+        self._last_press = now
+        self.last_interval = interval
+
+        if self.hold_seconds is not None:
+            if self._hold_timer is not None:
+                self._hold_timer.cancel()
+            self._pressed = True
+            self._hold_fired = False
+            self._hold_timer = self._wheel.schedule(now + self.hold_seconds, self._hold_elapsed)
+        else:
+            self._after_click(now)
+        return interval
+
+    def release(self, now: float) -> None:
+        """Ett släpp. Ignoreras om håll inte används."""
+        if not self._pressed:
+            return
+        self._pressed = False
+        if self._hold_timer is not None:
+            self._hold_timer.cancel()
+            self._hold_timer = None
+        if self._hold_fired:
+            self._hold_fired = False
+            return
+        if self._count:
+            self._after_click(now)
+
+    def _after_click(self, now: float) -> None:
+        if self.max_clicks and self._count >= self.max_clicks:
+            # Fönstret kan inte förlängas, gesten avgörs direkt
+            self._emit(self._count)
+        elif self._count in self.resolve_counts and self._last_press is not None:
+            deadline = max(self._last_press + self.window_seconds, now)
+            self._resolve_timer = self._wheel.schedule(deadline, self._resolve_elapsed)
+
+    def _resolve_elapsed(self) -> None:
+        self._resolve_timer = None
+        if self._count and not self._pressed:
+            self._emit(self._count)
+
+    def _hold_elapsed(self) -> None:
+        self._hold_timer = None
+        if not self._pressed:
+            return
+        self._hold_fired = True
+        self._cancel_resolve()
+        self._count = 0
+        self._on_gesture(GESTURE_HOLD, 0)
+
+    def _emit(self, clicks: int) -> None:
+        self._cancel_resolve()
+        self._count = 0
+        self._on_gesture(gesture_name(clicks), clicks)
+
+    def _cancel_resolve(self) -> None:
+        if self._resolve_timer is not None:
+            self._resolve_timer.cancel()
+            self._resolve_timer = None
+
+    def _cancel_timers(self) -> None:
+        self._cancel_resolve()
+        if self._hold_timer is not None:
+            self._hold_timer.cancel()
+            self._hold_timer = None
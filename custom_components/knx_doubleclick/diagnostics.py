@@ -0,0 +1,83 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Importerna sorterade (ruff I001).
+#
+# Version: 0.9.24
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Räknarna för sammanslagna serviceanrop (ServiceCallBatcher) ingår.
+#
+# Version: 0.9.16
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - För en hubb ingår statistik och spår för varje knapp.
+#
+# Version: 0.9.12
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Detektorns spårbuffert ingår i nedladdningen.
+#
+# Version: 0.9.11
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: diagnostiknedladdning per config entry med detektorns räknare
+#   och latenshistogram samt dispatcherns räknare per GA.
+
+"""Diagnostik för KNX Dubbelklicksdetektor."""
+from typing import Any, Dict
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_ENTRY_TYPE,
+    DATA_DISPATCHER,
+    DATA_SERVICE_BATCHER,
+    DATA_STATS,
+    DATA_TRACES,
+    DOMAIN,
+    ENTRY_TYPE_HUB,
+)
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Returnerar diagnostik för en config entry."""
+    domain_data = hass.data.get(DOMAIN, {})
+    all_stats = domain_data.get(DATA_STATS, {})
+    all_traces = domain_data.get(DATA_TRACES, {})
+    dispatcher = domain_data.get(DATA_DISPATCHER)
+    diagnostics: Dict[str, Any] = {
+        "entry": {
+            "title": entry.title,
+            "data": dict(entry.data),
+            "options": dict(entry.options),
+        },
+    }
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_HUB:
+        prefix = f"{entry.entry_id}_"
+        diagnostics["buttons"] = {
+            detector_id[len(prefix):]: {
+                "detector": stats.as_dict(),
+                "trace": all_traces[detector_id].as_dict() if detector_id in all_traces else None,
+            }
+            for detector_id, stats in all_stats.items()
+            if detector_id.startswith(prefix)
+        }
+    else:
+        stats = all_stats.get(entry.entry_id)
+        trace = all_traces.get(entry.entry_id)
+        diagnostics["detector"] = stats.as_dict() if stats is not None else None
+        diagnostics["trace"] = trace.as_dict() if trace is not None else None
+    diagnostics["dispatcher"] = dispatcher.async_diagnostics() if dispatcher is not None else None
+    batcher = domain_data.get(DATA_SERVICE_BATCHER)
+    diagnostics["service_batcher"] = batcher.async_diagnostics() if batcher is not None else None
+    return diagnostics
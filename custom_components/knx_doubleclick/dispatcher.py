@@ -0,0 +1,611 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - GA som KNX-integrationen redan skickade knx_event för (registrerade via
+#   knx.event_register av någon annan) registreras inte av oss och
+#   avregistreras därför aldrig när en detektor tas bort.
+# - async_get_dispatcher skickar in en xknx-instans från hass.data[DOMAIN]
+#   [DATA_XKNX] om en sådan finns, så att åsidosättningen går att nå.
+# - received för knx_event är loop-tiden när eventet avfyrades (busslaggen
+#   avdragen), så att alla hanterare får samma ankomsttid.
+# - Vid registreringen loggas den verkliga orsaken när intagsläge xknx inte
+#   går att använda (ogiltig GA eller xknx saknas).
+# - Försvinner xknx-instansen medan detektorer lyssnar flyttas deras
+#   registreringar till knx_event i stället för att telegrammen tappas.
+# - Importerna sorterade (ruff I001).
+#
+# Version: 0.9.22
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - async_set_profiler: under en profilering byts busslyssnaren och
+#   xknx-callbacken mot profilerade omslag, och tillbaka efteråt. Utan
+#   profilering anropas hanterarna direkt som tidigare.
+#
+# Version: 0.9.21
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - xknx-indexet nycklas på GA som 16-bitars heltal (GroupAddress.raw), så
+#   att inget telegram behöver formateras till en sträng. Dubblettfiltret
+#   använder källans raw-adress på samma sätt. knx_event levererar GA som
+#   sträng och indexeras fortsatt på den.
+#
+# Version: 0.9.20
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Dubblettfilter före avkodningen: samma källa, GA och payload inom
+#   dubblettfönstret räknas bara en gång. Fönstret per GA är det största
+#   bland detektorerna på GA:n; 0 stänger av filtret. Bortfiltrerade
+#   telegram räknas per GA och per källa/linje.
+#
+# Version: 0.9.19
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Indexet är GA -> avkodare -> värde -> hanterare. Avkodaren väljs efter
+#   detektorns DPT vid registreringen; ett telegram avkodas en gång per
+#   avkodare på sin GA (oftast en). _telegram_value ersatt av DPT-avkodarna.
+#
+# Version: 0.9.15
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Tolkningen av värdet i ett knx_event har flyttats till detector.py
+#   (coerce_event_value) så att tools/replay.py kan använda samma logik
+#   utan Home Assistant.
+#
+# Version: 0.9.11
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Räknare per GA (telegram sedda och matchade) och ett histogram över
+#   eventbussens fördröjning. Hanterarna får telegrammets ankomsttid
+#   (loopens monotona klocka) som andra argument.
+#
+# Version: 0.9.3
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Valfritt intagsläge "xknx": en telegram-callback registreras direkt på
+#   KNX-integrationens xknx-instans, filtrerad på de konfigurerade GA, och
+#   eventbussen hoppas över helt. Faller tillbaka till knx_event om xknx saknas.
+#   En testmiljö kan skicka in ett eget xknx-objekt till dispatchern.
+#
+# Version: 0.9.2
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Dispatchern registrerar exakt unionen av indexerade GA hos KNX-integrationen
+#   (knx.event_register) så att knx_event bara skickas för bevakade knappar.
+#
+# Version: 0.9.1
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: en gemensam, GA-indexerad dispatcher för knx_event som ersätter
+#   en separat busslyssnare per sensor.
+
+"""Gemensam dispatcher för KNX-telegram till dubbelklicksdetektorer."""
+import itertools
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+import voluptuous as vol
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.debounce import Debouncer
+
+from .const import (
+    DATA_DISPATCHER,
+    DATA_PROFILER,
+    DATA_XKNX,
+    DEDUPE_MAX_ENTRIES,
+    DOMAIN,
+    EVENT_REGISTER_COOLDOWN_SECONDS,
+    INTAKE_MODE_EVENT_BUS,
+    INTAKE_MODE_XKNX,
+    KNX_ATTR_ADDRESS,
+    KNX_ATTR_REMOVE,
+    KNX_DOMAIN,
+    KNX_SERVICE_EVENT_REGISTER,
+)
+from .dedupe import TelegramDeduplicator
+from .detector import (
+    DPT_AUTO,
+    ValueDecoder,
+    event_value_decoder,
+    format_group_address,
+    parse_group_address,
+    payload_value_decoder,
+)
+from .profiler import SCOPE_EVENT, ScopedProfiler
+from .stats import GaCounters, LatencyHistogram
+
+_LOGGER = logging.getLogger(__name__)
+
+# Signatur för en detektors hanterare: (jämförbart värde, ankomsttid enligt loop.time()) -> None
+PressHandler = Callable[[int, float], None]
+# GA som sträng (knx_event) eller 16-bitars heltal (xknx)
+GroupKey = Union[str, int]
+# GA -> avkodare (en per DPT) -> värde -> hanterare
+HandlerIndex = Dict[GroupKey, Dict[ValueDecoder, Dict[int, List[PressHandler]]]]
+
+
+class KnxDoubleClickDispatcher:
+    """En enda KNX-lyssnare som slår upp (GA, värde) i ett index."""
+
+    def __init__(self, hass: HomeAssistant, xknx: Any = None) -> None:
+        self.hass = hass
+        # GA -> avkodare -> värde -> lista av hanterare. Flera detektorer kan dela GA.
+        self._index: HandlerIndex = {}
+        self._remove_bus_listener: Optional[Callable[[], None]] = None
+        # Hanterarna som registreras; profilerade omslag under async_set_profiler
+        self._event_handler: Callable[[Event], None] = self._async_handle_knx_event
+        self._xknx_handler: Callable[[Any], None] = self._handle_xknx_telegram
+        # Motsvarande index för detektorer i intagsläge xknx (GA som 16-bitars heltal)
+        self._xknx_index: HandlerIndex = {}
+        # Explicit xknx-instans (t.ex. en fejk i tester); annars KNX-integrationens
+        self._xknx_override = xknx
+        self._xknx: Any = None
+        self._xknx_callback: Any = None
+        self._xknx_sync_scheduled = False
+        # xknx-registreringar (GA, värde, hanterare, dpt, dubblettfönster), så att de kan flyttas till knx_event
+        self._xknx_registrations: Dict[int, Tuple[str, int, PressHandler, str, float]] = {}
+        # Avregistreringar för xknx-registreringar som flyttats till knx_event
+        self._moved_registrations: Dict[int, Callable[[], None]] = {}
+        self._registration_ids = itertools.count()
+        # Räknare per indexerad GA; behålls tills dispatchern stängs
+        self._ga_counters: Dict[GroupKey, GaCounters] = {}
+        # Tid från att knx_event skickades på bussen till att dispatchern fick det
+        self.intake_latency = LatencyHistogram()
+        # Dubblettfönster per GA: alla registrerade och det som gäller (största)
+        self._dedupe_windows: Dict[GroupKey, List[float]] = {}
+        self._ga_dedupe_window: Dict[GroupKey, float] = {}
+        # Ett filter per intagsväg, så att samma telegram via xknx och knx_event inte krockar
+        self._dedupe = TelegramDeduplicator(DEDUPE_MAX_ENTRIES)
+        self._xknx_dedupe = TelegramDeduplicator(DEDUPE_MAX_ENTRIES)
+        # GA som vi själva har registrerat hos KNX-integrationen
+        self._registered_event_addresses: Set[str] = set()
+        # Bevakade GA som redan var registrerade av någon annan; lämnas orörda
+        self._external_event_addresses: Set[str] = set()
+        # Samlar ihop ändringar (t.ex. alla entries vid uppstart) till ett anrop
+        self._event_register_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=EVENT_REGISTER_COOLDOWN_SECONDS,
+            immediate=False,
+            function=self._async_sync_knx_event_registration,
+        )
+
+    @property
+    def group_addresses(self) -> List[str]:
+        """Alla gruppadresser som minst en detektor lyssnar på."""
+        xknx_addresses = [format_group_address(ga) for ga in self._xknx_index]
+        return list(self._index) + [ga for ga in xknx_addresses if ga not in self._index]
+
+    @callback
+    def async_register(
+        self,
+        group_address: str,
+        value: int,
+        handler: PressHandler,
+        intake_mode: str = INTAKE_MODE_EVENT_BUS,
+        dpt: str = DPT_AUTO,
+        dedupe_window: float = 0.0,
+    ) -> Callable[[], None]:
+        """Registrerar en hanterare för (GA, värde) tolkat enligt dpt. Returnerar avregistrering."""
+        if intake_mode == INTAKE_MODE_XKNX:
+            xknx_address = parse_group_address(group_address)
+            if xknx_address is None:
+                _LOGGER.warning(
+                    "Ogiltig gruppadress %s för intagsläge xknx, faller tillbaka till knx_event.", group_address
+                )
+            elif self._async_get_xknx() is None:
+                _LOGGER.warning(
+                    "xknx-instansen är inte tillgänglig för GA %s, faller tillbaka till knx_event.",
+                    group_address,
+                )
+            else:
+                return self._async_register_xknx(
+                    group_address, xknx_address, value, handler, dpt, dedupe_window
+                )
+        return self._async_register_event(group_address, value, handler, dpt, dedupe_window)
+
+    @callback
+    def _async_register_xknx(
+        self,
+        group_address: str,
+        xknx_address: int,
+        value: int,
+        handler: PressHandler,
+        dpt: str,
+        dedupe_window: float,
+    ) -> Callable[[], None]:
+        registration_id = next(self._registration_ids)
+        self._xknx_registrations[registration_id] = (group_address, value, handler, dpt, dedupe_window)
+        payload_decoder = payload_value_decoder(dpt)
+        self._xknx_index.setdefault(xknx_address, {}).setdefault(payload_decoder, {}).setdefault(
+            value, []
+        ).append(handler)
+        self._ga_counters.setdefault(xknx_address, GaCounters())
+        self._async_add_dedupe_window(xknx_address, dedupe_window)
+        _LOGGER.debug("Dispatcher: registrerade xknx-hanterare för GA %s, värde %s.", group_address, value)
+        self._async_schedule_xknx_sync()
+
+        @callback
+        def _async_unregister_xknx() -> None:
+            if self._xknx_registrations.pop(registration_id, None) is None:
+                # Flyttad till knx_event när xknx försvann
+                if (unregister := self._moved_registrations.pop(registration_id, None)) is not None:
+                    unregister()
+                return
+            if _remove_handler(self._xknx_index, xknx_address, payload_decoder, value, handler):
+                self._async_remove_dedupe_window(xknx_address, dedupe_window)
+                self._async_schedule_xknx_sync()
+
+        return _async_unregister_xknx
+
+    @callback
+    def _async_register_event(
+        self, group_address: str, value: int, handler: PressHandler, dpt: str, dedupe_window: float
+    ) -> Callable[[], None]:
+        event_decoder = event_value_decoder(dpt)
+        self._index.setdefault(group_address, {}).setdefault(event_decoder, {}).setdefault(value, []).append(handler)
+        self._ga_counters.setdefault(group_address, GaCounters())
+        self._async_add_dedupe_window(group_address, dedupe_window)
+        _LOGGER.debug("Dispatcher: registrerade hanterare för GA %s, värde %s.", group_address, value)
+        self._async_update_bus_listener()
+        if (
+            group_address not in self._registered_event_addresses
+            and group_address not in self._external_event_addresses
+        ):
+            self._event_register_debouncer.async_schedule_call()
+
+        @callback
+        def _async_unregister() -> None:
+            if _remove_handler(self._index, group_address, event_decoder, value, handler):
+                self._async_remove_dedupe_window(group_address, dedupe_window)
+                if group_address not in self._index:
+                    self._event_register_debouncer.async_schedule_call()
+                self._async_update_bus_listener()
+
+        return _async_unregister
+
+    @callback
+    def _async_move_xknx_to_event_bus(self) -> None:
+        """Flyttar alla xknx-registreringar till knx_event-indexet."""
+        registrations, self._xknx_registrations = self._xknx_registrations, {}
+        for xknx_address in self._xknx_index:
+            self._dedupe_windows.pop(xknx_address, None)
+            self._ga_dedupe_window.pop(xknx_address, None)
+        self._xknx_index.clear()
+        self._xknx_dedupe.clear()
+        for registration_id, (group_address, value, handler, dpt, dedupe_window) in registrations.items():
+            # Detektorernas statistik pekar på räknarna; de följer med till knx_event-nyckeln
+            if (counters := self._ga_counters.pop(parse_group_address(group_address), None)) is not None:
+                self._ga_counters.setdefault(group_address, counters)
+            self._moved_registrations[registration_id] = self._async_register_event(
+                group_address, value, handler, dpt, dedupe_window
+            )
+
+    @callback
+    def _async_add_dedupe_window(self, group_address: GroupKey, window: float) -> None:
+        windows = self._dedupe_windows.setdefault(group_address, [])
+        windows.append(window)
+        self._ga_dedupe_window[group_address] = max(windows)
+
+    @callback
+    def _async_remove_dedupe_window(self, group_address: GroupKey, window: float) -> None:
+        windows = self._dedupe_windows.get(group_address)
+        if windows is None or window not in windows:
+            return
+        windows.remove(window)
+        if windows:
+            self._ga_dedupe_window[group_address] = max(windows)
+        else:
+            del self._dedupe_windows[group_address]
+            del self._ga_dedupe_window[group_address]
+
+    @callback
+    def async_ga_counters(self, group_address: str) -> Optional[GaCounters]:
+        """Räknarna för en GA, oavsett om den ligger i knx_event- eller xknx-indexet."""
+        counters = self._ga_counters.get(group_address)
+        if counters is None and (xknx_address := self._async_xknx_address(group_address)) is not None:
+            counters = self._ga_counters.get(xknx_address)
+        return counters
+
+    @callback
+    def async_diagnostics(self) -> Dict[str, Any]:
+        """Dispatcherns tillstånd för diagnostiknedladdningen."""
+        return {
+            "event_bus_group_addresses": sorted(self._index),
+            "xknx_group_addresses": [format_group_address(ga) for ga in sorted(self._xknx_index)],
+            "xknx_callback_registered": self._xknx_callback is not None,
+            "registered_event_addresses": sorted(self._registered_event_addresses),
+            "external_event_addresses": sorted(self._external_event_addresses),
+            "intake_latency": self.intake_latency.as_dict(),
+            "dedupe_windows": dict(sorted(
+                (_group_label(ga), window) for ga, window in self._ga_dedupe_window.items()
+            )),
+            "duplicates": {
+                INTAKE_MODE_EVENT_BUS: self._dedupe.as_dict(),
+                INTAKE_MODE_XKNX: self._xknx_dedupe.as_dict(),
+            },
+            "group_address_counters": {
+                label: counters.as_dict()
+                for label, counters in sorted(
+                    ((_group_label(ga), c) for ga, c in self._ga_counters.items()), key=lambda item: item[0]
+                )
+            },
+        }
+
+    @callback
+    def _async_get_xknx(self) -> Any:
+        """Returnerar xknx-instansen om den går att nå, annars None."""
+        if self._xknx_override is not None:
+            return self._xknx_override
+        return getattr(self.hass.data.get(KNX_DOMAIN), "xknx", None)
+
+    @callback
+    def _async_xknx_address(self, group_address: str) -> Optional[int]:
+        """GA som 16-bitars heltal, None om xknx saknas eller GA är ogiltig."""
+        if self._async_get_xknx() is None:
+            return None
+        return parse_group_address(group_address)
+
+    @callback
+    def _async_schedule_xknx_sync(self) -> None:
+        """Samlar ändringar inom samma loop-varv till en omregistrering."""
+        if not self._xknx_sync_scheduled:
+            self._xknx_sync_scheduled = True
+            self.hass.loop.call_soon(self._async_sync_xknx_callback)
+
+    @callback
+    def _async_sync_xknx_callback(self) -> None:
+        """Registrerar om telegram-callbacken med aktuellt GA-filter."""
+        self._xknx_sync_scheduled = False
+        if self._xknx is not None and self._xknx_callback is not None:
+            self._xknx.telegram_queue.unregister_telegram_received_cb(self._xknx_callback)
+            self._xknx = None
+            self._xknx_callback = None
+        if not self._xknx_index:
+            return
+        xknx = self._async_get_xknx()
+        if xknx is None:
+            _LOGGER.warning(
+                "xknx-instansen försvann, %d GA i intagsläge xknx tar emot telegram via knx_event i stället.",
+                len(self._xknx_index),
+            )
+            self._async_move_xknx_to_event_bus()
+            return
+        from xknx.telegram import GroupAddress
+
+        self._xknx = xknx
+        self._xknx_callback = xknx.telegram_queue.register_telegram_received_cb(
+            self._xknx_handler,
+            group_addresses=[GroupAddress(ga) for ga in self._xknx_index],
+        )
+        _LOGGER.debug("Dispatcher: xknx-callback registrerad för %d GA.", len(self._xknx_index))
+
+    @callback
+    def _async_update_bus_listener(self) -> None:
+        """Lyssnar på bussen bara så länge indexet innehåller något."""
+        if self._index and self._remove_bus_listener is None:
+            self._remove_bus_listener = self.hass.bus.async_listen(
+                "knx_event", self._event_handler
+            )
+            _LOGGER.debug("Dispatcher: började lyssna på knx_event.")
+        elif not self._index and self._remove_bus_listener is not None:
+            self._remove_bus_listener()
+            self._remove_bus_listener = None
+            _LOGGER.debug("Dispatcher: slutade lyssna på knx_event.")
+
+    @callback
+    def async_set_profiler(self, profiler: Optional[ScopedProfiler]) -> None:
+        """Registrerar om lyssnarna med (eller utan) profilerade omslag."""
+        if profiler is None:
+            self._event_handler = self._async_handle_knx_event
+            self._xknx_handler = self._handle_xknx_telegram
+        else:
+            self._event_handler = profiler.wrap_callback(self._async_handle_knx_event, SCOPE_EVENT)
+            self._xknx_handler = profiler.wrap_callback(self._handle_xknx_telegram, SCOPE_EVENT)
+        if self._remove_bus_listener is not None:
+            self._remove_bus_listener()
+            self._remove_bus_listener = None
+            self._async_update_bus_listener()
+        if self._xknx_callback is not None:
+            self._async_sync_xknx_callback()
+
+    @callback
+    def _async_existing_event_addresses(self, addresses: Set[str]) -> Set[str]:
+        """De av addresses som KNX-integrationen redan skickar knx_event för via event_register.
+
+        Adresser från KNX-integrationens egen event-konfiguration är adressfilter
+        och påverkas inte av event_register, så de behöver inte räknas in.
+        """
+        event_callback = getattr(self.hass.data.get(KNX_DOMAIN), "knx_event_callback", None)
+        registered = getattr(event_callback, "group_addresses", None)
+        if not registered:
+            return set()
+        registered_raw = {getattr(ga, "raw", None) for ga in registered}
+        return {ga for ga in addresses if parse_group_address(ga) in registered_raw}
+
+    async def _async_sync_knx_event_registration(self) -> None:
+        """Synkar GA-registreringen hos KNX-integrationen mot indexet.
+
+        Bara GA som vi själva lagt till avregistreras. En GA som redan var
+        registrerad när den började bevakas lämnas åt den som registrerade den.
+        """
+        wanted = set(self._index)
+        self._external_event_addresses &= wanted
+        to_add = wanted - self._registered_event_addresses - self._external_event_addresses
+        if to_add:
+            external = self._async_existing_event_addresses(to_add)
+            self._external_event_addresses |= external
+            to_add -= external
+        to_remove = self._registered_event_addresses - wanted
+        if not to_add and not to_remove:
+            return
+
+        if not self.hass.services.has_service(KNX_DOMAIN, KNX_SERVICE_EVENT_REGISTER):
+            _LOGGER.warning(
+                "Tjänsten %s.%s finns inte. knx_event måste då konfigureras manuellt "
+                "i KNX-integrationen för gruppadresserna: %s",
+                KNX_DOMAIN, KNX_SERVICE_EVENT_REGISTER, ", ".join(sorted(wanted)),
+            )
+            return
+
+        try:
+            if to_remove:
+                await self.hass.services.async_call(
+                    KNX_DOMAIN,
+                    KNX_SERVICE_EVENT_REGISTER,
+                    {KNX_ATTR_ADDRESS: sorted(to_remove), KNX_ATTR_REMOVE: True},
+                    blocking=True,
+                )
+                self._registered_event_addresses -= to_remove
+            if to_add:
+                await self.hass.services.async_call(
+                    KNX_DOMAIN,
+                    KNX_SERVICE_EVENT_REGISTER,
+                    {KNX_ATTR_ADDRESS: sorted(to_add)},
+                    blocking=True,
+                )
+                self._registered_event_addresses |= to_add
+        except (HomeAssistantError, vol.Invalid) as e:
+            _LOGGER.error("Kunde inte registrera gruppadresser för knx_event hos KNX-integrationen: %s", e)
+            return
+
+        _LOGGER.debug(
+            "Dispatcher: knx_event registrerat för %d GA (+%d, -%d).",
+            len(self._registered_event_addresses), len(to_add), len(to_remove),
+        )
+
+    async def async_shutdown(self) -> None:
+        """Tar bort lyssnarna, tömmer indexen och avregistrerar alla GA."""
+        self._index.clear()
+        self._xknx_index.clear()
+        self._xknx_registrations.clear()
+        self._moved_registrations.clear()
+        self._dedupe_windows.clear()
+        self._ga_dedupe_window.clear()
+        self._dedupe.clear()
+        self._xknx_dedupe.clear()
+        self._async_sync_xknx_callback()
+        self._async_update_bus_listener()
+        self._event_register_debouncer.async_cancel()
+        await self._async_sync_knx_event_registration()
+        self._event_register_debouncer.async_shutdown()
+
+    @callback
+    def _async_handle_knx_event(self, event: Event) -> None:
+        """Hanterar ett knx_event: uppslag på GA först, värdet tolkas bara vid träff."""
+        group_address = event.data.get("destination")
+        decoders = self._index.get(group_address)
+        if decoders is None:
+            return
+        # Ankomsttiden i loop-tid räknas om en gång här: busslaggen dras av så
+        # att klassificeraren mäter tiden mellan telegrammen, inte mellan anropen
+        lag = max(time.time() - event.time_fired_timestamp, 0.0)
+        received = self.hass.loop.time() - lag
+        self.intake_latency.record(lag)
+        counters = self._ga_counters[group_address]
+        counters.seen += 1
+        window = self._ga_dedupe_window.get(group_address)
+        if window and self._dedupe.is_duplicate(
+            event.data.get("source"), group_address, event.data.get("data"), received, window
+        ):
+            counters.duplicates += 1
+            return
+        self._async_dispatch(decoders, event.data, counters, received)
+
+    @callback
+    def _handle_xknx_telegram(self, telegram: Any) -> None:
+        """Hanterar ett telegram direkt från xknx, utan knx_event på bussen."""
+        group_address = telegram.destination_address.raw
+        decoders = self._xknx_index.get(group_address)
+        if decoders is None:
+            return
+        received = self.hass.loop.time()
+        counters = self._ga_counters[group_address]
+        counters.seen += 1
+        # GroupValueWrite/GroupValueResponse har .value (DPTBinary/DPTArray), Read saknar värde
+        payload_value = getattr(telegram.payload, "value", None)
+        if payload_value is None:
+            return
+        window = self._ga_dedupe_window.get(group_address)
+        if window and self._xknx_dedupe.is_duplicate(
+            telegram.source_address.raw, group_address, payload_value.value, received, window
+        ):
+            counters.duplicates += 1
+            return
+        self._async_dispatch(decoders, payload_value.value, counters, received)
+
+    @staticmethod
+    def _async_dispatch(
+        decoders: Dict[ValueDecoder, Dict[int, List[PressHandler]]],
+        payload: Any,
+        counters: GaCounters,
+        received: float,
+    ) -> None:
+        """Avkodar payload en gång per avkodare på GA:n och anropar matchande hanterare."""
+        matched = False
+        # Kopior så att en hanterare kan avregistrera sig under iterationen
+        for decode, values in tuple(decoders.items()):
+            comparable_value = decode(payload)
+            if comparable_value is None:
+                continue
+            handlers = values.get(comparable_value)
+            if handlers is None:
+                continue
+            matched = True
+            for handler in tuple(handlers):
+                handler(comparable_value, received)
+        if matched:
+            counters.matched += 1
+
+
+def _group_label(group_address: GroupKey) -> str:
+    return group_address if isinstance(group_address, str) else format_group_address(group_address)
+
+
+def _remove_handler(
+    index: HandlerIndex, group_address: GroupKey, decoder: ValueDecoder, value: int, handler: PressHandler
+) -> bool:
+    """Tar bort en hanterare ur ett index. Returnerar True om något togs bort."""
+    decoders = index.get(group_address)
+    if decoders is None:
+        return False
+    values = decoders.get(decoder)
+    if values is None:
+        return False
+    handlers = values.get(value)
+    if handlers is None or handler not in handlers:
+        return False
+    handlers.remove(handler)
+    if not handlers:
+        del values[value]
+    if not values:
+        del decoders[decoder]
+    if not decoders:
+        del index[group_address]
+    _LOGGER.debug("Dispatcher: avregistrerade hanterare för GA %s, värde %s.", group_address, value)
+    return True
+
+
+@callback
+def async_get_dispatcher(hass: HomeAssistant) -> KnxDoubleClickDispatcher:
+    """Hämtar (eller skapar) integrationens gemensamma dispatcher."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    dispatcher: Optional[KnxDoubleClickDispatcher] = domain_data.get(DATA_DISPATCHER)
+    if dispatcher is None:
+        dispatcher = KnxDoubleClickDispatcher(hass, domain_data.get(DATA_XKNX))
+        domain_data[DATA_DISPATCHER] = dispatcher
+        if (profiler := domain_data.get(DATA_PROFILER)) is not None:
+            dispatcher.async_set_profiler(profiler)
+    return dispatcher
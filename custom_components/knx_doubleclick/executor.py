@@ -0,0 +1,121 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Importerna sorterade (ruff I001).
+#
+# Version: 0.9.8
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: en begränsad exekverare per detektor. Detekteringen lämnar bara
+#   över en körning hit och väntar aldrig på att åtgärderna blir klara.
+
+"""Exekverare för åtgärdskörningar per detektor i KNX Dubbelklicksdetektor."""
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Callable, Coroutine, Deque, Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DEFAULT_MAX_QUEUE_DEPTH,
+    DEFAULT_OVERLAP_POLICY,
+    OVERLAP_POLICY_QUEUE,
+    OVERLAP_POLICY_RESTART,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Fabrik som skapar en ny körning när det är dess tur
+RunFactory = Callable[[], Coroutine[Any, Any, None]]
+
+
+class ActionExecutor:
+    """Kör högst en åtgärdskörning åt gången enligt vald överlappspolicy.
+
+    drop:    en ny körning medan en annan pågår kastas.
+    queue:   ny körning ställs i kö, högst max_depth väntande; fler kastas.
+    restart: pågående körning avbryts, väntande kastas och den nya startas.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        overlap_policy: str = DEFAULT_OVERLAP_POLICY,
+        max_depth: int = DEFAULT_MAX_QUEUE_DEPTH,
+    ) -> None:
+        self.hass = hass
+        self.name = name
+        self.overlap_policy = overlap_policy
+        self.max_depth = max_depth
+        self._task: Optional[asyncio.Task] = None
+        self._queue: Deque[RunFactory] = deque()
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None
+
+    @callback
+    def async_configure(self, overlap_policy: str, max_depth: int) -> None:
+        """Uppdaterar policy och ködjup; gäller från nästa inskickade körning."""
+        self.overlap_policy = overlap_policy
+        self.max_depth = max_depth
+        while len(self._queue) > max_depth:
+            self._queue.pop()
+
+    @callback
+    def async_submit(self, run: RunFactory) -> bool:
+        """Lämnar över en körning. Returnerar False om den kastades."""
+        if self._task is None:
+            self._async_start(run)
+            return True
+
+        if self.overlap_policy == OVERLAP_POLICY_RESTART:
+            self._queue.clear()
+            task = self._task
+            self._task = None
+            task.cancel()
+            self._async_start(run)
+            return True
+
+        if self.overlap_policy == OVERLAP_POLICY_QUEUE and len(self._queue) < self.max_depth:
+            self._queue.append(run)
+            return True
+
+        _LOGGER.debug("Åtgärder för %s körs redan, ny körning kastas (policy: %s).", self.name, self.overlap_policy)
+        return False
+
+    @callback
+    def _async_start(self, run: RunFactory) -> None:
+        task = self.hass.async_create_background_task(
+            run(), f"knx_doubleclick actions {self.name}"
+        )
+        self._task = task
+        task.add_done_callback(self._async_run_done)
+
+    @callback
+    def _async_run_done(self, task: asyncio.Task) -> None:
+        if task is not self._task:
+            # Avbruten av restart; efterträdaren är redan startad
+            return
+        self._task = None
+        if not task.cancelled() and (exc := task.exception()) is not None:
+            _LOGGER.error("Oväntat fel i åtgärdskörning för %s: %s", self.name, exc)
+        if self._queue:
+            self._async_start(self._queue.popleft())
+
+    async def async_shutdown(self) -> None:
+        """Kastar väntande körningar och avbryter en pågående."""
+        self._queue.clear()
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,197 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Gruppadresser kontrolleras med parse_group_address, så att t.ex.
+#   "1/9/300" hoppas över i stället för att bli en knapp som aldrig matchar.
+# - Importerna sorterade (ruff I001).
+#
+# Version: 0.9.16
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: tolkar knapptabeller för hubbläget från CSV (egen tabell eller
+#   ETS-export av gruppadresser) och ETS XML-export, och slår ihop dem med
+#   hubbens befintliga knappar. Ren Python utan beroenden till Home Assistant.
+
+"""Import av knappar till en hubb i KNX Dubbelklicksdetektor."""
+import csv
+import io
+import re
+import uuid
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .const import (
+    CONF_ACTIONS_FILE,
+    CONF_BUTTON_ID,
+    CONF_DOUBLE_CLICK_WINDOW_SECONDS,
+    CONF_KNX_GROUP_ADDRESS,
+    CONF_KNX_VALUE,
+    CONF_NAME_SUFFIX,
+)
+from .detector import parse_group_address
+
+# Huvudtypen i "DPST-1-1", "DPT-1" eller "1.001"
+_DPT_MAIN_RE = re.compile(r"^(?:DPST-|DPT-)?(\d+)(?:[-.]\d+)?$", re.IGNORECASE)
+
+_NAME_COLUMNS = ("name", "group name", "namn", "name_suffix")
+_ADDRESS_COLUMNS = ("group_address", "group address", "knx_group_address", "address", "ga", "adress", "gruppadress")
+_VALUE_COLUMNS = ("value", "knx_value", "värde")
+_WINDOW_COLUMNS = ("window", "double_click_window_seconds", "fönster")
+_ACTIONS_COLUMNS = ("actions_file", "actions", "åtgärdsfil")
+_DPT_COLUMNS = ("datapointtype", "dpt", "dpts", "datapoint type")
+
+
+class InvalidButtonImport(Exception):
+    """Importen kunde inte tolkas alls."""
+
+
+@dataclass
+class ButtonImport:
+    """Resultatet av en tolkad import."""
+
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    # Rader utan giltig gruppadress eller med en DPT som inte är 1.x
+    skipped: int = 0
+
+
+def new_button_id() -> str:
+    return uuid.uuid4().hex[:8]
+
+
+def _is_switch_dpt(dpt: str) -> bool:
+    """Sant om DPT saknas eller är av huvudtyp 1 (DPST-1-1, DPT-1, 1.001 ...)."""
+    dpt = dpt.strip()
+    if not dpt:
+        return True
+    match = _DPT_MAIN_RE.match(dpt.split(",")[0].strip())
+    return match is not None and int(match.group(1)) == 1
+
+
+def _column(header: Sequence[str], candidates: Sequence[str]) -> Optional[int]:
+    for candidate in candidates:
+        if candidate in header:
+            return header.index(candidate)
+    return None
+
+
+def _row(
+    name: str, address: str, value: str, window: str, actions_file: Optional[str], default_value: int
+) -> Dict[str, Any]:
+    """En knapprad. Fönstret tas bara med om det anges; annars gäller hubbens."""
+    try:
+        knx_value = int(value) if value else default_value
+    except ValueError as err:
+        raise InvalidButtonImport(f"Ogiltigt värde '{value}' för {address}") from err
+    row: Dict[str, Any] = {
+        CONF_NAME_SUFFIX: name.strip() or address,
+        CONF_KNX_GROUP_ADDRESS: address,
+        CONF_KNX_VALUE: knx_value,
+    }
+    if window:
+        try:
+            row[CONF_DOUBLE_CLICK_WINDOW_SECONDS] = float(window.replace(",", "."))
+        except ValueError as err:
+            raise InvalidButtonImport(f"Ogiltigt fönster '{window}' för {address}") from err
+    if actions_file and actions_file.strip():
+        row[CONF_ACTIONS_FILE] = actions_file.strip()
+    return row
+
+
+def _parse_csv(text: str, default_value: int) -> ButtonImport:
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(io.StringIO(text), dialect)
+    raw_header = next(reader, None)
+    if raw_header is None:
+        raise InvalidButtonImport("Tom import")
+    header = [column.strip().strip('"').lower() for column in raw_header]
+    address_col = _column(header, _ADDRESS_COLUMNS)
+    if address_col is None:
+        raise InvalidButtonImport(f"Hittar ingen kolumn för gruppadress i {raw_header}")
+    name_col = _column(header, _NAME_COLUMNS)
+    value_col = _column(header, _VALUE_COLUMNS)
+    window_col = _column(header, _WINDOW_COLUMNS)
+    actions_col = _column(header, _ACTIONS_COLUMNS)
+    dpt_col = _column(header, _DPT_COLUMNS)
+
+    def cell(row: List[str], index: Optional[int]) -> str:
+        return row[index].strip() if index is not None and index < len(row) else ""
+
+    result = ButtonImport()
+    for raw_row in reader:
+        if not any(part.strip() for part in raw_row):
+            continue
+        address = cell(raw_row, address_col)
+        # Intervallrader i ETS-exporten ("1/-/-") är inga gruppadresser och hoppas över
+        if parse_group_address(address) is None or not _is_switch_dpt(cell(raw_row, dpt_col)):
+            result.skipped += 1
+            continue
+        result.rows.append(
+            _row(
+                cell(raw_row, name_col), address, cell(raw_row, value_col), cell(raw_row, window_col),
+                cell(raw_row, actions_col), default_value,
+            )
+        )
+    return result
+
+
+def _parse_ets_xml(text: str, default_value: int) -> ButtonImport:
+    try:
+        root = ET.fromstring(text)
+    except ET.ParseError as err:
+        raise InvalidButtonImport(f"Ogiltig XML: {err}") from err
+    result = ButtonImport()
+    for element in root.iter():
+        # Namnrymden varierar mellan ETS-versioner; jämför bara det lokala namnet
+        if element.tag.rsplit("}", 1)[-1] != "GroupAddress":
+            continue
+        address = element.get("Address", "").strip()
+        if parse_group_address(address) is None or not _is_switch_dpt(element.get("DPTs", "")):
+            result.skipped += 1
+            continue
+        result.rows.append(
+            _row(element.get("Name", ""), address, "", "", None, default_value)
+        )
+    return result
+
+
+def parse_button_import(text: str, default_value: int) -> ButtonImport:
+    """Tolkar en knapptabell (CSV) eller en ETS-export (CSV eller XML)."""
+    text = text.lstrip("\ufeff").strip()
+    if not text:
+        raise InvalidButtonImport("Tom import")
+    if text.startswith("<"):
+        return _parse_ets_xml(text, default_value)
+    return _parse_csv(text, default_value)
+
+
+def merge_buttons(
+    existing: List[Dict[str, Any]], imported: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], int, int]:
+    """Slår ihop importerade rader med befintliga, nyckel (GA, värde).
+
+    Befintliga knappar behåller sitt id (och därmed entiteter och åtgärdsfil)
+    men får namn, fönster och åtgärdsfil från importen. Returnerar
+    (nya tabellen, antal tillagda, antal uppdaterade).
+    """
+    buttons = [dict(row) for row in existing]
+    by_key = {(row[CONF_KNX_GROUP_ADDRESS], row[CONF_KNX_VALUE]): row for row in buttons}
+    added = updated = 0
+    for row in imported:
+        key = (row[CONF_KNX_GROUP_ADDRESS], row[CONF_KNX_VALUE])
+        current = by_key.get(key)
+        if current is None:
+            new_row = {CONF_BUTTON_ID: new_button_id(), **row}
+            buttons.append(new_row)
+            by_key[key] = new_row
+            added += 1
+        elif any(current.get(name) != value for name, value in row.items()):
+            current.update(row)
+            updated += 1
+    return buttons, added, updated
@@ -0,0 +1,266 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - _drive skickar bara vidare avbrott (CancelledError) in i korutinen.
+#   Stängs omslaget, eller kastas något annat in, stängs korutinen och
+#   felet går vidare.
+# - Importerna sorterade (ruff I001).
+#
+# Version: 0.9.22
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: profilering på begäran (tjänsten knx_doubleclick.profile).
+#   cProfile slås bara på inne i integrationens egna ingångar: hanteringen
+#   av telegram, inläsning av åtgärdsfiler och körning av åtgärder. Utan
+#   pågående profilering finns inga omslag i dessa vägar.
+
+"""Profilering på begäran för KNX Dubbelklicksdetektor.
+
+Från Python 3.12 finns bara en aktiv cProfile åt gången i processen, och
+den registrerar anrop i alla trådar. En enda profil delas därför av
+event-loopen och executor-jobben; den är påslagen så länge någon ingång
+körs. Annat arbete som råkar köras samtidigt i andra trådar kommer med,
+men ingångarna är korta och det syns tydligt i sammanfattningen.
+"""
+import asyncio
+import cProfile
+import logging
+import pstats
+import threading
+import types
+from collections import Counter
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    TypeVar,
+)
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.util import dt as dt_util
+
+from .const import DATA_DISPATCHER, DATA_PROFILER, DOMAIN, PROFILE_FILE_PREFIX
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Ingångarna som profileras
+SCOPE_EVENT = "event"
+SCOPE_LOAD = "load"
+SCOPE_ACTION = "action"
+SCOPE_EXECUTOR = "executor"
+
+# pstats-nyckel per sorteringsordning i svaret
+_SORT_INDEX = {"calls": 1, "tottime": 2, "cumulative": 3}
+
+
+class ScopedProfiler:
+    """En cProfile som bara är påslagen medan en profilerad ingång körs.
+
+    Ingångar kan vara nästlade (en gest som avgörs i telegramhanteringen
+    startar sin åtgärd direkt); profilen slås på i den yttersta och av när
+    den sista lämnas. Djupet skyddas av ett lås eftersom executor-jobb
+    kommer in från andra trådar.
+    """
+
+    def __init__(self) -> None:
+        self._profile = cProfile.Profile()
+        self._lock = threading.Lock()
+        self._depth = 0
+        self.active = False
+        # Antal körda ingångar per typ
+        self.scopes: Counter = Counter()
+
+    def start(self) -> None:
+        """Kastar ValueError om en annan profilerare redan är aktiv."""
+        self._profile.enable()
+        self._profile.disable()
+        self.active = True
+
+    def stop(self) -> None:
+        with self._lock:
+            self.active = False
+            if self._depth:
+                # Ett executor-jobb pågår; dess _exit stänger inte av igen
+                self._profile.disable()
+
+    def _enter(self, scope: str) -> bool:
+        with self._lock:
+            if not self.active:
+                return False
+            if self._depth == 0:
+                try:
+                    self._profile.enable()
+                except ValueError:
+                    # T.ex. Home Assistants profiler-integration startades under tiden
+                    return False
+            self._depth += 1
+            self.scopes[scope] += 1
+            return True
+
+    def _exit(self) -> None:
+        with self._lock:
+            self._depth -= 1
+            if self._depth == 0 and self.active:
+                self._profile.disable()
+
+    def wrap_callback(self, func: Callable[..., _T], scope: str) -> Callable[..., _T]:
+        """Omslag för en callback i event-loopen."""
+
+        @callback
+        def _profiled(*args: Any) -> _T:
+            if not self._enter(scope):
+                return func(*args)
+            try:
+                return func(*args)
+            finally:
+                self._exit()
+
+        return _profiled
+
+    def wrap_job(self, func: Callable[..., _T]) -> Callable[..., _T]:
+        """Omslag för ett executor-jobb."""
+
+        def _profiled(*args: Any) -> _T:
+            if not self._enter(SCOPE_EXECUTOR):
+                return func(*args)
+            try:
+                return func(*args)
+            finally:
+                self._exit()
+
+        return _profiled
+
+    def wrap_coroutine_function(
+        self, func: Callable[[], Coroutine[Any, Any, _T]], scope: str
+    ) -> Callable[[], Coroutine[Any, Any, _T]]:
+        """Omslag för en fabrik av korutiner, t.ex. en körning i exekveraren."""
+
+        def _profiled() -> Coroutine[Any, Any, _T]:
+            return self.async_run_coroutine(func(), scope)
+
+        return _profiled
+
+    async def async_run_coroutine(self, coro: Coroutine[Any, Any, _T], scope: str) -> _T:
+        """Kör korutinen med profilen påslagen i varje steg, men inte medan den väntar."""
+        return await self._drive(coro, scope)
+
+    @types.coroutine
+    def _drive(self, coro: Coroutine[Any, Any, _T], scope: str) -> Generator[Any, Any, _T]:
+        value: Any = None
+        error: Optional[BaseException] = None
+        while True:
+            entered = self._enter(scope)
+            try:
+                if error is None:
+                    yielded = coro.send(value)
+                else:
+                    yielded = coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                if entered:
+                    self._exit()
+            try:
+                value, error = (yield yielded), None
+            except asyncio.CancelledError as e:
+                # Avbrott skickas vidare in i korutinen vid nästa steg
+                value, error = None, e
+            except BaseException:
+                # GeneratorExit (close()) eller annat som kastas in: korutinen stängs och felet går vidare
+                coro.close()
+                raise
+
+    def dump(self, path: str, top: int, sort: str) -> Dict[str, Any]:
+        """Körs i executor. Sparar profilen och sammanfattar de top dyraste funktionerna."""
+        summary: Dict[str, Any] = {
+            "file": None,
+            "scopes": dict(self.scopes),
+            "total_calls": 0,
+            "total_seconds": 0.0,
+            "functions": [],
+        }
+        if not self.scopes:
+            # Inga telegram, inläsningar eller körningar under tiden
+            return summary
+        stats = pstats.Stats(self._profile)
+        stats.dump_stats(path)
+        summary["file"] = path
+        summary["total_calls"] = stats.total_calls
+        summary["total_seconds"] = round(stats.total_tt, 6)
+        stats.strip_dirs()
+        index = _SORT_INDEX[sort]
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][index], reverse=True)[:top]
+        functions: List[Dict[str, Any]] = []
+        for func, (primitive_calls, calls, total, cumulative, _callers) in rows:
+            functions.append(
+                {
+                    "function": pstats.func_std_string(func),
+                    "calls": calls,
+                    "primitive_calls": primitive_calls,
+                    "total_ms": round(total * 1000, 3),
+                    "cumulative_ms": round(cumulative * 1000, 3),
+                }
+            )
+        summary["functions"] = functions
+        return summary
+
+
+@callback
+def async_get_profiler(hass: HomeAssistant) -> Optional[ScopedProfiler]:
+    """Den pågående profileringen, eller None."""
+    domain_data = hass.data.get(DOMAIN)
+    return domain_data.get(DATA_PROFILER) if domain_data is not None else None
+
+
+def async_add_executor_job(hass: HomeAssistant, target: Callable[..., _T], *args: Any) -> Awaitable[_T]:
+    """Som hass.async_add_executor_job, men jobbet profileras under en pågående profilering."""
+    if (profiler := async_get_profiler(hass)) is not None:
+        target = profiler.wrap_job(target)
+    return hass.async_add_executor_job(target, *args)
+
+
+async def async_profile(hass: HomeAssistant, seconds: float, top: int, sort: str) -> Dict[str, Any]:
+    """Profilerar integrationen i seconds sekunder och returnerar en sammanfattning.
+
+    Hela profilen sparas i konfigurationskatalogen för t.ex. snakeviz.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if domain_data.get(DATA_PROFILER) is not None:
+        raise ServiceValidationError("En profilering pågår redan.")
+    profiler = ScopedProfiler()
+    try:
+        profiler.start()
+    except ValueError as e:
+        raise HomeAssistantError(f"Kunde inte starta profileringen: {e}") from e
+
+    domain_data[DATA_PROFILER] = profiler
+    if (dispatcher := domain_data.get(DATA_DISPATCHER)) is not None:
+        dispatcher.async_set_profiler(profiler)
+    _LOGGER.info("Profilerar KNX Dubbelklicksdetektor i %s sekunder.", seconds)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+        domain_data.pop(DATA_PROFILER, None)
+        # Dispatchern kan ha bytts ut om sista entry laddades ur under tiden
+        if (dispatcher := domain_data.get(DATA_DISPATCHER)) is not None:
+            dispatcher.async_set_profiler(None)
+
+    path = hass.config.path(f"{PROFILE_FILE_PREFIX}{dt_util.now().strftime('%Y%m%d-%H%M%S')}.prof")
+    summary = await hass.async_add_executor_job(profiler.dump, path, top, sort)
+    _LOGGER.info(
+        "Profileringen klar: %d anrop, %.3f s. Profilen sparad i %s.",
+        summary["total_calls"], summary["total_seconds"], summary["file"],
+    )
+    return {"seconds": seconds, "sort": sort, **summary}
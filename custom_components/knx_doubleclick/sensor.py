@@ -1,4 +1,199 @@
 # Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Klassificeraren får telegrammets ankomsttid (received) från dispatchern
+#   i stället för loop-tiden när hanteraren råkar köras.
+# - De nio diagnostiksensorerna per detektor är ersatta av en
+#   sammanfattningssensor per config entry (summerad över alla knappar i
+#   en hubb). Värden per detektor finns i diagnostikfilen och via get_trace.
+#   Gamla diagnostiksensorer tas bort ur entitetsregistret vid uppstart.
+# - DetectorTable är borttagen: tiderna per tryck är vanliga attribut i
+#   sensorn (flyttal, None när de saknas), och klassificerarens tillstånd
+#   ligger kvar i GestureClassifier.
+# - Sammanfattningssensorn uppdateras i async_update på event-loopen; i
+#   update() lästes statistiken från en trådpool medan loopen ändrade den.
+# - Fönstret lärs bara in från tider mellan tryck i samma sekvens (dubbel-
+#   eller flerklick). Pauser efter enkelklick drog annars upp kvantilen och
+#   det automatiska fönstret mot maxgränsen.
+# - Tider strax utanför fönstret (upp till maxgränsen) skattas för sig. Är
+#   de fler än tiderna inom fönstret är fönstret för smalt och vidgas till
+#   deras median med marginal, så att den som trycker långsamt inte låses ute.
+#
+# Version: 0.9.25
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Tiden mellan tryck (upp till fönstrets maxgräns) matas till en
+#   strömmande kvantilskattning per detektor. Föreslaget fönster visas som
+#   attributet suggested_window_seconds, och med window_auto_tune byts
+#   fönstret på plats till förslaget, inom window_min/max_seconds.
+#
+# Version: 0.9.24
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Direkta serviceanrop kan slås ihop med andra detektorers likadana anrop
+#   inom ett kort fönster (option batch_window_seconds, 0 = av).
+#
+# Version: 0.9.22
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Körningen av en gests åtgärder profileras under en pågående
+#   knx_doubleclick.profile (slås upp en gång per gest, inte per telegram).
+#
+# Version: 0.9.21
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Tiderna per tryck (ankomst, tryck, tidsstämpel, intervall) ligger i den
+#   gemensamma DetectorTable som flyttal i stället för datetime-objekt i
+#   varje sensor. Sensorn läser sin rad och skapar datetime först när
+#   tillståndet skrivs eller en gest körs.
+#
+# Version: 0.9.20
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Dubblettfönstret (dedupe_window_seconds) skickas till dispatchern och
+#   lyssnaren registreras om när det ändras. Ny diagnostiksensor för
+#   bortfiltrerade dubbletter.
+#
+# Version: 0.9.19
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Datapunktstyp (knx_dpt) och flera värden per detektor. Varje värde har
+#   en egen GestureClassifier och registreras separat i dispatchern, och
+#   åtgärderna tas från värdets value_N-sektion när den finns. Släppet går
+#   till klassificeraren för senast tryckta värde.
+#
+# Version: 0.9.18
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Sensorn har ingen egen options-lyssnare längre; den registreras i
+#   DATA_DETECTORS och entryns lyssnare anropar async_apply_config. En
+#   pågående gestsekvens behålls när fönstret ändras och nollställs bara när
+#   GA eller värde ändras.
+#
+# Version: 0.9.17
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Åtgärdsfiler förbereds via den gemensamma ActionFilesLoader: saknade
+#   standardfiler skapas och alla filer läses och parsas i samma
+#   executor-jobb, för alla detektorer som sätts upp samtidigt. En hubb
+#   förbereder alla nya knappars filer i en batch.
+#
+# Version: 0.9.16
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Hubbläge: en config entry med en tabell av knappar. KnxDoubleClickHub
+#   skapar, uppdaterar och tar bort knapparnas entiteter när tabellen ändras,
+#   utan att entry laddas om. Sensorn tar sin konfiguration som en dict
+#   (async_apply_config) och kan tillhöra en knapp i en hubb.
+#
+# Version: 0.9.13
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Tillståndsskrivningar samlas ihop inom ett konfigurerbart intervall
+#   (_async_schedule_write) i stället för en skrivning per tryck.
+# - Statiska och redundanta attribut markeras som ej inspelade (recorder).
+# - Option för att bara uppdatera tidsstämpeln när en gest avgjorts.
+#
+# Version: 0.9.12
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Loggning per telegram ersatt av en samplad ringbuffert (TraceBuffer) med
+#   kompakta poster för tryck, släpp, gester, körningar och avvisningar.
+#   Klickvägen formaterar inga strängar; gest- och körloggar är nu debug.
+#
+# Version: 0.9.11
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Mätning med loopens monotona klocka från telegram till avgjord gest och
+#   till klara åtgärder, samt räknare (matchade telegram, gester, misslyckade
+#   åtgärder, avvisade körningar) i DetectorStats.
+# - Diagnostiksensorer (avstängda som standard) som läser statistiken var
+#   30:e sekund.
+#
+# Version: 0.9.10
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Trycken klassificeras av en GestureClassifier per detektor (single,
+#   double, triple, click_N och, med släppvärde, hold). Alla detektorers
+#   fönster körs på ett gemensamt timerhjul. Varje gest kör sin egen sektion
+#   i åtgärdsfilen; trigger.gesture och trigger.clicks finns i mallarna.
+#
+# Version: 0.9.9
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Script-planer körs utanför exekveraren så att Scriptets konfigurerade
+#   körläge (single/restart/queued/parallel, max_runs) styr överlappningen.
+#   Avvisade och köade körningar visas som attribut.
+#
+# Version: 0.9.8
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Detekteringen är en synkron tillståndsuppdatering i _handle_knx_press.
+#   Åtgärderna lämnas över till detektorns ActionExecutor (drop/queue/restart
+#   med begränsat ködjup), så ett tredje tryck under pågående körning varken
+#   tävlar om klicktiden eller väntar på åtgärderna.
+#
+# Version: 0.9.7
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Direktvägen kör planens förkompilerade DirectCall-objekt; mallar renderas
+#   med samma variabler som Script-vägen (_build_run_variables).
+#
+# Version: 0.9.6
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Enkla serviceanrop körs enligt exekveringsläge (sekventiellt, samtidigt
+#   eller utan att vänta) med timeout per anrop. Fel rapporteras samlat och i
+#   attributet last_action_errors; misslyckade direktanrop körs inte om via Script.
+#
+# Version: 0.9.5
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Åtgärdsfilen bevakas av integrationens katalogbevakare; klickvägen gör
+#   ingen fil-I/O alls. Fel i filen visas i attributet actions_error.
+#
+# Version: 0.9.4
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Åtgärder läses inte längre om och Script byggs inte om vid varje dubbelklick.
+#   Planen byggs i async_added_to_hass och återanvänds tills filen ändras
+#   (se actions.DetectorActions). Åtgärdskörningen ligger i _async_run_actions.
+#
+# Version: 0.9.3
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Sensorn registreras i dispatchern med konfigurerat intagsläge
+#   (knx_event eller direkt xknx-callback).
+#
+# Version: 0.9.1
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Sensorn lyssnar inte längre själv på knx_event. Den registrerar (GA, värde)
+#   i integrationens gemensamma dispatcher och anropas bara vid träff.
+#
 # Version: 0.8.17
 # Datum: 2025-05-25
 # Upphovsman: AI-Assistent
@@ -16,39 +211,130 @@
 """Sensorplattform för KNX Dubbelklicksdetektor."""
 import logging
 import os
-from typing import Any, Dict, Optional, List
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import datetime
 
-import yaml
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback, Event, Context
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback, Context
+from homeassistant.exceptions import TemplateError
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.script import Script, SCRIPT_MODE_SINGLE
+from homeassistant.helpers.event import async_call_later
 from homeassistant.util import slugify
 
 import homeassistant.util.dt as dt_util
 
 from .const import (
-    DOMAIN,
     CONF_NAME_SUFFIX,
     CONF_KNX_GROUP_ADDRESS,
     CONF_KNX_VALUE,
+    CONF_KNX_DPT,
+    CONF_KNX_ADDITIONAL_VALUES,
+    DEFAULT_KNX_DPT,
+    CONF_DEDUPE_WINDOW,
+    DEFAULT_DEDUPE_WINDOW,
     CONF_DOUBLE_CLICK_WINDOW_SECONDS,
+    CONF_INTAKE_MODE,
+    CONF_KNX_RELEASE_VALUE,
+    CONF_HOLD_SECONDS,
+    DEFAULT_HOLD_SECONDS,
+    DOMAIN,
+    DATA_TIMER_WHEEL,
+    DATA_STATS,
+    DATA_TRACES,
+    CONF_STATE_WRITE_INTERVAL,
+    CONF_STATE_ON_GESTURE_ONLY,
+    DEFAULT_STATE_WRITE_INTERVAL,
+    DEFAULT_STATE_ON_GESTURE_ONLY,
+    CONF_TRACE_SAMPLE_RATE,
+    DEFAULT_TRACE_SAMPLE_RATE,
+    TRACE_BUFFER_SIZE,
+    TIMER_WHEEL_TICK_SECONDS,
+    CONF_EXECUTION_MODE,
+    CONF_SERVICE_CALL_TIMEOUT,
+    CONF_BATCH_WINDOW,
+    CONF_WINDOW_AUTO_TUNE,
+    CONF_WINDOW_MIN_SECONDS,
+    CONF_WINDOW_MAX_SECONDS,
+    DEFAULT_WINDOW_AUTO_TUNE,
+    DEFAULT_WINDOW_MIN_SECONDS,
+    DEFAULT_WINDOW_MAX_SECONDS,
+    WINDOW_TUNE_MARGIN,
+    WINDOW_TUNE_MIN_SAMPLES,
+    WINDOW_TUNE_MIN_CHANGE,
+    DEFAULT_INTAKE_MODE,
+    DEFAULT_EXECUTION_MODE,
+    DEFAULT_SERVICE_CALL_TIMEOUT,
+    DEFAULT_BATCH_WINDOW,
+    CONF_OVERLAP_POLICY,
+    CONF_MAX_QUEUE_DEPTH,
+    DEFAULT_OVERLAP_POLICY,
+    DEFAULT_MAX_QUEUE_DEPTH,
+    CONF_SCRIPT_MODE,
+    CONF_SCRIPT_MAX_RUNS,
+    DEFAULT_SCRIPT_MODE,
+    DEFAULT_SCRIPT_MAX_RUNS,
     ATTR_LAST_CLICK_TIME,
     ATTR_KNX_GROUP_ADDRESS,
     ATTR_KNX_LISTEN_VALUE,
+    ATTR_KNX_LISTEN_VALUES,
+    ATTR_KNX_DPT,
     ATTR_DOUBLE_CLICK_WINDOW,
     ATTR_ACTIONS_FILE_PATH,
     ATTR_LAST_TIME_DIFFERENCE,
+    ATTR_ACTIONS_ERROR,
+    ATTR_LAST_ACTION_ERRORS,
+    ATTR_SCRIPT_RUNS_REJECTED,
+    ATTR_SCRIPT_RUNS_QUEUED,
+    ATTR_LAST_GESTURE,
+    ATTR_SUGGESTED_WINDOW,
+    SUMMARY_UNIQUE_ID_SUFFIX,
     ACTIONS_DIR_BASENAME,
     DEFAULT_ACTIONS_FILE_CONTENT,
     DEFAULT_NAME_SUFFIX,
-    COMPLEX_ACTION_KEYS,
+    DATA_HUBS,
+    DATA_DETECTORS,
+    CONF_ENTRY_TYPE,
+    ENTRY_TYPE_HUB,
+    CONF_BUTTONS,
+    CONF_BUTTON_ID,
+    CONF_ACTIONS_FILE,
+)
+from .actions import (
+    DetectorActions,
+    DirectCall,
+    PreparedActionsFile,
+    async_call_services,
+    async_get_actions_loader,
+)
+from .detector import GESTURE_HOLD, GestureClassifier, TimerWheel
+from .dispatcher import async_get_dispatcher
+from .executor import ActionExecutor
+from .profiler import SCOPE_ACTION, async_get_profiler
+from .stats import DetectorStats, summarize_stats
+from .trace import (
+    TRACE_GESTURE,
+    TRACE_PRESS,
+    TRACE_REJECTED,
+    TRACE_RELEASE,
+    TRACE_RUN,
+    TraceBuffer,
 )
+from .watcher import async_get_watcher
 
 _LOGGER = logging.getLogger(__name__)
 
+# Gäller bara sammanfattningssensorn; huvudsensorn pollas inte
+SCAN_INTERVAL = datetime.timedelta(seconds=30)
+
 
 def _generate_actions_filename_for_sensor(config_entry: ConfigEntry) -> str:
     name_suffix = config_entry.data.get(CONF_NAME_SUFFIX, DEFAULT_NAME_SUFFIX)
@@ -61,6 +347,75 @@ def _get_actions_file_path_for_sensor_instance(hass: HomeAssistant, config_entry
     return hass.config.path(ACTIONS_DIR_BASENAME, filename)
 
 
+def _generate_actions_filename_for_button(config_entry: ConfigEntry, button_config: Dict[str, Any]) -> str:
+    """Filnamn för en knapp i en hubb: egen fil i tabellen, annars namn + id."""
+    if actions_file := button_config.get(CONF_ACTIONS_FILE):
+        return os.path.basename(actions_file)
+    name_suffix = button_config.get(CONF_NAME_SUFFIX) or DEFAULT_NAME_SUFFIX
+    return f"{slugify(name_suffix)}--{config_entry.entry_id}_{button_config[CONF_BUTTON_ID]}.yaml"
+
+
+def _hub_button_configs(config_entry: ConfigEntry) -> Dict[str, Dict[str, Any]]:
+    """Knapp-id -> hubbens gemensamma inställningar kompletterade med knappens rad."""
+    shared = {
+        key: value
+        for key, value in {**config_entry.data, **config_entry.options}.items()
+        if key != CONF_BUTTONS
+    }
+    return {
+        row[CONF_BUTTON_ID]: {**shared, **row}
+        for row in config_entry.options.get(CONF_BUTTONS, [])
+    }
+
+
+def _default_actions_file_content(actions_file_path: str, title: str, detector_id: str) -> str:
+    """Standardinnehåll med identifierande header för en ny åtgärdsfil."""
+    header_comment = (
+        f"# Åtgärdsfil för KNX Dubbelklicksdetektor instans: '{title}'\n"
+        f"# Entry ID: {detector_id}\n"
+        f"# Filnamn: {os.path.basename(actions_file_path)}\n"
+        f"# Sökväg till denna fil: {actions_file_path}\n"
+        "# ---------------------------------------------------------------------------\n\n"
+    )
+    return header_comment + DEFAULT_ACTIONS_FILE_CONTENT
+
+
+async def _async_prepare_actions_files(
+    hass: HomeAssistant, default_contents: Dict[str, str]
+) -> Dict[str, PreparedActionsFile]:
+    """Skapar saknade åtgärdsfiler och läser in alla, i en gemensam batch.
+
+    Vid fel returneras en tom dict; detektorerna läser då själva sina filer.
+    """
+    loader = async_get_actions_loader(hass, hass.config.path(ACTIONS_DIR_BASENAME))
+    try:
+        return await loader.async_prepare(default_contents)
+    except OSError as e:
+        _LOGGER.error("Kunde inte förbereda åtgärdsfiler i %s: %s", loader.directory, e)
+        return {}
+
+
+def _move_actions_file(old_path: str, new_path: str) -> None:
+    """Körs i executor. Flyttar en knapps åtgärdsfil när filnamnet ändrats."""
+    if os.path.exists(old_path) and not os.path.exists(new_path):
+        os.replace(old_path, new_path)
+
+
+def _utc_from_wall(timestamp: Optional[float]) -> Optional[datetime.datetime]:
+    """Väggklocka (time.time()) som datetime, None om värdet saknas."""
+    return None if timestamp is None else dt_util.utc_from_timestamp(timestamp)
+
+
+@callback
+def _async_get_timer_wheel(hass: HomeAssistant) -> TimerWheel:
+    """Integrationens gemensamma timerhjul för alla detektorers fönster."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    wheel: Optional[TimerWheel] = domain_data.get(DATA_TIMER_WHEEL)
+    if wheel is None:
+        wheel = domain_data[DATA_TIMER_WHEEL] = TimerWheel(hass.loop, TIMER_WHEEL_TICK_SECONDS)
+    return wheel
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -69,66 +424,259 @@ async def async_setup_entry(
     # ... (samma som i v0.3.8) ...
     _LOGGER.debug("Sätter upp sensor för config entry: %s (ID: %s)", config_entry.title, config_entry.entry_id)
 
+    _async_remove_legacy_diagnostic_entities(hass, config_entry)
+    summary_name = f"{config_entry.title} Sammanfattning"
+
+    if config_entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_HUB:
+        hub = KnxDoubleClickHub(hass, config_entry, async_add_entities)
+        hass.data.setdefault(DOMAIN, {}).setdefault(DATA_HUBS, {})[config_entry.entry_id] = hub
+        await hub.async_sync()
+        async_add_entities([KnxDoubleClickSummarySensor(config_entry.entry_id, summary_name)])
+        return
+
     actions_file_path = _get_actions_file_path_for_sensor_instance(hass, config_entry)
     _LOGGER.info(
         "Åtgärdsfil för '%s' kommer att hanteras i: %s.",
         config_entry.title,
         actions_file_path
     )
+    prepared = await _async_prepare_actions_files(
+        hass,
+        {actions_file_path: _default_actions_file_content(actions_file_path, config_entry.title, config_entry.entry_id)},
+    )
 
-    if not await hass.async_add_executor_job(os.path.exists, actions_file_path):
-        _LOGGER.info("Åtgärdsfil %s saknas, skapar med standardinnehåll och identifierande header.", actions_file_path)
-        try:
-            header_comment = (
-                f"# Åtgärdsfil för KNX Dubbelklicksdetektor instans: '{config_entry.title}'\n"
-                f"# Entry ID: {config_entry.entry_id}\n"
-                f"# Filnamn: {_generate_actions_filename_for_sensor(config_entry)}\n"
-                f"# Sökväg till denna fil: {actions_file_path}\n"
-                "# ---------------------------------------------------------------------------\n\n"
-            )
-            full_content_for_new_file = header_comment + DEFAULT_ACTIONS_FILE_CONTENT
-
-            def write_default_file_with_header():
-                actions_dir_parent_path = hass.config.path(ACTIONS_DIR_BASENAME)
-                if not os.path.exists(actions_dir_parent_path):
-                    os.makedirs(actions_dir_parent_path, exist_ok=True)
-                with open(actions_file_path, "w", encoding="utf-8") as f:
-                    f.write(full_content_for_new_file)
-            await hass.async_add_executor_job(write_default_file_with_header)
-        except Exception as e:
-            _LOGGER.error("Kunde inte skapa standard åtgärdsfil %s: %s", actions_file_path, e)
+    async_add_entities(
+        _create_detector_entities(
+            hass,
+            config_entry,
+            {**config_entry.data, **config_entry.options},
+            actions_file_path,
+            prepared_actions=prepared.get(actions_file_path),
+        )
+        + [KnxDoubleClickSummarySensor(config_entry.entry_id, summary_name)]
+    )
 
-    name_suffix = config_entry.data.get(CONF_NAME_SUFFIX, DEFAULT_NAME_SUFFIX)
+
+@callback
+def _async_remove_legacy_diagnostic_entities(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Tar bort diagnostiksensorerna per detektor från tidigare versioner ur registret."""
+    registry = er.async_get(hass)
+    summary_unique_id = f"{config_entry.entry_id}{SUMMARY_UNIQUE_ID_SUFFIX}"
+    for entry in er.async_entries_for_config_entry(registry, config_entry.entry_id):
+        if entry.entity_category is EntityCategory.DIAGNOSTIC and entry.unique_id != summary_unique_id:
+            registry.async_remove(entry.entity_id)
+
+
+def _create_detector_entities(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    config: Dict[str, Any],
+    actions_file_path: str,
+    button_id: Optional[str] = None,
+    prepared_actions: Optional[PreparedActionsFile] = None,
+) -> List[SensorEntity]:
+    """Huvudsensorn för en detektor, med statistik och spårbuffert."""
+    detector_id = config_entry.entry_id if button_id is None else f"{config_entry.entry_id}_{button_id}"
+    name_suffix = config.get(CONF_NAME_SUFFIX, DEFAULT_NAME_SUFFIX)
     full_sensor_name = f"KNX Dubbelklick Lyssnare {name_suffix}"
 
-    sensor = KnxDoubleClickSensor(hass, config_entry, full_sensor_name)
-    async_add_entities([sensor])
+    stats = DetectorStats()
+    hass.data.setdefault(DOMAIN, {}).setdefault(DATA_STATS, {})[detector_id] = stats
+
+    trace = TraceBuffer(
+        config.get(CONF_KNX_GROUP_ADDRESS),
+        TRACE_BUFFER_SIZE,
+        config.get(CONF_TRACE_SAMPLE_RATE, DEFAULT_TRACE_SAMPLE_RATE),
+        hass.loop.time(),
+    )
+    hass.data[DOMAIN].setdefault(DATA_TRACES, {})[detector_id] = trace
+
+    sensor = KnxDoubleClickSensor(
+        hass, config_entry, full_sensor_name, stats, trace, config, actions_file_path, button_id, prepared_actions
+    )
     _LOGGER.info("Sensor '%s' tillagd för KNX Dubbelklicksdetektor.", full_sensor_name)
+    return [sensor]
+
+
+class KnxDoubleClickHub:
+    """Knapparna i en hubb-entry.
+
+    Tabellen i entry.options jämförs med de knappar som redan har entiteter:
+    nya knappar läggs till, borttagna tas bort (även ur entitetsregistret)
+    och ändrade får sin nya konfiguration direkt, utan omladdning.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        async_add_entities: AddEntitiesCallback,
+    ) -> None:
+        self.hass = hass
+        self.config_entry = config_entry
+        self._async_add_entities = async_add_entities
+        # Knapp-id -> knappens entiteter, huvudsensorn först
+        self._entities: Dict[str, List[SensorEntity]] = {}
+
+    @property
+    def sensors(self) -> Dict[str, "KnxDoubleClickSensor"]:
+        return {button_id: entities[0] for button_id, entities in self._entities.items()}
+
+    async def async_sync(self) -> None:
+        """Anpassar knapparnas entiteter efter tabellen i entry.options."""
+        configs = _hub_button_configs(self.config_entry)
+        for button_id in [button_id for button_id in self._entities if button_id not in configs]:
+            await self._async_remove_button(button_id, keep_registry=False)
+
+        # Knappar som behöver nya entiteter: knapp-id -> (konfiguration, åtgärdsfil)
+        to_create: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        updated = 0
+        for button_id, config in configs.items():
+            actions_file_path = self.hass.config.path(
+                ACTIONS_DIR_BASENAME, _generate_actions_filename_for_button(self.config_entry, config)
+            )
+            entities = self._entities.get(button_id)
+            if entities is not None and entities[0].actions_file_path != actions_file_path:
+                # Ny åtgärdsfil (t.ex. omdöpt knapp): flytta filen och skapa om entiteterna
+                old_path = entities[0].actions_file_path
+                await self._async_remove_button(button_id, keep_registry=True)
+                if not config.get(CONF_ACTIONS_FILE):
+                    await self.hass.async_add_executor_job(_move_actions_file, old_path, actions_file_path)
+                entities = None
+            if entities is None:
+                to_create[button_id] = (config, actions_file_path)
+            elif entities[0].config != config:
+                entities[0].async_apply_config(config)
+                updated += 1
+
+        # Alla nya knappars åtgärdsfiler skapas och läses i samma batch
+        prepared = await _async_prepare_actions_files(
+            self.hass,
+            {
+                actions_file_path: _default_actions_file_content(
+                    actions_file_path,
+                    f"{self.config_entry.title} / {config.get(CONF_NAME_SUFFIX)}",
+                    f"{self.config_entry.entry_id}_{button_id}",
+                )
+                for button_id, (config, actions_file_path) in to_create.items()
+            },
+        )
+        new_entities: List[SensorEntity] = []
+        for button_id, (config, actions_file_path) in to_create.items():
+            entities = _create_detector_entities(
+                self.hass, self.config_entry, config, actions_file_path, button_id, prepared.get(actions_file_path)
+            )
+            self._entities[button_id] = entities
+            new_entities.extend(entities)
+
+        if new_entities:
+            self._async_add_entities(new_entities)
+        _LOGGER.debug(
+            "Hubb %s: %d knappar (%d nya, %d ändrade).", self.config_entry.title, len(configs), len(to_create), updated
+        )
+
+    async def _async_remove_button(self, button_id: str, keep_registry: bool) -> None:
+        entities = self._entities.pop(button_id)
+        registry = er.async_get(self.hass)
+        for entity in entities:
+            if entity.hass is not None and entity.platform is not None:
+                await entity.async_remove(force_remove=True)
+            if not keep_registry and entity.unique_id is not None:
+                entity_id = registry.async_get_entity_id("sensor", DOMAIN, entity.unique_id)
+                if entity_id is not None:
+                    registry.async_remove(entity_id)
+        detector_id = f"{self.config_entry.entry_id}_{button_id}"
+        self.hass.data[DOMAIN].get(DATA_STATS, {}).pop(detector_id, None)
+        self.hass.data[DOMAIN].get(DATA_TRACES, {}).pop(detector_id, None)
 
 
 class KnxDoubleClickSensor(SensorEntity):
     """Representation av en KNX Dubbelklicksdetektor-sensor."""
 
     _attr_device_class = SensorDeviceClass.TIMESTAMP
-
-    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry, name: str):
+    # Statiska fält, tidsstämpeln igen och räknare som finns i diagnostiken
+    # skulle annars sparas i varje ny rad i recorder-databasen
+    _unrecorded_attributes = frozenset({
+        ATTR_KNX_GROUP_ADDRESS,
+        ATTR_KNX_LISTEN_VALUE,
+        ATTR_KNX_LISTEN_VALUES,
+        ATTR_KNX_DPT,
+        ATTR_DOUBLE_CLICK_WINDOW,
+        ATTR_SUGGESTED_WINDOW,
+        ATTR_ACTIONS_FILE_PATH,
+        ATTR_LAST_CLICK_TIME,
+        ATTR_SCRIPT_RUNS_REJECTED,
+        ATTR_SCRIPT_RUNS_QUEUED,
+    })
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        name: str,
+        stats: DetectorStats,
+        trace: TraceBuffer,
+        config: Dict[str, Any],
+        actions_file_path: str,
+        button_id: Optional[str] = None,
+        prepared_actions: Optional[PreparedActionsFile] = None,
+    ):
         # ... (samma som i v0.3.8) ...
         self.hass = hass
         self.config_entry = config_entry
+        self.config = config
         self._name = name
-        self._attr_unique_id = f"{config_entry.entry_id}_sensor"
+        # Knappens id när sensorn tillhör en hubb; dess konfiguration kommer då från hubben
+        self._button_id = button_id
+        self._detector_id = config_entry.entry_id if button_id is None else f"{config_entry.entry_id}_{button_id}"
+        self._attr_unique_id = f"{self._detector_id}_sensor"
         self._attr_should_poll = False
 
-        self._last_valid_knx_event_time_utc: Optional[datetime.datetime] = None
-        self._native_value: Optional[datetime.datetime] = None
-        self._remove_listener: Optional[callable] = None
+        # Tider per tryck som flyttal; datetime skapas först när tillståndet skrivs
+        # loop.time() för senaste matchade telegram (tryck eller släpp)
+        self._received: Optional[float] = None
+        # Väggklocka för senaste tryck respektive tidsstämpeln som sensorn visar
+        self._pressed: Optional[float] = None
+        self._state: Optional[float] = None
+        # Sekunder mellan de två senaste trycken
+        self._interval: Optional[float] = None
+        self._remove_listeners: List[Callable[[], None]] = []
+        self._remove_release_listener: Optional[callable] = None
 
         self._knx_group_address: Optional[str] = None
         self._knx_value: Optional[int] = None
+        # Alla värden detektorn lyssnar på, knx_value först
+        self._knx_values: List[int] = []
+        self._knx_dpt: str = DEFAULT_KNX_DPT
+        self._dedupe_window: float = DEFAULT_DEDUPE_WINDOW
+        self._knx_release_value: Optional[int] = None
+        self._hold_seconds: float = DEFAULT_HOLD_SECONDS
+        self._last_press_value: Optional[int] = None
+        self._last_gesture: Optional[str] = None
+        self._stats = stats
+        self._trace = trace
         self._double_click_window_seconds: Optional[float] = None
-
-        self._actions_file_path = _get_actions_file_path_for_sensor_instance(hass, config_entry)
-        self._last_time_difference_seconds: Optional[float] = None
+        self._window_auto_tune: bool = DEFAULT_WINDOW_AUTO_TUNE
+        self._window_min_seconds: float = DEFAULT_WINDOW_MIN_SECONDS
+        self._window_max_seconds: float = DEFAULT_WINDOW_MAX_SECONDS
+        self._intake_mode: str = DEFAULT_INTAKE_MODE
+        self._execution_mode: str = DEFAULT_EXECUTION_MODE
+        self._service_call_timeout: float = DEFAULT_SERVICE_CALL_TIMEOUT
+        self._batch_window: float = DEFAULT_BATCH_WINDOW
+        self._last_action_errors: List[str] = []
+        self._state_write_interval: float = DEFAULT_STATE_WRITE_INTERVAL
+        self._state_on_gesture_only: bool = DEFAULT_STATE_ON_GESTURE_ONLY
+        self._cancel_pending_write: Optional[Callable[[], None]] = None
+        self._executor = ActionExecutor(hass, name)
+        # En klassificerare per värde, så att t.ex. två scener inte blir ett dubbelklick
+        self._classifiers: Dict[int, GestureClassifier] = {}
+
+        self._actions_file_path = actions_file_path
+        self._actions = DetectorActions(
+            hass, self._actions_file_path, name, self._async_actions_updated
+        )
+        # Filen som den förbereddes vid setup; används bara vid första inläsningen
+        self._prepared_actions = prepared_actions
 
         self._update_instance_variables_from_config()
 
@@ -148,7 +696,11 @@ class KnxDoubleClickSensor(SensorEntity):
 
     @property
     def native_value(self) -> Optional[datetime.datetime]:
-        return self._native_value
+        return _utc_from_wall(self._state)
+
+    @property
+    def actions_file_path(self) -> str:
+        return self._actions_file_path
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
@@ -156,350 +708,532 @@ class KnxDoubleClickSensor(SensorEntity):
         attrs = {
             ATTR_KNX_GROUP_ADDRESS: self._knx_group_address,
             ATTR_KNX_LISTEN_VALUE: self._knx_value,
+            ATTR_KNX_DPT: self._knx_dpt,
             ATTR_DOUBLE_CLICK_WINDOW: self._double_click_window_seconds,
             ATTR_ACTIONS_FILE_PATH: self._actions_file_path,
         }
-        if self._native_value:
-            attrs[ATTR_LAST_CLICK_TIME] = dt_util.as_local(self._native_value).isoformat()
-
-        if self._last_time_difference_seconds is not None:
-            attrs[ATTR_LAST_TIME_DIFFERENCE] = round(self._last_time_difference_seconds, 3)
+        if len(self._knx_values) > 1:
+            attrs[ATTR_KNX_LISTEN_VALUES] = self._knx_values
+        if (native_value := self.native_value) is not None:
+            attrs[ATTR_LAST_CLICK_TIME] = dt_util.as_local(native_value).isoformat()
+
+        if self._interval is not None:
+            attrs[ATTR_LAST_TIME_DIFFERENCE] = round(self._interval, 3)
+        if self._last_gesture is not None:
+            attrs[ATTR_LAST_GESTURE] = self._last_gesture
+        if (suggested_window := self._suggested_window()) is not None:
+            attrs[ATTR_SUGGESTED_WINDOW] = suggested_window
+        if self._actions.error is not None:
+            attrs[ATTR_ACTIONS_ERROR] = self._actions.error
+        if self._last_action_errors:
+            attrs[ATTR_LAST_ACTION_ERRORS] = self._last_action_errors
+        if self._actions.runs_rejected:
+            attrs[ATTR_SCRIPT_RUNS_REJECTED] = self._actions.runs_rejected
+        if self._actions.runs_queued:
+            attrs[ATTR_SCRIPT_RUNS_QUEUED] = self._actions.runs_queued
         return attrs
 
+    @callback
+    def _async_actions_updated(self) -> None:
+        """Anropas när åtgärdsplanen eller dess fel ändrats."""
+        self._async_configure_classifier()
+        if self.hass is not None and self.entity_id is not None:
+            self.async_write_ha_state()
+
     @callback
     def _update_instance_variables_from_config(self) -> None:
         # ... (samma som i v0.3.8) ...
-        combined_config = {**self.config_entry.data, **self.config_entry.options}
+        combined_config = self.config
 
         self._knx_group_address = combined_config.get(CONF_KNX_GROUP_ADDRESS)
         self._knx_value = combined_config.get(CONF_KNX_VALUE)
+        self._knx_dpt = combined_config.get(CONF_KNX_DPT, DEFAULT_KNX_DPT)
+        self._dedupe_window = combined_config.get(CONF_DEDUPE_WINDOW, DEFAULT_DEDUPE_WINDOW)
+        self._knx_values = list(dict.fromkeys(
+            [self._knx_value, *combined_config.get(CONF_KNX_ADDITIONAL_VALUES, [])]
+        ))
+        self._knx_release_value = combined_config.get(CONF_KNX_RELEASE_VALUE)
+        self._hold_seconds = combined_config.get(CONF_HOLD_SECONDS, DEFAULT_HOLD_SECONDS)
+        self._window_auto_tune = combined_config.get(CONF_WINDOW_AUTO_TUNE, DEFAULT_WINDOW_AUTO_TUNE)
+        self._window_min_seconds = combined_config.get(CONF_WINDOW_MIN_SECONDS, DEFAULT_WINDOW_MIN_SECONDS)
+        self._window_max_seconds = combined_config.get(CONF_WINDOW_MAX_SECONDS, DEFAULT_WINDOW_MAX_SECONDS)
         self._double_click_window_seconds = combined_config.get(CONF_DOUBLE_CLICK_WINDOW_SECONDS)
+        if self._window_auto_tune and (suggested_window := self._suggested_window()) is not None:
+            # Det inlärda fönstret behålls när options ändras, men inom de nya gränserna
+            self._double_click_window_seconds = suggested_window
+        self._intake_mode = combined_config.get(CONF_INTAKE_MODE, DEFAULT_INTAKE_MODE)
+        self._execution_mode = combined_config.get(CONF_EXECUTION_MODE, DEFAULT_EXECUTION_MODE)
+        self._service_call_timeout = combined_config.get(CONF_SERVICE_CALL_TIMEOUT, DEFAULT_SERVICE_CALL_TIMEOUT)
+        self._batch_window = float(combined_config.get(CONF_BATCH_WINDOW, DEFAULT_BATCH_WINDOW))
+        self._trace.group_address = self._knx_group_address
+        self._state_write_interval = combined_config.get(CONF_STATE_WRITE_INTERVAL, DEFAULT_STATE_WRITE_INTERVAL)
+        self._state_on_gesture_only = combined_config.get(CONF_STATE_ON_GESTURE_ONLY, DEFAULT_STATE_ON_GESTURE_ONLY)
+        self._trace.set_sample_rate(combined_config.get(CONF_TRACE_SAMPLE_RATE, DEFAULT_TRACE_SAMPLE_RATE))
+        self._executor.async_configure(
+            combined_config.get(CONF_OVERLAP_POLICY, DEFAULT_OVERLAP_POLICY),
+            combined_config.get(CONF_MAX_QUEUE_DEPTH, DEFAULT_MAX_QUEUE_DEPTH),
+        )
+        self._actions.async_set_script_mode(
+            combined_config.get(CONF_SCRIPT_MODE, DEFAULT_SCRIPT_MODE),
+            combined_config.get(CONF_SCRIPT_MAX_RUNS, DEFAULT_SCRIPT_MAX_RUNS),
+        )
 
-        name_suffix = self.config_entry.data.get(CONF_NAME_SUFFIX, DEFAULT_NAME_SUFFIX)
+        self._async_sync_classifiers()
+        self._async_configure_classifier()
+
+        name_suffix = combined_config.get(CONF_NAME_SUFFIX, DEFAULT_NAME_SUFFIX)
         self._name = f"KNX Dubbelklick Lyssnare {name_suffix}"
 
         _LOGGER.debug("Sensor %s instansvariabler uppdaterade från konfiguration.", self.name)
 
-    async def _load_parsed_actions_from_file(self) -> Optional[List[Dict[str, Any]]]:
-        # ... (samma som i v0.3.8) ...
-        actions_yaml_str: Optional[str] = None
-        if not await self.hass.async_add_executor_job(os.path.exists, self._actions_file_path):
-            _LOGGER.warning("Åtgärdsfilen %s för %s hittades inte.", self._actions_file_path, self.name)
-            return None
-        try:
-            def read_file_content():
-                with open(self._actions_file_path, "r", encoding="utf-8") as f:
-                    return f.read()
-            actions_yaml_str = await self.hass.async_add_executor_job(read_file_content)
-        except Exception as e:
-            _LOGGER.error("Kunde inte läsa åtgärdsfil %s för %s: %s", self._actions_file_path, self.name, e)
+    def _suggested_window(self) -> Optional[float]:
+        """Fönster från kvantilen av tiderna mellan tryck, None tills tillräckligt många finns."""
+        press_intervals = self._stats.press_intervals
+        press_misses = self._stats.press_misses
+        window: Optional[float] = None
+        if press_intervals.count >= WINDOW_TUNE_MIN_SAMPLES:
+            window = press_intervals.value * WINDOW_TUNE_MARGIN
+        if press_misses.count >= WINDOW_TUNE_MIN_SAMPLES and press_misses.count > press_intervals.count:
+            # Fler tryck strax utanför fönstret än inom: fönstret är för smalt för den som trycker
+            window = max(window or 0.0, press_misses.value * WINDOW_TUNE_MARGIN)
+        if window is None:
             return None
+        return round(min(max(window, self._window_min_seconds), self._window_max_seconds), 3)
 
-        if not actions_yaml_str or not actions_yaml_str.strip():
-            _LOGGER.info("Åtgärdsfilen %s för %s är tom.", self._actions_file_path, self.name)
-            return None
-        try:
-            parsed_actions = yaml.safe_load(actions_yaml_str)
-            _LOGGER.debug("Sensor '%s': Parsade åtgärder från fil %s: %s", self.name, self._actions_file_path, parsed_actions)
-            if parsed_actions is None or (isinstance(parsed_actions, list) and not parsed_actions):
-                _LOGGER.info("Inga åtgärder att utföra från fil %s för %s (tom eller enbart kommentarer).", self._actions_file_path, self.name)
-                return None
-            if not isinstance(parsed_actions, list):
-                _LOGGER.error("Innehållet i åtgärdsfilen %s för %s är inte en YAML-lista.", self._actions_file_path, self.name)
-                return None
-            return parsed_actions
-        except yaml.YAMLError as e:
-            _LOGGER.error("Ogiltig YAML i åtgärdsfil %s för %s: %s", self._actions_file_path, self.name, e)
-        return None
-
-    def _compile_script_from_parsed_actions(self, parsed_actions: List[Dict[str, Any]]) -> Optional[Script]:
-        # ... (samma som i v0.3.8) ...
-        if not parsed_actions:
-            return None
-        try:
-            script_runner = Script(
-                self.hass,
-                parsed_actions,
-                f"{self.name} Dubbelklick Åtgärd (från fil)",
-                DOMAIN,
-                script_mode=SCRIPT_MODE_SINGLE,
-                logger=_LOGGER,
+    @callback
+    def _async_learn_press_gap(self, gap: float, in_sequence: bool) -> None:
+        """Lär in tiden mellan två tryck; i automatiskt läge byts fönstret på plats."""
+        if in_sequence:
+            self._stats.press_intervals.add(gap)
+        else:
+            self._stats.press_misses.add(gap)
+        if not self._window_auto_tune or (suggested_window := self._suggested_window()) is None:
+            return
+        if abs(suggested_window - float(self._double_click_window_seconds or 0.0)) < WINDOW_TUNE_MIN_CHANGE:
+            return
+        _LOGGER.debug(
+            "Fönstret för %s ändrat från %s till %s s efter %d tryck.",
+            self.name, self._double_click_window_seconds, suggested_window,
+            self._stats.press_intervals.count + self._stats.press_misses.count,
+        )
+        self._double_click_window_seconds = suggested_window
+        # En pågående sekvens och nästa tryck avgörs med det nya fönstret
+        self._async_configure_classifier()
+
+    @callback
+    def _async_sync_classifiers(self) -> None:
+        """En klassificerare per lyssnat värde; borttagna värdens sekvenser avbryts."""
+        for value in [value for value in self._classifiers if value not in self._knx_values]:
+            self._classifiers.pop(value).reset()
+        for value in self._knx_values:
+            if value not in self._classifiers:
+                self._classifiers[value] = GestureClassifier(
+                    _async_get_timer_wheel(self.hass), partial(self._async_on_gesture, value)
+                )
+
+    @callback
+    def _async_configure_classifier(self) -> None:
+        """Anpassar gestklassificeringen efter fönster och åtgärdsfilens sektioner."""
+        file_plan = self._actions.plan
+        for value, classifier in self._classifiers.items():
+            if file_plan is None:
+                # Utan åtgärder detekteras dubbelklick som tidigare, utan extra timers
+                max_clicks, resolve_counts = 2, frozenset()
+            else:
+                click_counts = file_plan.click_counts_for(value)
+                max_clicks = max(click_counts, default=0)
+                resolve_counts = frozenset(c for c in click_counts if c < max_clicks)
+            hold_seconds: Optional[float] = None
+            if (
+                self._knx_release_value is not None
+                and file_plan is not None
+                and file_plan.get(GESTURE_HOLD, value) is not None
+            ):
+                hold_seconds = self._hold_seconds
+            classifier.configure(
+                float(self._double_click_window_seconds or 0.0),
+                max_clicks,
+                resolve_counts,
+                hold_seconds,
             )
-            _LOGGER.debug("Åtgärder kompilerade för %s. Antal åtgärder: %d", self.name, len(parsed_actions))
-            return script_runner
-        except Exception as e:
-            _LOGGER.error("Oväntat fel vid kompilering av skript för %s från parsade åtgärder: %s", self.name, e, exc_info=True)
-        return None
 
     async def async_added_to_hass(self) -> None:
         # ... (samma som i v0.3.8) ...
         await super().async_added_to_hass()
 
-        self.async_on_remove(
-            self.config_entry.add_update_listener(self._async_options_updated)
-        )
+        # Bygg åtgärdsplan och Script direkt så att första dubbelklicket inte betalar för det
+        prepared_actions, self._prepared_actions = self._prepared_actions, None
+        await self._actions.async_load(prepared_actions)
+        if (watcher := async_get_watcher(self.hass)) is not None:
+            self.async_on_remove(watcher.async_subscribe(self._actions))
+
+        # Entryns (eller hubbens) lyssnare hittar detektorn här när options ändras
+        detectors = self.hass.data.setdefault(DOMAIN, {}).setdefault(DATA_DETECTORS, {})
+        detectors[self._detector_id] = self
+        self.async_on_remove(lambda: detectors.pop(self._detector_id, None))
         self._start_knx_listener()
 
     async def async_will_remove_from_hass(self) -> None:
         # ... (samma som i v0.3.8) ...
         self._stop_knx_listener()
+        for classifier in self._classifiers.values():
+            classifier.reset()
+        if self._cancel_pending_write is not None:
+            self._cancel_pending_write()
+            self._cancel_pending_write = None
+        self._actions.async_unload()
+        await self._executor.async_shutdown()
+        await self._actions.async_stop()
         await super().async_will_remove_from_hass()
 
     @callback
     def _start_knx_listener(self) -> None:
-        # ... (samma som i v0.3.8) ...
-        if self._remove_listener:
-            self._remove_listener()
-            self._remove_listener = None
+        self._stop_knx_listener()
 
         if self._knx_group_address:
-            _LOGGER.debug("Sensor %s börjar lyssna på KNX-event för GA: %s, Värde: %s",
-                          self.name, self._knx_group_address, self._knx_value)
-            self._remove_listener = self.hass.bus.async_listen(
-                "knx_event", self._async_handle_knx_event
-            )
+            _LOGGER.debug("Sensor %s registreras i dispatchern för GA: %s, Värden: %s, DPT: %s",
+                          self.name, self._knx_group_address, self._knx_values, self._knx_dpt)
+            dispatcher = async_get_dispatcher(self.hass)
+            self._remove_listeners = [
+                dispatcher.async_register(
+                    self._knx_group_address,
+                    value,
+                    self._handle_knx_press,
+                    intake_mode=self._intake_mode,
+                    dpt=self._knx_dpt,
+                    dedupe_window=self._dedupe_window,
+                )
+                for value in self._knx_values
+            ]
+            self._stats.ga_counters = dispatcher.async_ga_counters(self._knx_group_address)
+            if self._knx_release_value is not None and self._knx_release_value not in self._knx_values:
+                self._remove_release_listener = dispatcher.async_register(
+                    self._knx_group_address,
+                    self._knx_release_value,
+                    self._handle_knx_release,
+                    intake_mode=self._intake_mode,
+                    dpt=self._knx_dpt,
+                    dedupe_window=self._dedupe_window,
+                )
         else:
             _LOGGER.warning("Ingen KNX gruppadress konfigurerad för %s. Kan inte lyssna på event.", self.name)
 
     @callback
     def _stop_knx_listener(self) -> None:
         # ... (samma som i v0.3.8) ...
-        if self._remove_listener:
-            self._remove_listener()
-            self._remove_listener = None
+        if self._remove_listeners:
+            for remove_listener in self._remove_listeners:
+                remove_listener()
+            self._remove_listeners = []
             _LOGGER.debug("KNX-lyssnare borttagen för %s.", self.name)
+        if self._remove_release_listener:
+            self._remove_release_listener()
+            self._remove_release_listener = None
 
     @callback
-    async def _async_options_updated(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
-        # ... (samma som i v0.3.8) ...
-        _LOGGER.debug("Options uppdaterade för %s sensor, uppdaterar konfiguration och startar om lyssnare.", self.name)
+    def async_apply_config(self, config: Dict[str, Any]) -> None:
+        """Tar i bruk en ny konfiguration på plats.
 
+        Fönster och övriga inställningar gäller från nästa tryck och en
+        pågående sekvens behålls. Lyssnaren registreras om bara när GA eller
+        värden ändrats, i samma callback så att inget telegram hamnar mellan.
+        """
         old_ga = self._knx_group_address
-        old_val = self._knx_value
+        old_values = self._knx_values
+        old_dpt = self._knx_dpt
+        old_dedupe = self._dedupe_window
+        old_intake = self._intake_mode
+        old_release = self._knx_release_value
 
+        self.config = config
         self._update_instance_variables_from_config()
 
-        if old_ga != self._knx_group_address or old_val != self._knx_value:
+        if (
+            old_ga != self._knx_group_address
+            or old_values != self._knx_values
+            or old_dpt != self._knx_dpt
+            or old_dedupe != self._dedupe_window
+            or old_intake != self._intake_mode
+            or old_release != self._knx_release_value
+        ):
             _LOGGER.info("KNX lyssnarparametrar ändrade för %s. Startar om lyssnaren.", self.name)
-            self._stop_knx_listener()
+            if old_ga != self._knx_group_address or old_dpt != self._knx_dpt:
+                # Trycken i en pågående sekvens gällde den gamla adressen eller tolkningen
+                for classifier in self._classifiers.values():
+                    classifier.reset()
             self._start_knx_listener()
 
+        if self.entity_id is not None:
+            self.async_write_ha_state()
+
+    @callback
+    def _async_schedule_write(self) -> None:
+        """Skriver tillståndet, men högst en gång per skrivintervall."""
+        if self.entity_id is None:
+            return
+        if self._state_write_interval <= 0:
+            self.async_write_ha_state()
+            return
+        if self._cancel_pending_write is None:
+            self._cancel_pending_write = async_call_later(
+                self.hass, self._state_write_interval, self._async_write_pending
+            )
+
+    @callback
+    def _async_write_pending(self, _now: Any) -> None:
+        self._cancel_pending_write = None
         self.async_write_ha_state()
 
     @callback
-    async def _async_handle_knx_event(self, event: Event) -> None:
-        """Hanterar ett KNX-event från eventbussen."""
-        # ... (loggning och värdehantering är densamma som i v0.3.8) ...
-        _LOGGER.debug(
-            "Sensor '%s' mottog ett KNX-event på bussen. Event data: %s. "
-            "Konfigurerad för GA: '%s', Värde: '%s'",
-            self.name,
-            event.data,
-            self._knx_group_address,
-            self._knx_value
-        )
+    def _handle_knx_press(self, comparable_value: int, received: float) -> None:
+        """Anropas av dispatchern endast när GA och värde matchar.
+
+        Endast tillståndsuppdatering; gesten avgörs av klassificeraren och
+        åtgärderna lämnas till exekveraren.
+        """
+        self._stats.telegrams_matched += 1
+        self._received = received
+        self._pressed = time.time()
+        self._last_press_value = comparable_value
+
+        # Kan avgöra gesten direkt (max antal klick nått) och då anropa _async_on_gesture
+        classifier = self._classifiers[comparable_value]
+        interval = classifier.press(received)
+        if interval is not None:
+            self._async_learn_press_gap(interval, True)
+        elif (gap := classifier.last_gap) is not None and gap <= self._window_max_seconds:
+            # Utanför fönstret: ett missat dubbelklick eller ett enkelklick, skattas för sig
+            self._async_learn_press_gap(gap, False)
+        self._trace.record(received, TRACE_PRESS, comparable_value, None, interval)
+        if self._state_on_gesture_only:
+            return
+        self._state = self._pressed
+        self._interval = interval
+        self._async_schedule_write()
 
-        destination_address = event.data.get("destination")
+    @callback
+    def _handle_knx_release(self, comparable_value: int, received: float) -> None:
+        """Anropas av dispatchern när släppvärdet tas emot."""
+        self._stats.telegrams_matched += 1
+        self._received = received
+        self._trace.record(received, TRACE_RELEASE, comparable_value)
+        if (classifier := self._classifiers.get(self._last_press_value)) is not None:
+            classifier.release(received)
 
-        value_from_event_value_field = event.data.get("value")
-        actual_value_from_event = value_from_event_value_field
+    @callback
+    def _async_on_gesture(self, value: int, gesture: str, clicks: int) -> None:
+        """Anropas av värdets klassificerare när en gest är avgjord."""
+        classifier = self._classifiers[value]
+        self._last_gesture = gesture
+        time_difference_seconds = classifier.last_interval if clicks else None
+        if self._state_on_gesture_only:
+            self._state = self._pressed
+            self._interval = time_difference_seconds
+        received = self._received
+        detected = self.hass.loop.time()
+        self._stats.gestures[gesture] += 1
+        self._stats.detection.record(detected - received)
+        self._trace.record(detected, TRACE_GESTURE, clicks, gesture, detected - received)
+        _LOGGER.debug("Gest '%s' detekterad för %s (värde %s).", gesture, self.name, value)
+
+        file_plan = self._actions.plan
+        plan = file_plan.get(gesture, value) if file_plan is not None else None
+        if plan is None:
+            if file_plan is None:
+                _LOGGER.warning(
+                    "Gest '%s' detekterad för %s, men inga åtgärder är konfigurerade i filen %s eller så kunde filen/skriptet inte laddas/kompileras.",
+                    gesture, self.name, self._actions_file_path
+                )
+            self._async_schedule_write()
+            return
 
-        if actual_value_from_event is None:
-            value_from_event_data_field = event.data.get("data")
-            _LOGGER.debug(
-                "Sensor '%s': 'event.data.value' var None. Faller tillbaka till 'event.data.data' (%r, typ: %s).",
-                self.name,
-                value_from_event_data_field,
-                type(value_from_event_data_field)
+        run = partial(
+            self._async_execute,
+            gesture,
+            clicks,
+            value,
+            _utc_from_wall(self._pressed) or dt_util.utcnow(),
+            time_difference_seconds,
+            received,
+        )
+        if (profiler := async_get_profiler(self.hass)) is not None:
+            run = profiler.wrap_coroutine_function(run, SCOPE_ACTION)
+        if plan.direct_calls is None:
+            # Script-planer: Scriptets körläge avgör om körningen startar, köas eller avvisas
+            self.hass.async_create_background_task(
+                run(), f"knx_doubleclick script {self.name}"
             )
-            actual_value_from_event = value_from_event_data_field
-
-        if actual_value_from_event is None:
-            _LOGGER.debug(
-                "Sensor '%s': Varken 'event.data.value' eller 'event.data.data' innehöll ett användbart värde. Ignorerar event.",
-                self.name
+        elif not self._executor.async_submit(run):
+            self._stats.runs_rejected += 1
+            self._trace.record(detected, TRACE_REJECTED, clicks, gesture)
+        self._async_schedule_write()
+
+    async def _async_execute(
+        self,
+        gesture: str,
+        clicks: int,
+        comparable_value: Optional[int],
+        current_time_utc: datetime.datetime,
+        time_difference_seconds: Optional[float],
+        received: float,
+    ) -> None:
+        """En körning i exekveraren; tillståndet skrivs när åtgärderna är klara."""
+        started = self.hass.loop.time()
+        failed_before = self._stats.actions_failed
+        try:
+            if not await self._async_run_actions(
+                gesture, clicks, comparable_value, current_time_utc, time_difference_seconds
+            ):
+                self._trace.record(started, TRACE_REJECTED, clicks, gesture)
+                return
+            finished = self.hass.loop.time()
+            self._stats.action.record(finished - started)
+            self._stats.press_to_action.record(finished - received)
+            self._trace.record(
+                finished, TRACE_RUN, self._stats.actions_failed - failed_before, gesture, finished - started
             )
+        finally:
+            if self.hass is not None:
+                self._async_schedule_write()
+
+    def _build_run_variables(
+        self,
+        gesture: str,
+        clicks: int,
+        comparable_value: Optional[int],
+        current_time_utc: datetime.datetime,
+        time_difference_seconds: Optional[float],
+    ) -> Dict[str, Any]:
+        """Variabler för mallar, samma för direktanrop och Script-hjälparen."""
+        name_suffix = self.config.get(CONF_NAME_SUFFIX, DEFAULT_NAME_SUFFIX)
+        return {
+            "trigger": {
+                "platform": "knx_doubleclick",
+                "gesture": gesture,
+                "clicks": clicks,
+                "group_address": self._knx_group_address,
+                "value": comparable_value,
+                "event_time_utc": current_time_utc.isoformat(),
+                "event_time_local": dt_util.as_local(current_time_utc).isoformat(),
+                "time_difference_seconds": time_difference_seconds,
+                "name_suffix": name_suffix
+            },
+            "config_entry_name": self.config_entry.title,
+            "actions_file": self._actions_file_path
+        }
+
+    async def _async_run_direct_service_calls(
+        self, direct_calls: List[DirectCall], template_variables: Dict[str, Any]
+    ) -> None:
+        """Kör förkompilerade serviceanrop enligt detektorns exekveringsläge."""
+        try:
+            calls = [direct_call.render(template_variables) for direct_call in direct_calls]
+        except TemplateError as e:
+            _LOGGER.error("Fel vid rendering av mall för %s: %s. Inga åtgärder kördes.", self.name, e)
+            self._last_action_errors = [str(e)]
+            self._stats.actions_failed += 1
             return
 
         _LOGGER.debug(
-            "Sensor '%s' jämför: Mottagen Dest: %r (ska vara %r), Faktiskt Värde från Event: %r (typ: %s) (ska vara %r typ: %s)",
-            self.name,
-            destination_address, self._knx_group_address,
-            actual_value_from_event, type(actual_value_from_event),
-            self._knx_value, type(self._knx_value)
+            "Utför %d direkta serviceanrop för %s (läge: %s).",
+            len(calls), self.name, self._execution_mode
         )
-
-        comparable_value = None
-        try:
-            if isinstance(actual_value_from_event, list) and len(actual_value_from_event) == 1:
-                comparable_value = int(actual_value_from_event[0])
-            else:
-                comparable_value = int(actual_value_from_event)
-        except (ValueError, TypeError) as e:
-            _LOGGER.debug(
-                "Sensor '%s': Kunde inte konvertera mottaget värde %r (typ: %s) till heltal för jämförelse: %s. Ignorerar.",
-                self.name,
-                actual_value_from_event,
-                type(actual_value_from_event),
-                e
-            )
+        errors = await async_call_services(
+            self.hass, calls, self._execution_mode, self._service_call_timeout, Context(), self._batch_window
+        )
+        self._last_action_errors = [
+            f"{calls[i][0]}.{calls[i][1]}: {str(e) or type(e).__name__}"
+            for i, e in errors
+        ]
+        self._stats.actions_failed += len(errors)
+        if not errors:
+            _LOGGER.debug("Alla (%d) enkla serviceanrop har körts direkt för %s.", len(calls), self.name)
             return
+        # En samlad felrapport i stället för en loggrad per anrop
+        _LOGGER.error(
+            "%d av %d direkta serviceanrop misslyckades för %s: %s",
+            len(errors), len(calls), self.name, "; ".join(self._last_action_errors)
+        )
 
-        if (
-            destination_address == self._knx_group_address
-            and comparable_value == self._knx_value
-        ):
-            _LOGGER.info(
-                "MATCH! KNX-event för '%s': GA '%s', Värde '%s' (jämfört som %s). Bearbetar dubbelklicklogik...",
-                self.name,
-                destination_address,
-                actual_value_from_event,
-                comparable_value
-            )
-            current_time_utc = dt_util.utcnow()
-            previous_event_time_utc = self._last_valid_knx_event_time_utc
-
-            self._native_value = current_time_utc
-            self._last_valid_knx_event_time_utc = current_time_utc
-            self._last_time_difference_seconds = None
-
-            if previous_event_time_utc and self._double_click_window_seconds is not None:
-                time_difference_seconds = (
-                    current_time_utc - previous_event_time_utc
-                ).total_seconds()
-                self._last_time_difference_seconds = time_difference_seconds
-
-                _LOGGER.debug(
-                    "Tidsdifferens för %s: %.3f sekunder. Fönster: %.3f sekunder.",
-                    self.name,
-                    time_difference_seconds,
-                    self._double_click_window_seconds,
-                )
+    async def _async_run_actions(
+        self,
+        gesture: str,
+        clicks: int,
+        comparable_value: Optional[int],
+        current_time_utc: datetime.datetime,
+        time_difference_seconds: Optional[float],
+    ) -> bool:
+        """Kör gestens åtgärder från den cachade planen, direkt eller via Script-hjälparen.
+
+        Returnerar False om ingen körning startades (plan saknas eller körläget avvisade).
+        """
+        file_plan = self._actions.plan
+        plan = file_plan.get(gesture, comparable_value) if file_plan is not None else None
+        if plan is None:
+            return False
+
+        template_variables = self._build_run_variables(
+            gesture, clicks, comparable_value, current_time_utc, time_difference_seconds
+        )
 
-                if time_difference_seconds <= self._double_click_window_seconds:
-                    _LOGGER.info(
-                        "Dubbelklick detekterat för %s! Tidsdifferens: %.3f s.",
-                        self.name,
-                        time_difference_seconds,
-                    )
-
-                    parsed_actions_list = await self._load_parsed_actions_from_file()
-
-                    if parsed_actions_list:
-                        _LOGGER.debug("Agerar på %d parsade åtgärder: %s", len(parsed_actions_list), parsed_actions_list)
-
-                        # ---- Start: Logik för att köra åtgärder med korrigerad indentering ----
-                        all_actions_are_simple_services = True
-                        if not parsed_actions_list:
-                            all_actions_are_simple_services = False
-                        else:
-                            for action_dict_check in parsed_actions_list:
-                                if not (isinstance(action_dict_check, dict) and \
-                                        "service" in action_dict_check and \
-                                        not any(key in action_dict_check for key in COMPLEX_ACTION_KEYS)):
-                                    all_actions_are_simple_services = False
-                                    break
-
-                        actions_executed_successfully_directly = False
-
-                        if all_actions_are_simple_services:
-                            _LOGGER.info("Alla %d åtgärder är enkla serviceanrop. Försöker köra dem direkt sekventiellt.", len(parsed_actions_list))
-                            actions_executed_successfully_directly = True
-                            for i, action_dict in enumerate(parsed_actions_list):
-                                service_call_str = str(action_dict["service"])
-                                service_data = action_dict.get("data", {}).copy()
-                                target_data = action_dict.get("target", {})
-
-                                if isinstance(target_data, dict):
-                                    service_data.update(target_data)
-                                elif isinstance(target_data, str) and "entity_id" not in service_data :
-                                     service_data["entity_id"] = target_data
-
-                                if "entity_id" in action_dict and "entity_id" not in service_data:
-                                    service_data["entity_id"] = action_dict["entity_id"]
-
-                                try:
-                                    domain, service_name = service_call_str.split(".", 1)
-                                    _LOGGER.info(
-                                        "Utför direkt serviceanrop %d/%d för %s: Domän=%s, Tjänst=%s, Data=%s",
-                                        i + 1, len(parsed_actions_list), self.name, domain, service_name, service_data
-                                    )
-                                    await self.hass.services.async_call(
-                                        domain, service_name, service_data,
-                                        blocking=True, context=Context()
-                                    )
-                                    _LOGGER.info("Direkt serviceanrop %d/%d för %s lyckades.", i + 1, len(parsed_actions_list), self.name)
-                                except ValueError as e: # Korrekt indentering av hela try-except blocket
-                                    _LOGGER.error(
-                                        "Fel vid parsning av service för direktanrop %d/%d ('%s') för %s: %s. Åtgärd: %s",
-                                        i + 1, len(parsed_actions_list), service_call_str, self.name, e, action_dict, exc_info=True
-                                    )
-                                    actions_executed_successfully_directly = False
-                                    break
-                                except Exception as e:
-                                    _LOGGER.error(
-                                        "Fel vid direkt serviceanrop %d/%d för %s: %s. Åtgärd: %s",
-                                        i + 1, len(parsed_actions_list), self.name, e, action_dict, exc_info=True
-                                    )
-                                    actions_executed_successfully_directly = False
-                                    break
-                            # Slut på for-loopen
-                            if actions_executed_successfully_directly and parsed_actions_list:
-                                _LOGGER.info("Alla (%d) enkla serviceanrop har körts direkt för %s.", len(parsed_actions_list), self.name)
-                            elif not actions_executed_successfully_directly and parsed_actions_list :
-                                _LOGGER.error("Minst ett direkt serviceanrop misslyckades för %s. Inte alla åtgärder kördes.", self.name)
-                        # Slut på if all_actions_are_simple_services
-
-                        # Kör Script-hjälparen om det INTE var enbart enkla anrop som alla lyckades, ELLER om listan var tom från början men ändå ska testas med Script.
-                        # Mer korrekt: Kör Script om INTE (alla var enkla OCH alla lyckades direkt).
-                        # Detta täcker: komplexa åtgärder, eller om direkta anrop misslyckades (för att få HA Cores felmeddelande).
-                        if not (all_actions_are_simple_services and actions_executed_successfully_directly and parsed_actions_list) and parsed_actions_list:
-                            if not all_actions_are_simple_services:
-                                _LOGGER.info("Åtgärdslistan innehåller komplexa åtgärder, använder Script-hjälparen för %s.", self.name)
-                            else: # Betyder all_simple var true, men actions_executed_successfully_directly var false
-                                _LOGGER.warning("Direkta serviceanrop misslyckades för %s, försöker ändå med Script-hjälparen för att logga eventuellt HA Core-fel.", self.name)
-
-                            script_runner = self._compile_script_from_parsed_actions(parsed_actions_list)
-                            if script_runner:
-                                script_context = Context()
-                                name_suffix = self.config_entry.data.get(CONF_NAME_SUFFIX, DEFAULT_NAME_SUFFIX)
-                                template_variables = {
-                                    "trigger": {
-                                        "platform": "knx_doubleclick",
-                                        "group_address": self._knx_group_address,
-                                        "value": comparable_value,
-                                        "event_time_utc": current_time_utc.isoformat(),
-                                        "event_time_local": dt_util.as_local(current_time_utc).isoformat(),
-                                        "time_difference_seconds": time_difference_seconds,
-                                        "name_suffix": name_suffix
-                                    },
-                                    "config_entry_name": self.config_entry.title,
-                                    "actions_file": self._actions_file_path
-                                }
-                                _LOGGER.debug("Kör skript via Script-hjälparen med variabler: %s", template_variables)
-                                try:
-                                    await script_runner.async_run(
-                                        run_variables=template_variables,
-                                        context=script_context
-                                    )
-                                except Exception as e:
-                                    _LOGGER.error("Fel vid körning av Script-hjälparen för %s: %s", self.name, e, exc_info=True)
-                            else:
-                                 _LOGGER.warning("Kunde inte kompilera skript för %s via Script-hjälparen (parsed_actions: %s).", self.name, parsed_actions_list)
-                    else: # parsed_actions_list var None eller tom
-                        _LOGGER.warning(
-                            "Dubbelklick detekterat för %s, men inga åtgärder är konfigurerade i filen %s eller så kunde filen/skriptet inte laddas/kompileras.",
-                            self.name, self._actions_file_path
-                        )
+        if plan.direct_calls is not None:
+            await self._async_run_direct_service_calls(plan.direct_calls, template_variables)
+            return True
 
-            self.async_write_ha_state()
-        else: # Om inte GA och värde matchar
-            if destination_address == self._knx_group_address:
-                _LOGGER.debug(
-                    "Sensor '%s': GA '%s' matchade, men värdet gjorde det inte. Jämförbart Värde från Event: %r (typ: %s), Förväntat Värde: %r (typ: %s). Ignorerar.",
-                    self.name,
-                    destination_address,
-                    comparable_value if comparable_value is not None else actual_value_from_event,
-                    type(comparable_value if comparable_value is not None else actual_value_from_event),
-                    self._knx_value, type(self._knx_value)
-                )
\ No newline at end of file
+        _LOGGER.debug("Åtgärdslistan för '%s' innehåller komplexa åtgärder, använder Script-hjälparen för %s.", gesture, self.name)
+        if plan not in self._actions.scripts:
+            _LOGGER.warning("Kunde inte kompilera skript för %s via Script-hjälparen (parsed_actions: %s).", self.name, plan.parsed_actions)
+            return False
+
+        _LOGGER.debug("Kör skript via Script-hjälparen med variabler: %s", template_variables)
+        self._last_action_errors = []
+        try:
+            if not await self._actions.async_run(plan, template_variables, Context()):
+                self._stats.runs_rejected += 1
+                return False
+        except Exception as e:
+            self._stats.actions_failed += 1
+            self._last_action_errors = [str(e) or type(e).__name__]
+            _LOGGER.error("Fel vid körning av Script-hjälparen för %s: %s", self.name, e, exc_info=True)
+        return True
+
+
+class KnxDoubleClickSummarySensor(SensorEntity):
+    """Diagnostiksensor med summerade latenser och räknare för en config entry.
+
+    En per entry oavsett antal knappar i en hubb. Läser DetectorStats vid
+    pollning i stället för vid varje telegram, på event-loopen och inte i en
+    trådpool eftersom statistiken ändras där; tillståndet är tryck till
+    åtgärd p95 och övriga värden finns som attribut.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_should_poll = True
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, entry_id: str, name: str) -> None:
+        self._entry_id = entry_id
+        self._detector_prefix = f"{entry_id}_"
+        self._attr_unique_id = f"{entry_id}{SUMMARY_UNIQUE_ID_SUFFIX}"
+        self._attr_name = name
+        self._summary: Dict[str, Any] = summarize_stats(())
+
+    async def async_update(self) -> None:
+        # På loopen: statistiken ändras vid varje telegram och detektorer kan tillkomma
+        all_stats = self.hass.data.get(DOMAIN, {}).get(DATA_STATS, {})
+        self._summary = summarize_stats(
+            stats
+            for detector_id, stats in all_stats.items()
+            if detector_id == self._entry_id or detector_id.startswith(self._detector_prefix)
+        )
+
+    @property
+    def native_value(self) -> Optional[float]:
+        return self._summary["latency"]["press_to_action"]["p95_ms"]
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        return self._summary
@@ -0,0 +1,346 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - summarize_stats: summerar räknare och histogram för flera detektorer,
+#   för sammanfattningssensorn per config entry.
+# - Största mätvärdet hålls med max().
+# - En kvantil i sista facket (över max_seconds) är största mätvärdet, inte
+#   fackets nedre gräns.
+# - press_intervals får bara tider mellan tryck i samma sekvens.
+# - press_misses: medianen av tiderna strax utanför fönstret (upp till
+#   maxgränsen), så att ett för smalt fönster kan vidgas.
+# - LatencyHistogram.__slots__ och GaCounters.__slots__ sorterade (ruff
+#   RUF023).
+# - P2Quantile.__slots__ sorterade (ruff RUF023).
+#
+# Version: 0.9.25
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - P2Quantile: strömmande kvantilskattning (P²) med fem markörer, utan
+#   sparad historik. DetectorStats.press_intervals skattar kvantilen av
+#   tiderna mellan tryck, som det föreslagna fönstret beräknas från.
+#
+# Version: 0.9.21
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Histogrammets fack är en array med 32-bitars räknare som skapas vid
+#   första mätningen. De flesta detektorer mäts sällan eller aldrig och
+#   kostar då inget minne för facken.
+#
+# Version: 0.9.20
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - GaCounters räknar även telegram som dubblettfiltret tog bort, och
+#   DetectorStats visar dem som telegrams_duplicate.
+#
+# Version: 0.9.14
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - LatencyHistogram.merge() för att slå ihop histogram från flera
+#   detektorer (används av tools/benchmark.py).
+#
+# Version: 0.9.11
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: histogram med logaritmiska fack för latenser och räknare per
+#   detektor och per gruppadress. Ren Python utan beroenden till Home Assistant.
+
+"""Latenshistogram och räknare för KNX Dubbelklicksdetektor."""
+import math
+from array import array
+from bisect import bisect_right, insort
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Kvantilen av tiderna mellan tryck som det föreslagna fönstret utgår från
+PRESS_INTERVAL_QUANTILE = 0.95
+# Kvantilen av tiderna utanför fönstret som ett för smalt fönster vidgas till
+PRESS_MISS_QUANTILE = 0.5
+
+
+class LatencyHistogram:
+    """Histogram med logaritmiska fack, konstant minne och O(1) per mätning.
+
+    Facken växer med faktorn growth från min_seconds till max_seconds, så
+    kvantilerna har ett relativt fel på högst growth - 1.
+    """
+
+    __slots__ = ("_counts", "_growth", "_log_growth", "_min", "_n_buckets", "count", "max", "total")
+
+    def __init__(self, min_seconds: float = 1e-4, max_seconds: float = 60.0, growth: float = 1.1) -> None:
+        self._min = min_seconds
+        self._growth = growth
+        self._log_growth = math.log(growth)
+        # Fack 0 för allt under min_seconds, sista facket för allt över max_seconds
+        self._n_buckets = math.ceil(math.log(max_seconds / min_seconds) / self._log_growth) + 2
+        # Skapas vid första mätningen
+        self._counts: Optional[array] = None
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        if seconds <= self._min:
+            index = 0
+        else:
+            index = min(
+                int(math.log(seconds / self._min) / self._log_growth) + 1,
+                self._n_buckets - 1,
+            )
+        if self._counts is None:
+            self._counts = array("I", bytes(4 * self._n_buckets))
+        self._counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Övre gränsen för facket där kvantilen q hamnar, None utan mätningar."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self._counts):
+            cumulative += bucket_count
+            if cumulative >= rank and bucket_count:
+                if index == self._n_buckets - 1:
+                    # Sista facket saknar övre gräns
+                    return self.max
+                return min(self._min * self._growth ** index, self.max)
+        return self.max
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Lägger till mätningarna från ett histogram med samma fack."""
+        if other._n_buckets != self._n_buckets or other._min != self._min or other._growth != self._growth:
+            raise ValueError("Histogrammen har olika fack")
+        if other._counts is None:
+            return
+        if self._counts is None:
+            self._counts = array("I", bytes(4 * self._n_buckets))
+        for index, bucket_count in enumerate(other._counts):
+            self._counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def reset(self) -> None:
+        self._counts = None
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Sammanfattning i millisekunder."""
+
+        def _ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000, 2)
+
+        return {
+            "count": self.count,
+            "mean_ms": _ms(self.total / self.count) if self.count else None,
+            "p50_ms": _ms(self.quantile(0.50)),
+            "p95_ms": _ms(self.quantile(0.95)),
+            "p99_ms": _ms(self.quantile(0.99)),
+            "max_ms": _ms(self.max) if self.count else None,
+        }
+
+
+class P2Quantile:
+    """Strömmande skattning av kvantilen p med P²-algoritmen (Jain & Chlamtac).
+
+    Fem markörer följer minimum, p/2, p, (1+p)/2 och maximum; höjderna
+    justeras parabolt när markörernas positioner glider från de önskade.
+    Konstant minne och O(1) per mätning. De fem första mätningarna sparas
+    som de är och ger då en exakt kvantil.
+    """
+
+    __slots__ = ("_desired", "_heights", "_increments", "_positions", "count", "p")
+
+    def __init__(self, p: float) -> None:
+        self.p = p
+        self.count = 0
+        # Sorterade mätningar tills fem finns, därefter markörernas höjder
+        self._heights: List[float] = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+        self._increments = (0.0, p / 2, p, (1 + p) / 2, 1.0)
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        heights = self._heights
+        if self.count <= 5:
+            insort(heights, x)
+            return
+        if x < heights[0]:
+            heights[0] = x
+            cell = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            cell = 3
+        else:
+            cell = bisect_right(heights, x) - 1
+        positions = self._positions
+        for index in range(cell + 1, 5):
+            positions[index] += 1
+        desired = self._desired
+        for index in range(5):
+            desired[index] += self._increments[index]
+        for index in (1, 2, 3):
+            delta = desired[index] - positions[index]
+            if (delta >= 1 and positions[index + 1] - positions[index] > 1) or (
+                delta <= -1 and positions[index - 1] - positions[index] < -1
+            ):
+                step = 1 if delta > 0 else -1
+                height = self._parabolic(index, step)
+                if not heights[index - 1] < height < heights[index + 1]:
+                    height = self._linear(index, step)
+                heights[index] = height
+                positions[index] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def _linear(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+
+    @property
+    def value(self) -> Optional[float]:
+        """Skattad kvantil, None utan mätningar."""
+        if not self.count:
+            return None
+        if self.count <= 5:
+            return self._heights[min(int(self.p * self.count), self.count - 1)]
+        return self._heights[2]
+
+    def reset(self) -> None:
+        self.count = 0
+        self._heights = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1.0, 1 + 2 * self.p, 1 + 4 * self.p, 3 + 2 * self.p, 5.0]
+
+    def as_dict(self) -> Dict[str, Any]:
+        value = self.value
+        return {
+            "count": self.count,
+            "quantile": self.p,
+            "value_ms": None if value is None else round(value * 1000, 2),
+        }
+
+
+class GaCounters:
+    """Telegram för en gruppadress: alla som nått dispatchern, dubbletter och de som matchade ett värde."""
+
+    __slots__ = ("duplicates", "matched", "seen")
+
+    def __init__(self) -> None:
+        self.seen = 0
+        self.matched = 0
+        self.duplicates = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "seen": self.seen,
+            "matched": self.matched,
+            "duplicates": self.duplicates,
+            "rejected": self.seen - self.matched - self.duplicates,
+        }
+
+
+class DetectorStats:
+    """Räknare och latenser för en detektor.
+
+    Latenserna mäts med loopens monotona klocka:
+    detection:       sista telegrammet i gesten -> gesten avgjord (inkl. fönstret
+                     när gesten avgörs av att fönstret löper ut)
+    action:          körningen startar -> åtgärderna klara
+    press_to_action: sista telegrammet i gesten -> åtgärderna klara
+    """
+
+    def __init__(self) -> None:
+        self.telegrams_matched = 0
+        self.gestures: Counter = Counter()
+        self.actions_failed = 0
+        self.runs_rejected = 0
+        self.detection = LatencyHistogram()
+        self.action = LatencyHistogram()
+        self.press_to_action = LatencyHistogram()
+        # Tider mellan tryck i samma sekvens (dubbel- eller flerklick)
+        self.press_intervals = P2Quantile(PRESS_INTERVAL_QUANTILE)
+        # Tider mellan tryck utanför fönstret men inom fönstrets maxgräns
+        self.press_misses = P2Quantile(PRESS_MISS_QUANTILE)
+        # Delas med dispatchern, sätts när detektorn registrerat sin GA
+        self.ga_counters: Optional[GaCounters] = None
+
+    @property
+    def gestures_fired(self) -> int:
+        return sum(self.gestures.values())
+
+    @property
+    def telegrams_seen(self) -> int:
+        return self.ga_counters.seen if self.ga_counters is not None else 0
+
+    @property
+    def telegrams_duplicate(self) -> int:
+        return self.ga_counters.duplicates if self.ga_counters is not None else 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "telegrams_seen": self.telegrams_seen,
+            "telegrams_duplicate": self.telegrams_duplicate,
+            "telegrams_matched": self.telegrams_matched,
+            "gestures_fired": self.gestures_fired,
+            "gestures": dict(self.gestures),
+            "actions_failed": self.actions_failed,
+            "runs_rejected": self.runs_rejected,
+            "latency": {
+                "detection": self.detection.as_dict(),
+                "action": self.action.as_dict(),
+                "press_to_action": self.press_to_action.as_dict(),
+            },
+            "press_intervals": self.press_intervals.as_dict(),
+            "press_misses": self.press_misses.as_dict(),
+        }
+
+
+def summarize_stats(all_stats: Iterable[DetectorStats]) -> Dict[str, Any]:
+    """Summerar flera detektorers statistik, t.ex. alla knappar i en hubb.
+
+    Histogrammen slås ihop och räknarna adderas. Detektorer på samma GA
+    delar GaCounters, som då bara räknas en gång. Kvantilskattningarna av
+    tiderna mellan tryck går inte att slå ihop och ingår inte.
+    """
+    total = DetectorStats()
+    total.ga_counters = GaCounters()
+    counted: Set[int] = set()
+    detectors = 0
+    for stats in all_stats:
+        detectors += 1
+        total.telegrams_matched += stats.telegrams_matched
+        total.gestures.update(stats.gestures)
+        total.actions_failed += stats.actions_failed
+        total.runs_rejected += stats.runs_rejected
+        total.detection.merge(stats.detection)
+        total.action.merge(stats.action)
+        total.press_to_action.merge(stats.press_to_action)
+        counters = stats.ga_counters
+        if counters is not None and id(counters) not in counted:
+            counted.add(id(counters))
+            total.ga_counters.seen += counters.seen
+            total.ga_counters.duplicates += counters.duplicates
+    summary = total.as_dict()
+    del summary["press_intervals"]
+    del summary["press_misses"]
+    summary["detectors"] = detectors
+    return summary
@@ -0,0 +1,105 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - datetime.UTC i stället för timezone.utc (ruff UP017); importerna
+#   sorterade (ruff I001).
+#
+# Version: 0.9.12
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: en begränsad ringbuffert per detektor med kompakta poster
+#   (tid, beslut, värde, gest, mått) och sampling. Ingen strängformatering
+#   sker när poster skrivs, bara när bufferten hämtas.
+
+"""Samplad spårning av telegram och beslut för KNX Dubbelklicksdetektor."""
+import time
+from collections import deque
+from datetime import UTC, datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Beslut i en spårpost
+TRACE_PRESS = "press"
+TRACE_RELEASE = "release"
+TRACE_GESTURE = "gesture"
+TRACE_RUN = "run"
+TRACE_REJECTED = "rejected"
+
+# (loop.time(), beslut, värde, gest, mått); måttet beror på beslutet:
+# press: sekunder sedan föregående tryck i sekvensen, gesture: detekteringstid,
+# run: åtgärdstid, övriga: None
+TraceRecord = Tuple[float, str, Optional[int], Optional[str], Optional[float]]
+
+
+class TraceBuffer:
+    """Ringbuffert med de senaste spårposterna för en detektor.
+
+    Med sample_rate < 1 sparas var N:e post (N = round(1 / sample_rate)),
+    och med 0 sparas ingenting. Posterna är tupler med loopens monotona
+    tid; omvandling till läsbar form görs först i as_list().
+    """
+
+    def __init__(self, group_address: Optional[str], maxlen: int, sample_rate: float, loop_time: float) -> None:
+        self.group_address = group_address
+        self._records: Deque[TraceRecord] = deque(maxlen=maxlen)
+        # Skillnad mellan väggklocka och loopens klocka, för att visa posterna i klartid
+        self._wall_offset = time.time() - loop_time
+        self._stride = 0
+        self._countdown = 0
+        self.skipped = 0
+        self.set_sample_rate(sample_rate)
+
+    def set_sample_rate(self, sample_rate: float) -> None:
+        self.sample_rate = sample_rate
+        self._stride = round(1 / sample_rate) if sample_rate > 0 else 0
+        self._countdown = 0
+
+    def record(
+        self,
+        when: float,
+        decision: str,
+        value: Optional[int] = None,
+        gesture: Optional[str] = None,
+        measure: Optional[float] = None,
+    ) -> None:
+        if not self._stride:
+            return
+        if self._countdown:
+            self._countdown -= 1
+            self.skipped += 1
+            return
+        self._countdown = self._stride - 1
+        self._records.append((when, decision, value, gesture, measure))
+
+    def clear(self) -> None:
+        self._records.clear()
+        self.skipped = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def as_list(self) -> List[Dict[str, Any]]:
+        """Posterna som dicts, äldst först."""
+        return [
+            {
+                "time": datetime.fromtimestamp(when + self._wall_offset, UTC).isoformat(),
+                "decision": decision,
+                "group_address": self.group_address,
+                "value": value,
+                "gesture": gesture,
+                "ms": None if measure is None else round(measure * 1000, 2),
+            }
+            # En gest som avgörs direkt registreras före sitt tryck; sortera på tid
+            for when, decision, value, gesture, measure in sorted(self._records, key=lambda r: r[0])
+        ]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "group_address": self.group_address,
+            "sample_rate": self.sample_rate,
+            "capacity": self._records.maxlen,
+            "skipped_by_sampling": self.skipped,
+            "records": self.as_list(),
+        }
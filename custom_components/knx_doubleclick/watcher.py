@@ -0,0 +1,223 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - watchdog finns nu bland manifestets krav. Saknas paketet ändå loggas
+#   reservläget (skanning) en gång på info-nivå.
+# - Importerna sorterade (ruff I001).
+#
+# Version: 0.9.17
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Bevakaren skapar katalogen i samma executor-jobb som startar bevakningen
+#   (tidigare kontrollerade varje entry katalogen för sig).
+#
+# Version: 0.9.5
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: en gemensam bevakare för katalogen knx_doubleclick_actions.
+#   Använder inotify via watchdog när det finns, annars en enda lågfrekvent
+#   katalogskanning för alla filer.
+
+"""Katalogbevakning av åtgärdsfiler för KNX Dubbelklicksdetektor."""
+import logging
+import os
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Set
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+
+from .actions import DetectorActions, FileStamp
+from .const import (
+    ACTIONS_DIR_BASENAME,
+    ACTIONS_FILE_SUFFIX,
+    ACTIONS_RELOAD_DELAY_SECONDS,
+    ACTIONS_SCAN_INTERVAL_SECONDS,
+    DATA_WATCHER,
+    DOMAIN,
+)
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Krav i manifestet; skanning är reserv om paketet ändå saknas
+    FileSystemEventHandler = object
+    Observer = None
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _create_and_scan_directory(directory: str) -> Dict[str, FileStamp]:
+    """Körs i executor. Skapar katalogen vid behov och tar första svepet."""
+    os.makedirs(directory, exist_ok=True)
+    return _scan_directory(directory)
+
+
+def _scan_directory(directory: str) -> Dict[str, FileStamp]:
+    """Körs i executor. Stämplar för alla åtgärdsfiler i katalogen, i ett svep."""
+    stamps: Dict[str, FileStamp] = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(ACTIONS_FILE_SUFFIX) or not entry.is_file():
+                    continue
+                st = entry.stat()
+                stamps[entry.path] = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        pass
+    return stamps
+
+
+class _ActionsEventHandler(FileSystemEventHandler):
+    """Skickar watchdog-händelser (egen tråd) vidare till event-loopen."""
+
+    def __init__(self, hass: HomeAssistant, on_change: Callable[[str], None]) -> None:
+        super().__init__()
+        self._hass = hass
+        self._on_change = on_change
+
+    def on_any_event(self, event: Any) -> None:
+        if event.is_directory:
+            return
+        # Editorer sparar ofta via temporärfil + rename, så även dest_path räknas
+        for path in (event.src_path, getattr(event, "dest_path", "")):
+            if path and path.endswith(ACTIONS_FILE_SUFFIX):
+                self._hass.loop.call_soon_threadsafe(self._on_change, path)
+
+
+class ActionsDirectoryWatcher:
+    """En enda bevakare för alla detektorers åtgärdsfiler."""
+
+    def __init__(self, hass: HomeAssistant, directory: str) -> None:
+        self.hass = hass
+        self.directory = directory
+        # Sökväg -> detektorer som använder filen
+        self._subscribers: Dict[str, Set[DetectorActions]] = {}
+        self._pending_reloads: Dict[str, Callable[[], None]] = {}
+        self._observer: Any = None
+        self._remove_scan_interval: Optional[Callable[[], None]] = None
+        self._stamps: Optional[Dict[str, FileStamp]] = None
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._observer is not None
+
+    async def async_start(self) -> None:
+        """Startar inotify-bevakning, eller periodisk skanning som reserv.
+
+        Kastar OSError om katalogen inte kan skapas.
+        """
+        if Observer is None:
+            _LOGGER.info("Python-paketet watchdog saknas, %s skannas periodiskt i stället.", self.directory)
+        else:
+            try:
+                self._observer = await self.hass.async_add_executor_job(self._start_observer)
+                _LOGGER.debug("Bevakar %s med inotify.", self.directory)
+                return
+            except OSError as e:
+                _LOGGER.warning("Kunde inte starta filbevakning av %s (%s), skannar periodiskt i stället.", self.directory, e)
+                self._observer = None
+
+        self._stamps = await self.hass.async_add_executor_job(_create_and_scan_directory, self.directory)
+        self._remove_scan_interval = async_track_time_interval(
+            self.hass,
+            self._async_scan,
+            timedelta(seconds=ACTIONS_SCAN_INTERVAL_SECONDS),
+            name="knx_doubleclick actions scan",
+        )
+        _LOGGER.debug("Bevakar %s genom skanning var %s s.", self.directory, ACTIONS_SCAN_INTERVAL_SECONDS)
+
+    def _start_observer(self) -> Any:
+        os.makedirs(self.directory, exist_ok=True)
+        observer = Observer()
+        observer.schedule(
+            _ActionsEventHandler(self.hass, self._async_file_changed),
+            self.directory,
+            recursive=False,
+        )
+        observer.daemon = True
+        observer.start()
+        return observer
+
+    async def async_stop(self) -> None:
+        """Stoppar bevakningen och väntande omladdningar."""
+        for cancel in self._pending_reloads.values():
+            cancel()
+        self._pending_reloads.clear()
+        if self._remove_scan_interval is not None:
+            self._remove_scan_interval()
+            self._remove_scan_interval = None
+        if self._observer is not None:
+            observer, self._observer = self._observer, None
+            observer.stop()
+            await self.hass.async_add_executor_job(observer.join)
+
+    @callback
+    def async_subscribe(self, actions: DetectorActions) -> Callable[[], None]:
+        """Kopplar en detektors åtgärder till bevakningen av dess fil."""
+        path = os.path.normpath(actions.path)
+        self._subscribers.setdefault(path, set()).add(actions)
+
+        @callback
+        def _async_unsubscribe() -> None:
+            subscribers = self._subscribers.get(path)
+            if subscribers is None:
+                return
+            subscribers.discard(actions)
+            if not subscribers:
+                del self._subscribers[path]
+
+        return _async_unsubscribe
+
+    async def _async_scan(self, _now: Any = None) -> None:
+        """Reservläge: ett katalogsvep, omladdning bara för ändrade filer."""
+        stamps = await self.hass.async_add_executor_job(_scan_directory, self.directory)
+        previous = self._stamps or {}
+        self._stamps = stamps
+        for path in set(stamps) | set(previous):
+            if stamps.get(path) != previous.get(path):
+                self._async_file_changed(path)
+
+    @callback
+    def _async_file_changed(self, path: str) -> None:
+        """Skjuter upp omladdningen en kort stund så att en sparning ger en omladdning."""
+        path = os.path.normpath(path)
+        if path not in self._subscribers:
+            return
+        if (cancel := self._pending_reloads.pop(path, None)) is not None:
+            cancel()
+
+        @callback
+        def _async_reload(_now: Any) -> None:
+            self._pending_reloads.pop(path, None)
+            for actions in tuple(self._subscribers.get(path, ())):
+                self.hass.async_create_task(actions.async_load())
+
+        self._pending_reloads[path] = async_call_later(
+            self.hass, ACTIONS_RELOAD_DELAY_SECONDS, _async_reload
+        )
+
+
+@callback
+def async_get_watcher(hass: HomeAssistant) -> Optional[ActionsDirectoryWatcher]:
+    """Hämtar integrationens bevakare om den är startad."""
+    return hass.data.get(DOMAIN, {}).get(DATA_WATCHER)
+
+
+async def async_start_watcher(hass: HomeAssistant) -> ActionsDirectoryWatcher:
+    """Startar integrationens bevakare om den inte redan körs."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    watcher: Optional[ActionsDirectoryWatcher] = domain_data.get(DATA_WATCHER)
+    if watcher is None:
+        watcher = ActionsDirectoryWatcher(hass, hass.config.path(ACTIONS_DIR_BASENAME))
+        domain_data[DATA_WATCHER] = watcher
+        try:
+            await watcher.async_start()
+        except OSError:
+            domain_data.pop(DATA_WATCHER, None)
+            raise
+    return watcher
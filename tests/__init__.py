@@ -0,0 +1 @@
+"""Tester för KNX Dubbelklicksdetektor."""
@@ -0,0 +1,17 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: gemensamma fixturer för testerna (pytest-homeassistant-custom-component).
+
+"""Fixturer för testerna."""
+import pytest
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Låter Home Assistant hitta custom_components/knx_doubleclick."""
+    yield
@@ -0,0 +1,182 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: tester för DetectorActions (Script-körningar vid byte av
+#   körläge och urladdning, val mellan direktanrop och Script).
+# - Mallar i direktanrop renderas med trigger-variablerna.
+# - async_call_services i de tre exekveringslägena (fel, timeout).
+
+"""Tester för åtgärdsplaner och deras körning."""
+import asyncio
+
+from homeassistant.core import Context, HomeAssistant, ServiceCall
+
+from custom_components.knx_doubleclick.actions import (
+    DetectorActions,
+    async_call_services,
+)
+from custom_components.knx_doubleclick.const import (
+    EXECUTION_MODE_CONCURRENT,
+    EXECUTION_MODE_NON_BLOCKING,
+    EXECUTION_MODE_SEQUENTIAL,
+)
+
+DELAY_CONTENT = "double:\n  - delay: 60\n"
+
+
+async def _load(hass: HomeAssistant, tmp_path, content: str) -> DetectorActions:
+    path = tmp_path / "knapp.yaml"
+    path.write_text(content, encoding="utf-8")
+    actions = DetectorActions(hass, str(path), "Knapp")
+    assert await actions.async_load() is not None
+    return actions
+
+
+async def test_stop_reaches_script_replaced_during_run(hass: HomeAssistant, tmp_path) -> None:
+    actions = await _load(hass, tmp_path, DELAY_CONTENT)
+    plan = actions.plan.get("double")
+    old_script = actions.scripts[plan]
+    run = asyncio.ensure_future(actions.async_run(plan, {}, Context()))
+    await asyncio.sleep(0)
+    assert old_script.is_running
+
+    # Nytt körläge medan körningen pågår: den får slutföras i det gamla Scriptet
+    actions.async_set_script_mode("parallel", 5)
+    assert actions.scripts[plan] is not old_script
+    assert old_script.is_running
+
+    await actions.async_stop()
+    assert not old_script.is_running
+    await asyncio.wait_for(run, 1)
+
+
+async def test_replaced_script_that_finished_is_not_kept(hass: HomeAssistant, tmp_path) -> None:
+    actions = await _load(hass, tmp_path, DELAY_CONTENT)
+    actions.async_set_script_mode("parallel", 5)
+    actions.async_set_script_mode("queued", 5)
+    assert actions._retired_scripts == []
+
+
+async def test_continue_on_error_runs_via_script(hass: HomeAssistant, tmp_path) -> None:
+    actions = await _load(
+        hass,
+        tmp_path,
+        "double:\n"
+        "  - service: light.turn_on\n    target:\n      entity_id: light.a\n    continue_on_error: true\n"
+        "  - service: light.turn_on\n    target:\n      entity_id: light.b\n",
+    )
+    plan = actions.plan.get("double")
+    assert plan.direct_calls is None
+    assert plan in actions.scripts
+
+
+async def test_plain_service_calls_run_directly(hass: HomeAssistant, tmp_path) -> None:
+    actions = await _load(
+        hass, tmp_path, "double:\n  - service: light.turn_on\n    target:\n      entity_id: light.a\n"
+    )
+    plan = actions.plan.get("double")
+    assert [(call.domain, call.service) for call in plan.direct_calls] == [("light", "turn_on")]
+    assert actions.scripts == {}
+
+
+async def test_direct_call_renders_templates_with_trigger(hass: HomeAssistant, tmp_path) -> None:
+    actions = await _load(
+        hass,
+        tmp_path,
+        "double:\n"
+        "  - service: light.turn_on\n"
+        "    target:\n      entity_id: \"light.{{ trigger.gesture }}\"\n"
+        "    data:\n      brightness: \"{{ trigger.clicks * 10 }}\"\n      transition: 2\n",
+    )
+    (direct_call,) = actions.plan.get("double").direct_calls
+    assert direct_call.has_templates
+    assert direct_call.render({"trigger": {"gesture": "double", "clicks": 2}}) == (
+        "light",
+        "turn_on",
+        {"entity_id": "light.double", "brightness": 20, "transition": 2},
+    )
+    assert direct_call.render({"trigger": {"gesture": "triple", "clicks": 3}})[2]["brightness"] == 30
+
+
+async def test_direct_call_without_templates_returns_a_copy(hass: HomeAssistant, tmp_path) -> None:
+    actions = await _load(
+        hass, tmp_path, "double:\n  - service: light.turn_on\n    target:\n      entity_id: light.a\n"
+    )
+    (direct_call,) = actions.plan.get("double").direct_calls
+    assert not direct_call.has_templates
+    _domain, _service, data = direct_call.render({})
+    data["entity_id"] = "light.b"
+    assert direct_call.render({})[2] == {"entity_id": "light.a"}
+
+
+def _register_services(hass: HomeAssistant, calls: list[str]) -> asyncio.Event:
+    """Registrerar test.ok, test.fail och test.slow; slow väntar tills eventet sätts."""
+    release = asyncio.Event()
+
+    async def _ok(call: ServiceCall) -> None:
+        calls.append(call.data["entity_id"])
+
+    async def _fail(call: ServiceCall) -> None:
+        calls.append("fail")
+        raise ValueError("fel")
+
+    async def _slow(call: ServiceCall) -> None:
+        await release.wait()
+
+    hass.services.async_register("test", "ok", _ok)
+    hass.services.async_register("test", "fail", _fail)
+    hass.services.async_register("test", "slow", _slow)
+    return release
+
+
+async def test_sequential_stops_at_first_error(hass: HomeAssistant) -> None:
+    calls: list[str] = []
+    _register_services(hass, calls)
+    errors = await async_call_services(
+        hass,
+        [("test", "ok", {"entity_id": "a"}), ("test", "fail", {}), ("test", "ok", {"entity_id": "b"})],
+        EXECUTION_MODE_SEQUENTIAL,
+        1.0,
+        Context(),
+    )
+    assert calls == ["a", "fail"]
+    assert [(i, type(e)) for i, e in errors] == [(1, ValueError)]
+
+
+async def test_concurrent_times_out_slow_call_only(hass: HomeAssistant) -> None:
+    calls: list[str] = []
+    _register_services(hass, calls)
+    errors = await asyncio.wait_for(
+        async_call_services(
+            hass,
+            [("test", "slow", {}), ("test", "ok", {"entity_id": "a"}), ("test", "fail", {})],
+            EXECUTION_MODE_CONCURRENT,
+            0.05,
+            Context(),
+        ),
+        1,
+    )
+    assert "a" in calls
+    assert sorted((i, type(e)) for i, e in errors) == [(0, TimeoutError), (2, ValueError)]
+
+
+async def test_non_blocking_reports_only_call_errors(hass: HomeAssistant) -> None:
+    calls: list[str] = []
+    release = _register_services(hass, calls)
+    errors = await asyncio.wait_for(
+        async_call_services(
+            hass,
+            [("test", "slow", {}), ("test", "saknas", {}), ("test", "ok", {"entity_id": "a"})],
+            EXECUTION_MODE_NON_BLOCKING,
+            0.05,
+            Context(),
+        ),
+        1,
+    )
+    # Det långsamma anropet väntas inte in; bara den okända tjänsten blir ett fel
+    assert [i for i, _e in errors] == [1]
+    release.set()
+    await hass.async_block_till_done()
+    assert calls == ["a"]
@@ -0,0 +1,78 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: tester för ActionFilesLoader (batch, fel och avbrott).
+
+"""Tester för den batchade inläsningen av åtgärdsfiler."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.knx_doubleclick import actions
+from custom_components.knx_doubleclick.actions import ActionFilesLoader
+
+DEFAULT_CONTENT = "double:\n  - service: light.turn_off\n    target:\n      entity_id: light.hall\n"
+
+
+async def test_concurrent_requests_share_one_batch(hass: HomeAssistant, tmp_path) -> None:
+    loader = ActionFilesLoader(hass, str(tmp_path))
+    a, b = str(tmp_path / "a.yaml"), str(tmp_path / "b.yaml")
+    with patch(
+        "custom_components.knx_doubleclick.actions._prepare_actions_files",
+        wraps=actions._prepare_actions_files,
+    ) as prepare:
+        first, second = await asyncio.gather(
+            loader.async_prepare({a: DEFAULT_CONTENT}), loader.async_prepare({b: DEFAULT_CONTENT})
+        )
+    assert prepare.call_count == 1
+    assert list(first) == [a]
+    assert list(second) == [b]
+    assert first[a].error is None
+    assert (tmp_path / "b.yaml").read_text(encoding="utf-8") == DEFAULT_CONTENT
+
+
+async def test_os_error_reaches_every_waiter(hass: HomeAssistant, tmp_path) -> None:
+    blocker = tmp_path / "not_a_directory"
+    blocker.write_text("", encoding="utf-8")
+    loader = ActionFilesLoader(hass, str(blocker))
+    results = await asyncio.gather(
+        loader.async_prepare({str(blocker / "a.yaml"): DEFAULT_CONTENT}),
+        loader.async_prepare({str(blocker / "b.yaml"): DEFAULT_CONTENT}),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, OSError) for result in results)
+
+
+async def test_unexpected_error_is_logged_and_reaches_waiter(
+    hass: HomeAssistant, tmp_path, caplog: pytest.LogCaptureFixture
+) -> None:
+    loader = ActionFilesLoader(hass, str(tmp_path))
+    with patch(
+        "custom_components.knx_doubleclick.actions._prepare_actions_files",
+        side_effect=RuntimeError("fel"),
+    ), pytest.raises(RuntimeError):
+        await loader.async_prepare({str(tmp_path / "a.yaml"): DEFAULT_CONTENT})
+    assert "Oväntat fel när åtgärdsfiler förbereddes" in caplog.text
+
+
+async def test_cancelled_batch_cancels_waiters(hass: HomeAssistant, tmp_path) -> None:
+    loader = ActionFilesLoader(hass, str(tmp_path))
+    started = asyncio.Event()
+
+    async def _blocked_executor_job(hass, target, *args):
+        started.set()
+        await asyncio.Event().wait()
+
+    with patch("custom_components.knx_doubleclick.actions.async_add_executor_job", _blocked_executor_job):
+        waiter = hass.async_create_task(loader.async_prepare({str(tmp_path / "a.yaml"): DEFAULT_CONTENT}))
+        await started.wait()
+        batch = next(
+            task for task in asyncio.all_tasks() if task.get_name() == "knx_doubleclick actions batch"
+        )
+        batch.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(waiter, 1)
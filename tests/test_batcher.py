@@ -0,0 +1,128 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: tester för ServiceCallBatcher (sammanslagning, fel, avbrott
+#   och icke-blockerande anrop).
+
+"""Tester för sammanslagningen av serviceanrop."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import Context, HomeAssistant, ServiceCall
+
+from custom_components.knx_doubleclick.batcher import ServiceCallBatcher
+
+WINDOW = 0.01
+
+
+def _register(hass: HomeAssistant, calls: list[ServiceCall], error: Exception | None = None) -> None:
+    async def _handle(call: ServiceCall) -> None:
+        calls.append(call)
+        if error is not None:
+            raise error
+
+    hass.services.async_register("test", "turn_on", _handle)
+
+
+async def test_calls_within_window_are_merged(hass: HomeAssistant) -> None:
+    calls: list[ServiceCall] = []
+    _register(hass, calls)
+    batcher = ServiceCallBatcher(hass)
+    await asyncio.gather(
+        batcher.async_call("test", "turn_on", {"entity_id": "light.a", "brightness": 10}, WINDOW, True, Context()),
+        batcher.async_call("test", "turn_on", {"entity_id": ["light.b", "light.a"], "brightness": 10}, WINDOW, True, Context()),
+        batcher.async_call("test", "turn_on", {"entity_id": "light.c", "brightness": 20}, WINDOW, True, Context()),
+    )
+    assert sorted((call.data["brightness"], tuple(call.data["entity_id"])) for call in calls) == [
+        (10, ("light.a", "light.b")),
+        (20, ("light.c",)),
+    ]
+    assert batcher.async_diagnostics()["calls_saved"] == 1
+    assert batcher.async_diagnostics()["pending_batches"] == 0
+
+
+async def test_call_without_entity_id_runs_directly(hass: HomeAssistant) -> None:
+    calls: list[ServiceCall] = []
+    _register(hass, calls)
+    batcher = ServiceCallBatcher(hass)
+    await batcher.async_call("test", "turn_on", {"area_id": "hall"}, WINDOW, True, Context())
+    assert len(calls) == 1
+    assert batcher.async_diagnostics()["calls_direct"] == 1
+
+
+async def test_error_reaches_every_waiter(hass: HomeAssistant) -> None:
+    calls: list[ServiceCall] = []
+    _register(hass, calls, ValueError("fel"))
+    batcher = ServiceCallBatcher(hass)
+    results = await asyncio.gather(
+        batcher.async_call("test", "turn_on", {"entity_id": "light.a"}, WINDOW, True, Context()),
+        batcher.async_call("test", "turn_on", {"entity_id": "light.b"}, WINDOW, True, Context()),
+        return_exceptions=True,
+    )
+    assert len(calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+async def test_cancelled_execution_does_not_leave_waiters_hanging(hass: HomeAssistant) -> None:
+    batcher = ServiceCallBatcher(hass)
+    running: list[asyncio.Task] = []
+    started = asyncio.Event()
+
+    async def _hang(*args, **kwargs) -> None:
+        running.append(asyncio.current_task())
+        started.set()
+        await asyncio.sleep(60)
+
+    with patch("homeassistant.core.ServiceRegistry.async_call", _hang):
+        waiters = [
+            asyncio.ensure_future(
+                batcher.async_call("test", "turn_on", {"entity_id": entity_id}, WINDOW, True, Context())
+            )
+            for entity_id in ("light.a", "light.b")
+        ]
+        await started.wait()
+        running[0].cancel()
+        results = await asyncio.wait_for(asyncio.gather(*waiters, return_exceptions=True), 1)
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+
+
+async def test_shutdown_flushes_pending_batches(hass: HomeAssistant) -> None:
+    calls: list[ServiceCall] = []
+    _register(hass, calls)
+    batcher = ServiceCallBatcher(hass)
+    waiter = asyncio.ensure_future(
+        batcher.async_call("test", "turn_on", {"entity_id": "light.a"}, 60, True, Context())
+    )
+    await asyncio.sleep(0)
+    batcher.async_shutdown()
+    await asyncio.wait_for(waiter, 1)
+    assert len(calls) == 1
+    assert batcher.async_diagnostics()["pending_batches"] == 0
+
+
+async def test_non_blocking_call_returns_before_flush(hass: HomeAssistant) -> None:
+    calls: list[ServiceCall] = []
+    _register(hass, calls)
+    batcher = ServiceCallBatcher(hass)
+    for entity_id in ("light.a", "light.b"):
+        await asyncio.wait_for(
+            batcher.async_call("test", "turn_on", {"entity_id": entity_id}, 60, False, Context()), 0.5
+        )
+    assert calls == []
+    assert batcher.async_diagnostics()["pending_batches"] == 1
+    batcher.async_shutdown()
+    await hass.async_block_till_done()
+    assert [call.data["entity_id"] for call in calls] == [["light.a", "light.b"]]
+
+
+async def test_non_blocking_batch_error_is_logged(
+    hass: HomeAssistant, caplog: pytest.LogCaptureFixture
+) -> None:
+    batcher = ServiceCallBatcher(hass)
+    await batcher.async_call("test", "saknas", {"entity_id": "light.a"}, WINDOW, False, Context())
+    await asyncio.sleep(WINDOW * 2)
+    await hass.async_block_till_done()
+    assert "Sammanslaget anrop till test.saknas misslyckades" in caplog.text
@@ -0,0 +1,82 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: tester för TelegramDeduplicator.
+
+"""Tester för dubblettfiltret."""
+from custom_components.knx_doubleclick.dedupe import (
+    TelegramDeduplicator,
+    format_individual_address,
+    source_line,
+)
+
+
+def test_copy_within_window_is_duplicate() -> None:
+    dedupe = TelegramDeduplicator(16)
+    assert not dedupe.is_duplicate("1.1.5", "1/1/1", [1], 10.0, 0.05)
+    # knx_event har DPTArray som lista; samma payload oavsett lista eller tupel
+    assert dedupe.is_duplicate("1.1.5", "1/1/1", (1,), 10.03, 0.05)
+    assert dedupe.suppressed == 1
+
+
+def test_window_counts_from_first_copy() -> None:
+    dedupe = TelegramDeduplicator(16)
+    assert not dedupe.is_duplicate("1.1.5", "1/1/1", 1, 10.0, 0.05)
+    assert dedupe.is_duplicate("1.1.5", "1/1/1", 1, 10.04, 0.05)
+    # Ett nytt tryck efter fönstret släpps igenom och blir ny första kopia
+    assert not dedupe.is_duplicate("1.1.5", "1/1/1", 1, 10.06, 0.05)
+    assert dedupe.is_duplicate("1.1.5", "1/1/1", 1, 10.08, 0.05)
+
+
+def test_other_source_address_or_payload_is_not_duplicate() -> None:
+    dedupe = TelegramDeduplicator(16)
+    assert not dedupe.is_duplicate("1.1.5", "1/1/1", 1, 10.0, 0.05)
+    assert not dedupe.is_duplicate("1.1.6", "1/1/1", 1, 10.01, 0.05)
+    assert not dedupe.is_duplicate("1.1.5", "1/1/2", 1, 10.01, 0.05)
+    assert not dedupe.is_duplicate("1.1.5", "1/1/1", 0, 10.01, 0.05)
+    assert dedupe.suppressed == 0
+
+
+def test_without_source_everything_passes() -> None:
+    dedupe = TelegramDeduplicator(16)
+    assert not dedupe.is_duplicate(None, "1/1/1", 1, 10.0, 0.05)
+    assert not dedupe.is_duplicate(None, "1/1/1", 1, 10.0, 0.05)
+    assert len(dedupe) == 0
+
+
+def test_table_is_bounded_lru() -> None:
+    dedupe = TelegramDeduplicator(3)
+    for sub in range(3):
+        dedupe.is_duplicate("1.1.5", f"1/1/{sub}", 1, 10.0, 1.0)
+    # Användning flyttar inte nyckeln; bara en ny första kopia gör det
+    dedupe.is_duplicate("1.1.5", "1/1/9", 1, 10.1, 1.0)
+    assert len(dedupe) == 3
+    # Den äldsta nyckeln har trängts ut och räknas som ny
+    assert not dedupe.is_duplicate("1.1.5", "1/1/0", 1, 10.2, 1.0)
+    assert dedupe.is_duplicate("1.1.5", "1/1/9", 1, 10.2, 1.0)
+    dedupe.clear()
+    assert len(dedupe) == 0
+
+
+def test_as_dict_groups_by_source_and_line() -> None:
+    dedupe = TelegramDeduplicator(16)
+    # xknx levererar individuella adresser som 16-bitars heltal
+    raw_117 = (1 << 12) | (1 << 8) | 7
+    for source in ("1.1.5", "1.1.6", raw_117, "1.2.1"):
+        dedupe.is_duplicate(source, "1/1/1", 1, 10.0, 0.05)
+        dedupe.is_duplicate(source, "1/1/1", 1, 10.01, 0.05)
+    dedupe.is_duplicate("1.1.5", "1/1/1", 1, 10.02, 0.05)
+    summary = dedupe.as_dict()
+    assert summary["suppressed"] == 5
+    assert summary["tracked_keys"] == 4
+    assert summary["suppressed_by_line"] == {"1.1": 4, "1.2": 1}
+    assert summary["suppressed_by_source"] == {"1.1.5": 2, "1.1.6": 1, "1.1.7": 1, "1.2.1": 1}
+
+
+def test_address_formatting() -> None:
+    assert format_individual_address((1 << 12) | (2 << 8) | 3) == "1.2.3"
+    assert format_individual_address("1.2.3") == "1.2.3"
+    assert source_line("1.2.3") == "1.2"
+    assert source_line(None) is None
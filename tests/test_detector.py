@@ -0,0 +1,220 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: tester för TimerWheel och GestureClassifier (N-klick och håll)
+#   med en fejkad loop.
+
+"""Tester för timerhjulet och gestklassificeraren."""
+import pytest
+
+from custom_components.knx_doubleclick.detector import GestureClassifier, TimerWheel
+
+
+class FakeHandle:
+    def __init__(self, when: float, callback) -> None:
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class FakeLoop:
+    """Loop med styrd klocka; TimerWheel behöver bara time() och call_at()."""
+
+    def __init__(self, now: float = 100.0) -> None:
+        self.now = now
+        self.handles: list[FakeHandle] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def call_at(self, when: float, callback) -> FakeHandle:
+        handle = FakeHandle(when, callback)
+        self.handles.append(handle)
+        return handle
+
+    @property
+    def pending(self) -> list[FakeHandle]:
+        return [handle for handle in self.handles if not handle.cancelled]
+
+    def advance(self, seconds: float) -> None:
+        """Flyttar klockan och kör förfallna anrop i tidsordning."""
+        target = self.now + seconds
+        while due := sorted(
+            (handle for handle in self.pending if handle.when <= target), key=lambda handle: handle.when
+        ):
+            handle = due[0]
+            self.handles.remove(handle)
+            self.now = max(self.now, handle.when)
+            handle.callback()
+        self.now = target
+
+
+@pytest.fixture
+def loop() -> FakeLoop:
+    return FakeLoop()
+
+
+@pytest.fixture
+def wheel(loop: FakeLoop) -> TimerWheel:
+    return TimerWheel(loop, tick_seconds=0.02)
+
+
+def _classifier(
+    wheel: TimerWheel,
+    gestures: list[tuple[str, int]],
+    window: float = 0.5,
+    max_clicks: int = 2,
+    resolve_counts: frozenset = frozenset({1}),
+    hold_seconds: float | None = None,
+) -> GestureClassifier:
+    classifier = GestureClassifier(wheel, lambda gesture, clicks: gestures.append((gesture, clicks)))
+    classifier.configure(window, max_clicks, resolve_counts, hold_seconds)
+    return classifier
+
+
+def test_wheel_fires_on_first_tick_after_deadline(loop: FakeLoop, wheel: TimerWheel) -> None:
+    fired: list[float] = []
+    wheel.schedule(loop.now + 0.05, lambda: fired.append(loop.now))
+    loop.advance(0.04)
+    assert fired == []
+    loop.advance(0.03)
+    assert len(fired) == 1
+    assert 100.05 <= fired[0] < 100.05 + 0.02 + 1e-9
+    assert len(wheel) == 0
+    # Hjulet står still när inga timers väntar
+    assert loop.pending == []
+
+
+def test_wheel_uses_one_loop_handle_for_many_timers(loop: FakeLoop, wheel: TimerWheel) -> None:
+    fired: list[int] = []
+    for i in range(100):
+        wheel.schedule(loop.now + 0.1 + i * 0.001, lambda i=i: fired.append(i))
+    assert len(wheel) == 100
+    assert len(loop.pending) == 1
+    loop.advance(0.3)
+    assert sorted(fired) == list(range(100))
+
+
+def test_wheel_cancel_and_stop(loop: FakeLoop, wheel: TimerWheel) -> None:
+    fired: list[str] = []
+    timer = wheel.schedule(loop.now + 0.1, lambda: fired.append("a"))
+    timer.cancel()
+    assert len(wheel) == 0
+    assert loop.pending == []
+    wheel.schedule(loop.now + 0.1, lambda: fired.append("b"))
+    wheel.schedule(loop.now + 20.0, lambda: fired.append("c"))  # mer än ett varv bort
+    wheel.stop()
+    loop.advance(30.0)
+    assert fired == []
+
+
+def test_wheel_deadline_more_than_one_turn_away(loop: FakeLoop, wheel: TimerWheel) -> None:
+    # 512 fack à 0,02 s är ett varv på 10,24 s
+    fired: list[float] = []
+    wheel.schedule(loop.now + 15.0, lambda: fired.append(loop.now))
+    loop.advance(14.9)
+    assert fired == []
+    loop.advance(0.2)
+    assert len(fired) == 1
+    assert fired[0] >= 115.0
+
+
+def test_double_click_resolves_immediately_at_max_clicks(loop: FakeLoop, wheel: TimerWheel) -> None:
+    gestures: list[tuple[str, int]] = []
+    classifier = _classifier(wheel, gestures)
+    assert classifier.press(loop.now) is None
+    loop.advance(0.3)
+    assert classifier.press(loop.now) == pytest.approx(0.3)
+    assert gestures == [("double", 2)]
+    assert classifier.last_interval == pytest.approx(0.3)
+
+
+def test_single_click_resolves_when_window_elapses(loop: FakeLoop, wheel: TimerWheel) -> None:
+    gestures: list[tuple[str, int]] = []
+    classifier = _classifier(wheel, gestures)
+    classifier.press(loop.now)
+    loop.advance(0.45)
+    assert gestures == []
+    loop.advance(0.1)
+    assert gestures == [("single", 1)]
+
+
+def test_press_outside_window_starts_new_sequence(loop: FakeLoop, wheel: TimerWheel) -> None:
+    gestures: list[tuple[str, int]] = []
+    # Utan egen gest för ett klick väntar sekvensen inte på någon timer
+    classifier = _classifier(wheel, gestures, resolve_counts=frozenset())
+    classifier.press(loop.now)
+    assert len(wheel) == 0
+    loop.advance(0.8)
+    assert classifier.press(loop.now) is None
+    assert classifier.clicks == 1
+    loop.advance(0.2)
+    classifier.press(loop.now)
+    assert gestures == [("double", 2)]
+
+
+@pytest.mark.parametrize(
+    ("presses", "expected"),
+    [
+        (1, [("single", 1)]),
+        (2, [("double", 2)]),
+        (3, [("triple", 3)]),
+        (4, [("click_4", 4)]),
+    ],
+)
+def test_n_click_sequences(loop: FakeLoop, wheel: TimerWheel, presses: int, expected) -> None:
+    gestures: list[tuple[str, int]] = []
+    classifier = _classifier(wheel, gestures, max_clicks=4, resolve_counts=frozenset({1, 2, 3}))
+    for _ in range(presses):
+        classifier.press(loop.now)
+        loop.advance(0.2)
+    loop.advance(1.0)
+    assert gestures == expected
+
+
+def test_hold_fires_after_hold_seconds(loop: FakeLoop, wheel: TimerWheel) -> None:
+    gestures: list[tuple[str, int]] = []
+    classifier = _classifier(wheel, gestures, hold_seconds=0.6)
+    classifier.press(loop.now)
+    loop.advance(0.5)
+    assert gestures == []
+    loop.advance(0.2)
+    assert gestures == [("hold", 0)]
+    # Släppet efter håll ger inget klick
+    classifier.release(loop.now)
+    loop.advance(1.0)
+    assert gestures == [("hold", 0)]
+
+
+def test_short_press_with_hold_counts_as_click(loop: FakeLoop, wheel: TimerWheel) -> None:
+    gestures: list[tuple[str, int]] = []
+    classifier = _classifier(wheel, gestures, hold_seconds=0.6)
+    classifier.press(loop.now)
+    loop.advance(0.1)
+    classifier.release(loop.now)
+    loop.advance(1.0)
+    assert gestures == [("single", 1)]
+
+    classifier.press(loop.now)
+    loop.advance(0.1)
+    classifier.release(loop.now)
+    loop.advance(0.1)
+    classifier.press(loop.now)
+    loop.advance(0.1)
+    classifier.release(loop.now)
+    assert gestures == [("single", 1), ("double", 2)]
+
+
+def test_reset_drops_pending_sequence(loop: FakeLoop, wheel: TimerWheel) -> None:
+    gestures: list[tuple[str, int]] = []
+    classifier = _classifier(wheel, gestures)
+    classifier.press(loop.now)
+    classifier.reset()
+    loop.advance(1.0)
+    assert gestures == []
+    assert len(wheel) == 0
@@ -0,0 +1,159 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: tester för dispatcherns GA-index och tolkningen av knx_event.
+# - Registreringen hos KNX-integrationen lämnar andras GA orörda.
+# - Hanterarna får eventets ankomsttid i loop-tid.
+
+"""Tester för den gemensamma dispatchern."""
+import time
+from types import SimpleNamespace
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_mock_service
+
+from custom_components.knx_doubleclick.const import (
+    KNX_DOMAIN,
+    KNX_SERVICE_EVENT_REGISTER,
+)
+from custom_components.knx_doubleclick.detector import (
+    coerce_event_value,
+    parse_group_address,
+)
+from custom_components.knx_doubleclick.dispatcher import KnxDoubleClickDispatcher
+
+
+def _recorder(calls: list[tuple[str, int]], name: str):
+    def _handler(value: int, received: float) -> None:
+        calls.append((name, value))
+    return _handler
+
+
+def _fire(hass: HomeAssistant, destination: str, data) -> None:
+    hass.bus.async_fire("knx_event", {"destination": destination, "data": data, "direction": "Incoming"})
+
+
+@pytest.mark.parametrize(
+    ("event_data", "expected"),
+    [
+        ({"value": 1}, 1),
+        ({"data": 1}, 1),
+        ({"data": [5]}, 5),
+        ({"value": None, "data": [7]}, 7),
+        ({"value": "3"}, 3),
+        ({"value": 2.0}, 2),
+        ({"data": [1, 2]}, None),
+        ({"value": "på"}, None),
+        ({}, None),
+    ],
+)
+def test_coerce_event_value(event_data, expected) -> None:
+    assert coerce_event_value(event_data) == expected
+
+
+async def test_routes_only_matching_group_address_and_value(hass: HomeAssistant) -> None:
+    dispatcher = KnxDoubleClickDispatcher(hass)
+    calls: list[tuple[str, int]] = []
+    dispatcher.async_register("1/1/1", 1, _recorder(calls, "a"))
+    dispatcher.async_register("1/1/1", 1, _recorder(calls, "b"))
+    dispatcher.async_register("1/1/1", 0, _recorder(calls, "c"))
+    dispatcher.async_register("1/1/2", 1, _recorder(calls, "d"))
+
+    _fire(hass, "1/1/1", 1)
+    _fire(hass, "1/1/9", 1)
+    await hass.async_block_till_done()
+
+    # Flera detektorer på samma GA och värde får samma telegram
+    assert calls == [("a", 1), ("b", 1)]
+    counters = dispatcher.async_ga_counters("1/1/1")
+    assert (counters.seen, counters.matched) == (1, 1)
+    assert dispatcher.async_ga_counters("1/1/9") is None
+
+    _fire(hass, "1/1/1", 0)
+    _fire(hass, "1/1/1", 5)
+    await hass.async_block_till_done()
+    assert calls[2:] == [("c", 0)]
+    assert (counters.seen, counters.matched) == (3, 2)
+    await dispatcher.async_shutdown()
+
+
+async def test_received_is_loop_time_when_event_was_fired(hass: HomeAssistant) -> None:
+    dispatcher = KnxDoubleClickDispatcher(hass)
+    received: list[float] = []
+    dispatcher.async_register("1/1/1", 1, lambda value, when: received.append(when))
+
+    # Eventet avfyrades 0,2 s innan hanteraren kördes
+    hass.bus.async_fire(
+        "knx_event", {"destination": "1/1/1", "data": 1}, time_fired=time.time() - 0.2
+    )
+    await hass.async_block_till_done()
+
+    assert len(received) == 1
+    assert hass.loop.time() - received[0] == pytest.approx(0.2, abs=0.05)
+    await dispatcher.async_shutdown()
+
+
+async def test_unregister_updates_index_in_place(hass: HomeAssistant) -> None:
+    dispatcher = KnxDoubleClickDispatcher(hass)
+    calls: list[tuple[str, int]] = []
+    remove_a = dispatcher.async_register("1/1/1", 1, _recorder(calls, "a"))
+    remove_b = dispatcher.async_register("1/1/1", 1, _recorder(calls, "b"))
+    assert hass.bus.async_listeners().get("knx_event") == 1
+
+    remove_a()
+    _fire(hass, "1/1/1", 1)
+    await hass.async_block_till_done()
+    assert calls == [("b", 1)]
+    assert dispatcher.group_addresses == ["1/1/1"]
+
+    # Sista hanteraren borta: ingen lyssnare kvar på bussen
+    remove_b()
+    remove_b()
+    assert dispatcher.group_addresses == []
+    assert hass.bus.async_listeners().get("knx_event") is None
+    await dispatcher.async_shutdown()
+
+
+async def test_handler_may_unregister_while_dispatching(hass: HomeAssistant) -> None:
+    dispatcher = KnxDoubleClickDispatcher(hass)
+    calls: list[tuple[str, int]] = []
+    removers = []
+
+    def _once(value: int, received: float) -> None:
+        calls.append(("once", value))
+        removers[0]()
+
+    removers.append(dispatcher.async_register("1/1/1", 1, _once))
+    dispatcher.async_register("1/1/1", 1, _recorder(calls, "kvar"))
+    _fire(hass, "1/1/1", 1)
+    _fire(hass, "1/1/1", 1)
+    await hass.async_block_till_done()
+    assert calls == [("once", 1), ("kvar", 1), ("kvar", 1)]
+    await dispatcher.async_shutdown()
+
+
+async def test_event_register_leaves_external_addresses_alone(hass: HomeAssistant) -> None:
+    # KNX-integrationens eventfilter där 1/1/2 redan registrerats av någon annan
+    registered = [SimpleNamespace(raw=parse_group_address("1/1/2"))]
+    hass.data[KNX_DOMAIN] = SimpleNamespace(knx_event_callback=SimpleNamespace(group_addresses=registered))
+    calls = async_mock_service(hass, KNX_DOMAIN, KNX_SERVICE_EVENT_REGISTER)
+    dispatcher = KnxDoubleClickDispatcher(hass)
+    remove_own = dispatcher.async_register("1/1/1", 1, _recorder([], "a"))
+    remove_external = dispatcher.async_register("1/1/2", 1, _recorder([], "b"))
+
+    await dispatcher._async_sync_knx_event_registration()
+    assert [call.data for call in calls] == [{"address": ["1/1/1"]}]
+    diagnostics = dispatcher.async_diagnostics()
+    assert diagnostics["registered_event_addresses"] == ["1/1/1"]
+    assert diagnostics["external_event_addresses"] == ["1/1/2"]
+
+    remove_own()
+    remove_external()
+    await dispatcher._async_sync_knx_event_registration()
+    assert [call.data for call in calls[1:]] == [{"address": ["1/1/1"], "remove": True}]
+    assert dispatcher.async_diagnostics()["external_event_addresses"] == []
+    await dispatcher.async_shutdown()
+    assert len(calls) == 2
@@ -0,0 +1,108 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: tester för avkodarna per datapunktstyp och gruppadresser som
+#   16-bitars heltal.
+
+"""Tester för tolkningen av telegrammens payload."""
+import pytest
+
+from custom_components.knx_doubleclick.detector import (
+    DPT_AUTO,
+    DPT_COUNTER,
+    DPT_RAW,
+    DPT_SCENE_CONTROL,
+    DPT_SCENE_NUMBER,
+    DPT_SWITCH,
+    DPTS,
+    coerce_event_value,
+    dpt_value_range,
+    event_value_decoder,
+    format_group_address,
+    parse_group_address,
+    payload_value_decoder,
+)
+
+
+@pytest.mark.parametrize(
+    ("dpt", "payload", "expected"),
+    [
+        (DPT_AUTO, 1, 1),
+        (DPT_AUTO, (7,), 7),
+        (DPT_AUTO, (1, 2), None),
+        (DPT_SWITCH, 0, 0),
+        (DPT_SWITCH, 1, 1),
+        (DPT_SWITCH, 2, None),
+        (DPT_SWITCH, (1,), None),
+        (DPT_COUNTER, (255,), 255),
+        (DPT_COUNTER, 1, None),
+        # Scen 1 skickas som 0 på bussen
+        (DPT_SCENE_NUMBER, (0,), 1),
+        (DPT_SCENE_NUMBER, (63,), 64),
+        (DPT_SCENE_CONTROL, (4,), 5),
+        # Bit 7 är inlärning av scenen, inte en aktivering
+        (DPT_SCENE_CONTROL, (0x84,), None),
+        (DPT_RAW, 1, 1),
+        (DPT_RAW, (0x12, 0x34), 0x1234),
+        (DPT_RAW, (), None),
+        (DPT_RAW, None, None),
+    ],
+)
+def test_payload_decoders(dpt: str, payload, expected) -> None:
+    assert payload_value_decoder(dpt)(payload) == expected
+    assert event_value_decoder(dpt)({"data": payload}) == expected
+
+
+def test_unknown_dpt_falls_back_to_auto() -> None:
+    assert payload_value_decoder("9")((3,)) == 3
+    assert event_value_decoder("9") is coerce_event_value
+
+
+def test_event_decoder_is_shared_per_dpt() -> None:
+    # Dispatchern grupperar hanterare per avkodare och avkodar en gång per telegram
+    for dpt in DPTS:
+        assert event_value_decoder(dpt) is event_value_decoder(dpt)
+        assert payload_value_decoder(dpt) is payload_value_decoder(dpt)
+
+
+def test_auto_event_prefers_decoded_value() -> None:
+    assert event_value_decoder(DPT_AUTO)({"value": 4, "data": [9]}) == 4
+    # Med en DPT tolkas alltid rådata, inte KNX-integrationens value
+    assert event_value_decoder(DPT_COUNTER)({"value": 4, "data": [9]}) == 9
+
+
+@pytest.mark.parametrize(
+    ("dpt", "expected"),
+    [(DPT_AUTO, None), (DPT_SWITCH, (0, 1)), (DPT_COUNTER, (0, 255)), (DPT_SCENE_NUMBER, (1, 64)), (DPT_RAW, None)],
+)
+def test_dpt_value_range(dpt: str, expected) -> None:
+    assert dpt_value_range(dpt) == expected
+
+
+@pytest.mark.parametrize(
+    ("address", "raw"),
+    [
+        ("0/0/1", 1),
+        ("1/2/3", 2563),
+        ("31/7/255", 0xFFFF),
+        ("1/234", (1 << 11) | 234),
+        (" 1/2/3 ", 2563),
+        ("4660", 4660),
+        ("32/0/0", None),
+        ("1/8/0", None),
+        ("1/2/256", None),
+        ("1/2048", None),
+        ("1/-/-", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_parse_group_address(address, raw) -> None:
+    assert parse_group_address(address) == raw
+
+
+def test_format_group_address_round_trip() -> None:
+    for address in ("0/0/1", "1/2/3", "31/7/255"):
+        assert format_group_address(parse_group_address(address)) == address
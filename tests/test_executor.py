@@ -0,0 +1,110 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: tester för ActionExecutor och överlappspolicyerna.
+
+"""Tester för exekveraren av åtgärdskörningar."""
+import asyncio
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.knx_doubleclick.const import (
+    OVERLAP_POLICY_DROP,
+    OVERLAP_POLICY_QUEUE,
+    OVERLAP_POLICY_RESTART,
+)
+from custom_components.knx_doubleclick.executor import ActionExecutor
+
+
+class Runs:
+    """Körningar som blir klara först när testet släpper dem."""
+
+    def __init__(self) -> None:
+        self.started: list[str] = []
+        self.finished: list[str] = []
+        self.cancelled: list[str] = []
+        self.release = asyncio.Event()
+
+    def factory(self, name: str):
+        async def _run() -> None:
+            self.started.append(name)
+            try:
+                await self.release.wait()
+            except asyncio.CancelledError:
+                self.cancelled.append(name)
+                raise
+            self.finished.append(name)
+
+        return _run
+
+
+async def test_drop_discards_run_while_busy(hass: HomeAssistant) -> None:
+    runs = Runs()
+    executor = ActionExecutor(hass, "Knapp", OVERLAP_POLICY_DROP)
+    assert executor.async_submit(runs.factory("a"))
+    assert not executor.async_submit(runs.factory("b"))
+    await asyncio.sleep(0)
+    runs.release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert runs.finished == ["a"]
+    assert not executor.is_running
+
+
+async def test_queue_runs_in_order_up_to_depth(hass: HomeAssistant) -> None:
+    runs = Runs()
+    executor = ActionExecutor(hass, "Knapp", OVERLAP_POLICY_QUEUE, max_depth=2)
+    assert executor.async_submit(runs.factory("a"))
+    assert executor.async_submit(runs.factory("b"))
+    assert executor.async_submit(runs.factory("c"))
+    assert not executor.async_submit(runs.factory("d"))
+    await asyncio.sleep(0)
+    assert runs.started == ["a"]
+    runs.release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert runs.finished == ["a", "b", "c"]
+
+
+async def test_restart_cancels_running_and_drops_queued(hass: HomeAssistant) -> None:
+    runs = Runs()
+    executor = ActionExecutor(hass, "Knapp", OVERLAP_POLICY_QUEUE, max_depth=2)
+    executor.async_submit(runs.factory("a"))
+    executor.async_submit(runs.factory("b"))
+    await asyncio.sleep(0)
+    executor.async_configure(OVERLAP_POLICY_RESTART, 2)
+    assert executor.async_submit(runs.factory("c"))
+    await asyncio.sleep(0)
+    runs.release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert runs.cancelled == ["a"]
+    assert runs.finished == ["c"]
+
+
+async def test_failed_run_is_logged_and_queue_continues(hass: HomeAssistant, caplog) -> None:
+    runs = Runs()
+    executor = ActionExecutor(hass, "Knapp", OVERLAP_POLICY_QUEUE, max_depth=1)
+
+    async def _fail() -> None:
+        raise RuntimeError("fel")
+
+    executor.async_submit(_fail)
+    executor.async_submit(runs.factory("b"))
+    runs.release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert "Oväntat fel i åtgärdskörning för Knapp" in caplog.text
+    assert runs.finished == ["b"]
+
+
+async def test_shutdown_cancels_running_and_clears_queue(hass: HomeAssistant) -> None:
+    runs = Runs()
+    executor = ActionExecutor(hass, "Knapp", OVERLAP_POLICY_QUEUE, max_depth=1)
+    executor.async_submit(runs.factory("a"))
+    executor.async_submit(runs.factory("b"))
+    await asyncio.sleep(0)
+    await executor.async_shutdown()
+    runs.release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert runs.cancelled == ["a"]
+    assert runs.started == ["a"]
+    assert not executor.is_running
@@ -0,0 +1,129 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: tester för knappimporten (CSV, ETS-export), merge_buttons och
+#   valideringen av hubbens knapprader.
+
+"""Tester för knappimporten till en hubb."""
+import pytest
+
+from custom_components.knx_doubleclick.config_flow import _button_errors
+from custom_components.knx_doubleclick.const import (
+    CONF_ACTIONS_FILE,
+    CONF_BUTTON_ID,
+    CONF_DOUBLE_CLICK_WINDOW_SECONDS,
+    CONF_KNX_GROUP_ADDRESS,
+    CONF_KNX_VALUE,
+    CONF_NAME_SUFFIX,
+)
+from custom_components.knx_doubleclick.importer import (
+    InvalidButtonImport,
+    merge_buttons,
+    parse_button_import,
+)
+
+
+def _addresses(rows: list[dict]) -> list[tuple[str, int]]:
+    return [(row[CONF_KNX_GROUP_ADDRESS], row[CONF_KNX_VALUE]) for row in rows]
+
+
+def test_own_csv_with_semicolons_and_defaults() -> None:
+    result = parse_button_import(
+        "name;group_address;value;window;actions_file\n"
+        "Hall;1/1/1;;0,6;\n"
+        "Kök;1/1/2;0;;delad.yaml\n"
+        "\n",
+        default_value=1,
+    )
+    assert result.skipped == 0
+    hall, kitchen = result.rows
+    assert hall == {
+        CONF_NAME_SUFFIX: "Hall",
+        CONF_KNX_GROUP_ADDRESS: "1/1/1",
+        CONF_KNX_VALUE: 1,
+        CONF_DOUBLE_CLICK_WINDOW_SECONDS: 0.6,
+    }
+    assert kitchen[CONF_KNX_VALUE] == 0
+    assert kitchen[CONF_ACTIONS_FILE] == "delad.yaml"
+    assert CONF_DOUBLE_CLICK_WINDOW_SECONDS not in kitchen
+
+
+def test_ets_csv_skips_ranges_invalid_addresses_and_other_dpts() -> None:
+    text = (
+        '"Group name","Address","Central","Unfiltered","Description","DatapointType","Security"\n'
+        '"Våning 1","1/-/-","","","","",""\n'
+        '"Hall tryck","1/1/1","","","","DPST-1-1",""\n'
+        '"Hall dimmer","1/1/3","","","","DPST-5-1",""\n'
+        '"Fel adress","1/9/300","","","","DPST-1-1",""\n'
+        '"Utan DPT","1/1/4","","","","",""\n'
+    )
+    result = parse_button_import(text, default_value=1)
+    assert _addresses(result.rows) == [("1/1/1", 1), ("1/1/4", 1)]
+    assert result.rows[0][CONF_NAME_SUFFIX] == "Hall tryck"
+    assert result.skipped == 3
+
+
+def test_ets_xml_with_namespace() -> None:
+    text = (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<GroupAddress-Export xmlns="http://knx.org/xml/ga-export/01">'
+        '<GroupRange Name="Våning 1" RangeStart="2048" RangeEnd="4095">'
+        '<GroupAddress Name="Hall" Address="1/1/1" DPTs="DPST-1-1" />'
+        '<GroupAddress Name="Dimmer" Address="1/1/2" DPTs="DPST-5-1" />'
+        "</GroupRange></GroupAddress-Export>"
+    )
+    result = parse_button_import(text, default_value=1)
+    assert _addresses(result.rows) == [("1/1/1", 1)]
+    assert result.skipped == 1
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "name,value\nHall,1\n",
+        "group_address,value\n1/1/1,på\n",
+        "group_address,window\n1/1/1,snabbt\n",
+        "<GroupAddress-Export><GroupAddress",
+    ],
+)
+def test_invalid_imports_raise(text: str) -> None:
+    with pytest.raises(InvalidButtonImport):
+        parse_button_import(text, default_value=1)
+
+
+def test_merge_keeps_ids_of_existing_buttons() -> None:
+    existing = [
+        {CONF_BUTTON_ID: "a1", CONF_NAME_SUFFIX: "Hall", CONF_KNX_GROUP_ADDRESS: "1/1/1", CONF_KNX_VALUE: 1},
+        {CONF_BUTTON_ID: "b2", CONF_NAME_SUFFIX: "Kök", CONF_KNX_GROUP_ADDRESS: "1/1/2", CONF_KNX_VALUE: 1},
+    ]
+    imported = [
+        {CONF_NAME_SUFFIX: "Hallen", CONF_KNX_GROUP_ADDRESS: "1/1/1", CONF_KNX_VALUE: 1},
+        {CONF_NAME_SUFFIX: "Kök", CONF_KNX_GROUP_ADDRESS: "1/1/2", CONF_KNX_VALUE: 1},
+        {CONF_NAME_SUFFIX: "Kök av", CONF_KNX_GROUP_ADDRESS: "1/1/2", CONF_KNX_VALUE: 0},
+    ]
+    buttons, added, updated = merge_buttons(existing, imported)
+    assert (added, updated) == (1, 1)
+    assert [row[CONF_BUTTON_ID] for row in buttons[:2]] == ["a1", "b2"]
+    assert buttons[0][CONF_NAME_SUFFIX] == "Hallen"
+    assert buttons[2][CONF_BUTTON_ID] not in ("a1", "b2")
+    # Den befintliga tabellen ändras inte
+    assert existing[0][CONF_NAME_SUFFIX] == "Hall"
+
+
+@pytest.mark.parametrize(
+    ("address", "value", "dpt", "expected"),
+    [
+        ("1/1/1", 1, "1", {}),
+        ("1/1", 1, "auto", {}),
+        ("1/9/300", 1, "auto", {CONF_KNX_GROUP_ADDRESS: "invalid_group_address"}),
+        ("hall", 1, "auto", {CONF_KNX_GROUP_ADDRESS: "invalid_group_address"}),
+        ("1/1/1", 2, "1", {CONF_KNX_VALUE: "value_out_of_range"}),
+        ("1/1/1", 0, "17", {CONF_KNX_VALUE: "value_out_of_range"}),
+        ("1/1/1", 64, "17", {}),
+    ],
+)
+def test_button_errors(address: str, value: int, dpt: str, expected: dict) -> None:
+    assert _button_errors({CONF_KNX_GROUP_ADDRESS: address, CONF_KNX_VALUE: value}, dpt) == expected
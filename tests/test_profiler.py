@@ -0,0 +1,73 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: tester för hur den profilerade korutinen drivs (resultat,
+#   fel, avbrott och stängning).
+
+"""Tester för profileringen av korutiner."""
+import asyncio
+
+import pytest
+
+from custom_components.knx_doubleclick.profiler import ScopedProfiler
+
+
+@pytest.fixture
+def profiler():
+    profiler = ScopedProfiler()
+    profiler.start()
+    yield profiler
+    profiler.stop()
+
+
+async def test_result_and_error_pass_through(profiler: ScopedProfiler) -> None:
+    async def _ok() -> int:
+        await asyncio.sleep(0)
+        return 7
+
+    async def _fail() -> None:
+        await asyncio.sleep(0)
+        raise ValueError("fel")
+
+    assert await profiler.async_run_coroutine(_ok(), "action") == 7
+    with pytest.raises(ValueError):
+        await profiler.async_run_coroutine(_fail(), "action")
+    assert profiler.scopes["action"] >= 2
+
+
+async def test_cancellation_is_forwarded_into_coroutine(profiler: ScopedProfiler) -> None:
+    started = asyncio.Event()
+    cleaned_up: list[bool] = []
+
+    async def _long() -> None:
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cleaned_up.append(True)
+            raise
+
+    task = asyncio.ensure_future(profiler.async_run_coroutine(_long(), "action"))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert cleaned_up == [True]
+
+
+async def test_closing_the_driver_closes_the_coroutine(profiler: ScopedProfiler) -> None:
+    closed: list[bool] = []
+
+    async def _waits() -> None:
+        try:
+            await asyncio.sleep(60)
+        finally:
+            closed.append(True)
+
+    driver = profiler.async_run_coroutine(_waits(), "action")
+    # Första steget: korutinen väntar på sin timer
+    driver.send(None)
+    driver.close()
+    assert closed == [True]
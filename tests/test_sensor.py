@@ -0,0 +1,81 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: tester för att ändrade optioner tas i bruk på plats
+#   (async_apply_config).
+
+"""Tester för detektorsensorn."""
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.knx_doubleclick.const import (
+    CONF_DOUBLE_CLICK_WINDOW_SECONDS,
+    CONF_KNX_GROUP_ADDRESS,
+    CONF_KNX_VALUE,
+    DOMAIN,
+)
+from custom_components.knx_doubleclick.dispatcher import async_get_dispatcher
+from custom_components.knx_doubleclick.sensor import KnxDoubleClickSensor
+from custom_components.knx_doubleclick.stats import DetectorStats
+from custom_components.knx_doubleclick.trace import TraceBuffer
+
+CONFIG = {
+    CONF_KNX_GROUP_ADDRESS: "1/2/3",
+    CONF_KNX_VALUE: 1,
+    CONF_DOUBLE_CLICK_WINDOW_SECONDS: 0.5,
+}
+
+
+def _sensor(hass: HomeAssistant, tmp_path, stats: DetectorStats) -> KnxDoubleClickSensor:
+    return KnxDoubleClickSensor(
+        hass,
+        MockConfigEntry(domain=DOMAIN),
+        "Knapp",
+        stats,
+        TraceBuffer("1/2/3", 16, 1.0, hass.loop.time()),
+        dict(CONFIG),
+        str(tmp_path / "knapp.yaml"),
+    )
+
+
+def _fire(hass: HomeAssistant, destination: str, data: int = 1) -> None:
+    hass.bus.async_fire("knx_event", {"destination": destination, "data": data, "direction": "Incoming"})
+
+
+async def test_group_address_change_re_registers_with_dispatcher(hass: HomeAssistant, tmp_path) -> None:
+    stats = DetectorStats()
+    sensor = _sensor(hass, tmp_path, stats)
+    dispatcher = async_get_dispatcher(hass)
+    sensor._start_knx_listener()
+    assert dispatcher.group_addresses == ["1/2/3"]
+
+    sensor.async_apply_config({**CONFIG, CONF_KNX_GROUP_ADDRESS: "1/2/4"})
+    assert dispatcher.group_addresses == ["1/2/4"]
+    assert stats.ga_counters is dispatcher.async_ga_counters("1/2/4")
+
+    _fire(hass, "1/2/3")
+    await hass.async_block_till_done()
+    assert stats.telegrams_matched == 0
+    _fire(hass, "1/2/4")
+    await hass.async_block_till_done()
+    assert stats.telegrams_matched == 1
+
+    sensor._stop_knx_listener()
+    await dispatcher.async_shutdown()
+
+
+async def test_window_change_keeps_registration(hass: HomeAssistant, tmp_path) -> None:
+    stats = DetectorStats()
+    sensor = _sensor(hass, tmp_path, stats)
+    dispatcher = async_get_dispatcher(hass)
+    sensor._start_knx_listener()
+    listeners = sensor._remove_listeners
+
+    sensor.async_apply_config({**CONFIG, CONF_DOUBLE_CLICK_WINDOW_SECONDS: 0.8})
+    assert sensor._remove_listeners is listeners
+    assert sensor._classifiers[1].window_seconds == 0.8
+
+    sensor._stop_knx_listener()
+    await dispatcher.async_shutdown()
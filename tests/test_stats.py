@@ -0,0 +1,226 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: tester för LatencyHistogram, summarize_stats och
+#   sammanfattningssensorn.
+# - Tester för P2Quantile och för att det inlärda fönstret stannar nära
+#   dubbelklicken när enkelklick blandas in, och vidgas när det är för smalt.
+
+"""Tester för latenshistogram och statistik."""
+import random
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.knx_doubleclick.const import (
+    CONF_DOUBLE_CLICK_WINDOW_SECONDS,
+    CONF_KNX_GROUP_ADDRESS,
+    CONF_KNX_VALUE,
+    CONF_WINDOW_AUTO_TUNE,
+    DATA_STATS,
+    DEFAULT_WINDOW_MAX_SECONDS,
+    DOMAIN,
+    WINDOW_TUNE_MIN_SAMPLES,
+)
+from custom_components.knx_doubleclick.sensor import (
+    KnxDoubleClickSensor,
+    KnxDoubleClickSummarySensor,
+)
+from custom_components.knx_doubleclick.stats import (
+    DetectorStats,
+    GaCounters,
+    LatencyHistogram,
+    P2Quantile,
+    summarize_stats,
+)
+from custom_components.knx_doubleclick.trace import TraceBuffer
+
+
+def test_histogram_without_samples() -> None:
+    histogram = LatencyHistogram()
+    assert histogram.quantile(0.5) is None
+    assert histogram.as_dict() == {
+        "count": 0,
+        "mean_ms": None,
+        "p50_ms": None,
+        "p95_ms": None,
+        "p99_ms": None,
+        "max_ms": None,
+    }
+
+
+def test_histogram_quantiles_within_bucket_growth() -> None:
+    histogram = LatencyHistogram()
+    # 1..1000 ms, jämnt fördelat
+    for ms in range(1, 1001):
+        histogram.record(ms / 1000)
+    assert histogram.count == 1000
+    assert histogram.max == pytest.approx(1.0)
+    assert histogram.total / histogram.count == pytest.approx(0.5005)
+    for q in (0.5, 0.95, 0.99):
+        # Facken växer med 10 %, kvantilen är fackets övre gräns
+        assert q <= histogram.quantile(q) <= q * 1.1 + 1e-9
+
+
+def test_histogram_clamps_outside_range() -> None:
+    histogram = LatencyHistogram(min_seconds=1e-3, max_seconds=1.0)
+    histogram.record(0.0)
+    histogram.record(120.0)
+    assert histogram.count == 2
+    assert histogram.max == 120.0
+    assert histogram.quantile(1.0) == 120.0
+    assert histogram.quantile(0.5) == pytest.approx(1e-3)
+
+
+def test_histogram_merge_and_reset() -> None:
+    a, b = LatencyHistogram(), LatencyHistogram()
+    for ms in (10, 20, 30):
+        a.record(ms / 1000)
+    b.record(0.5)
+    a.merge(b)
+    a.merge(LatencyHistogram())
+    assert a.count == 4
+    assert a.max == 0.5
+    assert a.total == pytest.approx(0.56)
+    assert a.quantile(1.0) == 0.5
+    a.reset()
+    assert a.count == 0
+    assert a.quantile(0.5) is None
+
+
+def test_histogram_merge_rejects_other_buckets() -> None:
+    with pytest.raises(ValueError):
+        LatencyHistogram().merge(LatencyHistogram(growth=1.2))
+
+
+def _stats(counters: GaCounters, matched: int, gestures: dict[str, int], latency: float) -> DetectorStats:
+    stats = DetectorStats()
+    stats.ga_counters = counters
+    stats.telegrams_matched = matched
+    stats.gestures.update(gestures)
+    stats.press_to_action.record(latency)
+    return stats
+
+
+def test_summarize_counts_shared_ga_once() -> None:
+    shared = GaCounters()
+    shared.seen, shared.duplicates = 10, 1
+    other = GaCounters()
+    other.seen = 4
+    summary = summarize_stats(
+        [
+            _stats(shared, 3, {"double": 1}, 0.05),
+            _stats(shared, 2, {"single": 2}, 0.10),
+            _stats(other, 4, {"double": 2}, 0.20),
+        ]
+    )
+    assert summary["detectors"] == 3
+    assert summary["telegrams_seen"] == 14
+    assert summary["telegrams_duplicate"] == 1
+    assert summary["telegrams_matched"] == 9
+    assert summary["gestures"] == {"double": 3, "single": 2}
+    assert summary["gestures_fired"] == 5
+    assert summary["latency"]["press_to_action"]["count"] == 3
+    assert summary["latency"]["press_to_action"]["max_ms"] == 200.0
+    assert "press_intervals" not in summary
+
+
+async def test_summary_sensor_covers_only_its_entry(hass: HomeAssistant) -> None:
+    counters = GaCounters()
+    counters.seen = 2
+    hass.data.setdefault(DOMAIN, {})[DATA_STATS] = {
+        "hub_a": _stats(counters, 1, {"double": 1}, 0.1),
+        "hub_b": _stats(counters, 1, {"double": 1}, 0.3),
+        "other": _stats(GaCounters(), 5, {"single": 5}, 1.0),
+    }
+    sensor = KnxDoubleClickSummarySensor("hub", "Hubb Sammanfattning")
+    sensor.hass = hass
+    assert sensor.native_value is None
+    await sensor.async_update()
+    assert sensor.unique_id == "hub_summary"
+    assert sensor.extra_state_attributes["detectors"] == 2
+    assert sensor.extra_state_attributes["gestures"] == {"double": 2}
+    assert sensor.native_value == pytest.approx(300.0, rel=0.1)
+
+
+def test_p2_quantile_is_exact_for_few_samples() -> None:
+    quantile = P2Quantile(0.95)
+    assert quantile.value is None
+    for x in (0.5, 0.1, 0.3):
+        quantile.add(x)
+    assert quantile.count == 3
+    assert quantile.value == 0.5
+    quantile.reset()
+    assert quantile.value is None
+    assert quantile.as_dict() == {"count": 0, "quantile": 0.95, "value_ms": None}
+
+
+def test_p2_quantile_tracks_uniform_distribution() -> None:
+    rng = random.Random(1)
+    quantile = P2Quantile(0.95)
+    for _ in range(5000):
+        quantile.add(rng.uniform(0.2, 0.6))
+    assert quantile.count == 5000
+    assert quantile.value == pytest.approx(0.58, abs=0.01)
+
+
+def _auto_tuned_sensor(
+    hass: HomeAssistant, tmp_path, stats: DetectorStats, window: float
+) -> KnxDoubleClickSensor:
+    config = {
+        CONF_KNX_GROUP_ADDRESS: "1/2/3",
+        CONF_KNX_VALUE: 1,
+        CONF_DOUBLE_CLICK_WINDOW_SECONDS: window,
+        CONF_WINDOW_AUTO_TUNE: True,
+    }
+    return KnxDoubleClickSensor(
+        hass,
+        MockConfigEntry(domain=DOMAIN),
+        "Knapp",
+        stats,
+        TraceBuffer("1/2/3", 16, 1.0, hass.loop.time()),
+        config,
+        str(tmp_path / "knapp.yaml"),
+    )
+
+
+def _press_sequences(
+    sensor: KnxDoubleClickSensor, now: float, pause: tuple[float, float], gap: tuple[float, float]
+) -> None:
+    """300 sekvenser med en paus före: hälften dubbelklick med tiden gap, resten enkelklick."""
+    rng = random.Random(2)
+    for _ in range(300):
+        now += rng.uniform(*pause)
+        sensor._handle_knx_press(1, now)
+        if rng.random() < 0.5:
+            now += rng.uniform(*gap)
+            sensor._handle_knx_press(1, now)
+
+
+async def test_learned_window_ignores_single_clicks(hass: HomeAssistant, tmp_path) -> None:
+    """Pauserna efter enkelklick ska inte dra upp fönstret mot maxgränsen."""
+    stats = DetectorStats()
+    sensor = _auto_tuned_sensor(hass, tmp_path, stats, 0.5)
+    # Börjar långt bakåt så att klockan aldrig passerar loopens tid
+    _press_sequences(sensor, hass.loop.time() - 5000, (0.5, 4.0), (0.3, 0.4))
+
+    assert stats.press_intervals.count >= WINDOW_TUNE_MIN_SAMPLES
+    window = sensor._double_click_window_seconds
+    assert window < DEFAULT_WINDOW_MAX_SECONDS
+    # Kvantilen av dubbelklicken (0.3-0.4 s) med marginal
+    assert 0.4 <= window <= 0.55
+
+
+async def test_too_narrow_window_widens_for_slow_presses(hass: HomeAssistant, tmp_path) -> None:
+    """Dubbelklick med 0.5 s mellan trycken ska rymmas även om fönstret börjar på 0.3 s."""
+    stats = DetectorStats()
+    sensor = _auto_tuned_sensor(hass, tmp_path, stats, 0.3)
+    _press_sequences(sensor, hass.loop.time() - 5000, (1.5, 6.0), (0.45, 0.55))
+
+    window = sensor._double_click_window_seconds
+    assert 0.55 <= window < DEFAULT_WINDOW_MAX_SECONDS
+    # Efter vidgningen hamnar dubbelklicken inom fönstret och lärs in som sådana
+    assert stats.press_intervals.count >= WINDOW_TUNE_MIN_SAMPLES
@@ -0,0 +1,120 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: tester för intagsläge xknx med en fejkad xknx-instans,
+#   inklusive ogiltig GA och en xknx-instans som försvinner.
+
+"""Tester för intagsläge xknx."""
+from types import SimpleNamespace
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.knx_doubleclick.const import (
+    DATA_XKNX,
+    DOMAIN,
+    INTAKE_MODE_XKNX,
+    KNX_DOMAIN,
+)
+from custom_components.knx_doubleclick.detector import parse_group_address
+from custom_components.knx_doubleclick.dispatcher import (
+    KnxDoubleClickDispatcher,
+    async_get_dispatcher,
+)
+
+GroupAddress = pytest.importorskip("xknx.telegram").GroupAddress
+
+
+class FakeTelegramQueue:
+    """Sparar registrerade callbacks som xknx.core.TelegramQueue."""
+
+    def __init__(self) -> None:
+        self.callbacks: list[tuple] = []
+
+    def register_telegram_received_cb(self, telegram_received_cb, group_addresses=None):
+        entry = (telegram_received_cb, group_addresses)
+        self.callbacks.append(entry)
+        return entry
+
+    def unregister_telegram_received_cb(self, entry) -> None:
+        self.callbacks.remove(entry)
+
+
+def _telegram(destination: str, source: int, value):
+    return SimpleNamespace(
+        destination_address=SimpleNamespace(raw=parse_group_address(destination)),
+        source_address=SimpleNamespace(raw=source),
+        payload=SimpleNamespace(value=SimpleNamespace(value=value)),
+    )
+
+
+async def test_override_routes_telegram_through_xknx_handler(hass: HomeAssistant) -> None:
+    queue = FakeTelegramQueue()
+    hass.data.setdefault(DOMAIN, {})[DATA_XKNX] = SimpleNamespace(telegram_queue=queue)
+    dispatcher = async_get_dispatcher(hass)
+    calls: list[int] = []
+    unregister = dispatcher.async_register(
+        "1/1/1", 1, lambda value, received: calls.append(value), intake_mode=INTAKE_MODE_XKNX
+    )
+    await hass.async_block_till_done()
+
+    assert len(queue.callbacks) == 1
+    telegram_cb, group_addresses = queue.callbacks[0]
+    assert group_addresses == [GroupAddress("1/1/1")]
+    # Eventbussen används inte i intagsläge xknx
+    assert "knx_event" not in hass.bus.async_listeners()
+    assert dispatcher.async_diagnostics()["xknx_callback_registered"]
+
+    telegram_cb(_telegram("1/1/1", 4353, 1))
+    telegram_cb(_telegram("1/1/1", 4353, 0))
+    telegram_cb(_telegram("1/1/2", 4353, 1))
+    assert calls == [1]
+
+    unregister()
+    await hass.async_block_till_done()
+    assert queue.callbacks == []
+
+
+async def test_invalid_group_address_logs_the_reason(
+    hass: HomeAssistant, caplog: pytest.LogCaptureFixture
+) -> None:
+    hass.data.setdefault(DOMAIN, {})[DATA_XKNX] = SimpleNamespace(telegram_queue=FakeTelegramQueue())
+    dispatcher = async_get_dispatcher(hass)
+    dispatcher.async_register("ogiltig", 1, lambda value, received: None, intake_mode=INTAKE_MODE_XKNX)
+    assert "Ogiltig gruppadress ogiltig för intagsläge xknx" in caplog.text
+    assert "inte tillgänglig" not in caplog.text
+    await dispatcher.async_shutdown()
+
+
+async def test_lost_xknx_moves_detectors_to_knx_event(hass: HomeAssistant) -> None:
+    queue = FakeTelegramQueue()
+    hass.data[KNX_DOMAIN] = SimpleNamespace(xknx=SimpleNamespace(telegram_queue=queue))
+    dispatcher = KnxDoubleClickDispatcher(hass)
+    calls: list[int] = []
+    unregister = dispatcher.async_register(
+        "1/1/1", 1, lambda value, received: calls.append(value), intake_mode=INTAKE_MODE_XKNX
+    )
+    unregister_other = dispatcher.async_register(
+        "1/1/2", 1, lambda value, received: None, intake_mode=INTAKE_MODE_XKNX
+    )
+    await hass.async_block_till_done()
+    assert len(queue.callbacks) == 1
+
+    # KNX-integrationen laddas ur; nästa omregistrering märker att xknx saknas
+    del hass.data[KNX_DOMAIN]
+    unregister_other()
+    await hass.async_block_till_done()
+    assert dispatcher.async_diagnostics()["xknx_group_addresses"] == []
+    assert dispatcher.async_diagnostics()["event_bus_group_addresses"] == ["1/1/1"]
+    counters = dispatcher.async_ga_counters("1/1/1")
+
+    hass.bus.async_fire("knx_event", {"destination": "1/1/1", "data": 1, "direction": "Incoming"})
+    await hass.async_block_till_done()
+    assert calls == [1]
+    assert counters.matched == 1
+
+    unregister()
+    assert hass.bus.async_listeners().get("knx_event") is None
+    await dispatcher.async_shutdown()
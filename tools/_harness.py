@@ -0,0 +1,184 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Importerna sorterade (ruff I001); datetime.UTC i stället för
+#   timezone.utc (ruff UP017).
+#
+# Version: 0.9.23
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - async_remove_detectors tar bort entries helt (inklusive entiteter i
+#   registret), så att samma detektorer kan sättas upp igen i nästa cykel.
+#   Entitetsplattformar som kärnan behåller för borttagna entries släpps.
+#
+# Version: 0.9.17
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Detektorerna sätts upp samtidigt, som vid start av Home Assistant, och
+#   får unika namn. Med samma namn för alla dominerade entitetsregistrets
+#   sökning efter lediga entitets-id uppstartstiden.
+#
+# Version: 0.9.14
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Ny modul: gemensam testmiljö för verktygen i tools/. Startar en lokal
+#   Home Assistant-instans (pytest-homeassistant-custom-component), fejkar
+#   KNX-integrationen och sätter upp N detektorer med stubbade tjänster.
+
+"""Gemensam Home Assistant-miljö för mät- och belastningsverktygen."""
+import os
+import sys
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+try:
+    from homeassistant import loader
+    from homeassistant.core import HomeAssistant, ServiceCall, callback
+    from homeassistant.helpers.entity_platform import DATA_ENTITY_PLATFORM
+    from homeassistant.setup import async_setup_component
+    from pytest_homeassistant_custom_component.common import (
+        MockConfigEntry,
+        async_test_home_assistant,
+    )
+except ImportError as err:  # pragma: no cover - beror på miljön
+    raise SystemExit(
+        "Verktygen kräver homeassistant och pytest-homeassistant-custom-component "
+        f"(pip install pytest-homeassistant-custom-component): {err}"
+    ) from err
+
+from custom_components.knx_doubleclick.const import (
+    ACTIONS_DIR_BASENAME,
+    CONF_DOUBLE_CLICK_WINDOW_SECONDS,
+    CONF_KNX_GROUP_ADDRESS,
+    CONF_KNX_VALUE,
+    CONF_NAME_SUFFIX,
+    DOMAIN,
+    KNX_DOMAIN,
+    KNX_SERVICE_EVENT_REGISTER,
+)
+
+# Stubbtjänst som åtgärdsfilerna anropar i stället för riktiga enheter
+STUB_DOMAIN = "knx_doubleclick_bench"
+STUB_SERVICE = "noop"
+STUB_ACTIONS_CONTENT = f"- service: {STUB_DOMAIN}.{STUB_SERVICE}\n"
+
+
+def group_address(index: int) -> str:
+    """En unik trenivåadress per index: 1/0/0, 1/0/1 ... (max 65 536 st)."""
+    return f"{1 + index // 2048}/{(index // 256) % 8}/{index % 256}"
+
+
+def unwatched_group_address(index: int) -> str:
+    """Adresser i huvudgrupp 31, som inga detektorer lyssnar på."""
+    return f"31/{(index // 256) % 8}/{index % 256}"
+
+
+class StubServices:
+    """Räknar anrop till stubbtjänsten och till knx.event_register."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.event_register_calls = 0
+
+    @callback
+    def async_register(self, hass: HomeAssistant) -> None:
+        @callback
+        def _noop(call: ServiceCall) -> None:
+            self.calls += 1
+
+        @callback
+        def _event_register(call: ServiceCall) -> None:
+            self.event_register_calls += 1
+
+        hass.services.async_register(STUB_DOMAIN, STUB_SERVICE, _noop)
+        hass.services.async_register(KNX_DOMAIN, KNX_SERVICE_EVENT_REGISTER, _event_register)
+
+
+@asynccontextmanager
+async def async_bench_hass(config_dir: str) -> AsyncIterator[HomeAssistant]:
+    """En körande Home Assistant med KNX fejkad och custom_components från repot."""
+    async with async_test_home_assistant(config_dir=config_dir) as hass:
+        # Låt loadern hitta custom_components i REPO_ROOT via sys.path
+        hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+        # Integrationens beroenden räknas som laddade; KNX-tjänsterna stubbas
+        hass.config.components.update({KNX_DOMAIN, "http", "frontend"})
+        try:
+            yield hass
+        finally:
+            await hass.async_stop(force=True)
+
+
+async def async_setup_detectors(
+    hass: HomeAssistant,
+    count: int,
+    window_seconds: float,
+    options: Optional[Dict[str, Any]] = None,
+    actions_content: str = STUB_ACTIONS_CONTENT,
+) -> List[MockConfigEntry]:
+    """Skriver åtgärdsfiler och sätter upp count detektorer, en GA var."""
+    actions_dir = hass.config.path(ACTIONS_DIR_BASENAME)
+
+    def _write_actions_files(entry_ids: List[str]) -> None:
+        os.makedirs(actions_dir, exist_ok=True)
+        for index, entry_id in enumerate(entry_ids):
+            with open(os.path.join(actions_dir, f"bench_{index}--{entry_id}.yaml"), "w", encoding="utf-8") as file:
+                file.write(actions_content)
+
+    entries = [
+        MockConfigEntry(
+            domain=DOMAIN,
+            title=f"Bench {index}",
+            entry_id=f"bench{index:05d}",
+            data={
+                CONF_NAME_SUFFIX: f"bench {index}",
+                CONF_KNX_GROUP_ADDRESS: group_address(index),
+                CONF_KNX_VALUE: 1,
+                CONF_DOUBLE_CLICK_WINDOW_SECONDS: window_seconds,
+            },
+            options=dict(options or {}),
+        )
+        for index in range(count)
+    ]
+    await hass.async_add_executor_job(_write_actions_files, [entry.entry_id for entry in entries])
+    for entry in entries:
+        entry.add_to_hass(hass)
+    # Som vid start: alla entries sätts upp samtidigt när integrationen laddas
+    if DOMAIN not in hass.config.components:
+        await async_setup_component(hass, DOMAIN, {})
+    else:
+        for entry in entries:
+            await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    return entries
+
+
+async def async_unload_detectors(hass: HomeAssistant, entries: List[MockConfigEntry]) -> None:
+    for entry in entries:
+        await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+
+async def async_remove_detectors(hass: HomeAssistant, entries: List[MockConfigEntry]) -> None:
+    """Laddar ur och tar bort entries; samma entry-id kan sedan sättas upp igen."""
+    for entry in entries:
+        await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    # Home Assistant återställer men behåller entitetsplattformen för en urladdad
+    # entry (EntityComponent.async_unload_entry anropar inte async_destroy). Den
+    # håller kvar entry och översättningar; släpps här så att uthållighetstestet
+    # mäter komponenten och inte kärnan.
+    removed = {entry.entry_id for entry in entries}
+    for platforms in hass.data.get(DATA_ENTITY_PLATFORM, {}).values():
+        platforms[:] = [
+            platform for platform in platforms
+            if platform.config_entry is None or platform.config_entry.entry_id not in removed
+        ]
@@ -0,0 +1,331 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Onödiga "noqa: E402" borttagna; importer efter sys.path-ändringen
+#   godtas av ruff utan undantag.
+# - Importerna sorterade (ruff I001); datetime.UTC i stället för
+#   timezone.utc (ruff UP017).
+#
+# Version: 0.9.14
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Nytt verktyg: reproducerbar mätning av genomströmning och latens. Sätter
+#   upp N detektorer på en lokal Home Assistant, driver en syntetisk ström av
+#   knx_event med given takt och träffandel och sparar resultatet som JSON
+#   som kan jämföras mot en tidigare körning (--compare).
+
+"""Prestandamätning för KNX Dubbelklicksdetektor.
+
+Exempel:
+    python tools/benchmark.py --detectors 100,1000,5000 --output bench.json
+    python tools/benchmark.py --detectors 1000 --compare bench.json
+
+Mått per antal detektorer:
+    fire_us:               synkron tid för hass.bus.async_fire per telegram, dvs.
+                           eventbussen, dispatchern och detektorns klassificering
+    cpu_per_telegram_us:   processens CPU-tid under lasten delat med antal telegram
+                           (inkl. timers, åtgärdskörningar och tillståndsskrivningar)
+    loop_lag:              hur sent en återkommande probe körs av event-loopen
+    detection/press_to_action: detektorernas egna histogram, sammanslagna
+    memory_per_detector_kib: tracemalloc-skillnad före/efter uppsättning delat med N
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import UTC, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import (
+    REPO_ROOT,
+    StubServices,
+    async_bench_hass,
+    async_setup_detectors,
+    async_unload_detectors,
+    group_address,
+    unwatched_group_address,
+)
+from homeassistant.const import __version__ as HA_VERSION
+
+from custom_components.knx_doubleclick.const import DATA_DISPATCHER, DATA_STATS, DOMAIN
+from custom_components.knx_doubleclick.stats import LatencyHistogram
+
+# Mått där lägre är bättre; jämförs av --compare
+COMPARED_METRICS = (
+    "fire_us.p50",
+    "fire_us.p99",
+    "cpu_per_telegram_us",
+    "loop_lag_ms.p99",
+    "press_to_action_ms.p95",
+    "memory_per_detector_kib",
+)
+
+LOOP_PROBE_INTERVAL = 0.01
+
+# (tid från start, GA)
+Schedule = List[Tuple[float, str]]
+
+
+def build_schedule(
+    detectors: int, rate: float, duration: float, hit_ratio: float, click_gap: float, seed: int
+) -> Schedule:
+    """Telegramströmmen som en sorterad lista, samma för samma argument.
+
+    En träff är ett dubbelklick (två telegram med click_gap emellan) på en
+    slumpvis vald detektor; övriga telegram går till adresser utan detektor.
+    """
+    rng = random.Random(seed)
+    total = int(rate * duration)
+    schedule: Schedule = []
+    index = 0
+    while len(schedule) < total:
+        start = index / rate
+        index += 1
+        if detectors and rng.random() < hit_ratio:
+            ga = group_address(rng.randrange(detectors))
+            schedule.append((start, ga))
+            schedule.append((start + click_gap, ga))
+            index += 1
+        else:
+            schedule.append((start, unwatched_group_address(rng.randrange(2048))))
+    schedule.sort()
+    return schedule[:total]
+
+
+def _histogram_us(histogram: LatencyHistogram) -> Dict[str, Any]:
+    """Som LatencyHistogram.as_dict men i mikrosekunder."""
+
+    def _us(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value * 1e6, 2)
+
+    return {
+        "count": histogram.count,
+        "mean": _us(histogram.total / histogram.count) if histogram.count else None,
+        "p50": _us(histogram.quantile(0.50)),
+        "p95": _us(histogram.quantile(0.95)),
+        "p99": _us(histogram.quantile(0.99)),
+        "max": _us(histogram.max) if histogram.count else None,
+    }
+
+
+async def _async_drive_load(hass: Any, schedule: Schedule) -> LatencyHistogram:
+    """Skickar telegrammen enligt schemat (öppen last) och mäter async_fire."""
+    fire_time = LatencyHistogram(min_seconds=1e-7, max_seconds=1.0)
+    loop = hass.loop
+    start = loop.time()
+    position = 0
+    while position < len(schedule):
+        offset = schedule[position][0]
+        delay = start + offset - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Allt som hunnit bli aktuellt skickas direkt, även om loopen legat efter
+        now = loop.time() - start
+        while position < len(schedule) and schedule[position][0] <= now:
+            ga = schedule[position][1]
+            began = time.perf_counter()
+            hass.bus.async_fire("knx_event", {"destination": ga, "data": 1, "direction": "Incoming"})
+            fire_time.record(time.perf_counter() - began)
+            position += 1
+    return fire_time
+
+
+class _LoopLagProbe:
+    """Mäter hur sent loopen kör en callback som schemalagts med call_at."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self.lag = LatencyHistogram(min_seconds=1e-5, max_seconds=10.0)
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._expected = 0.0
+
+    def start(self) -> None:
+        self._expected = self._loop.time() + LOOP_PROBE_INTERVAL
+        self._handle = self._loop.call_at(self._expected, self._tick)
+
+    def _tick(self) -> None:
+        now = self._loop.time()
+        self.lag.record(max(now - self._expected, 0.0))
+        self._expected = now + LOOP_PROBE_INTERVAL
+        self._handle = self._loop.call_at(self._expected, self._tick)
+
+    def stop(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+
+async def async_run_scale(args: argparse.Namespace, detectors: int) -> Dict[str, Any]:
+    """En mätning med ett givet antal detektorer i en ny Home Assistant-instans."""
+    with tempfile.TemporaryDirectory(prefix="knx_doubleclick_bench_") as config_dir:
+        async with async_bench_hass(config_dir) as hass:
+            stubs = StubServices()
+            stubs.async_register(hass)
+
+            if args.memory:
+                tracemalloc.start()
+                memory_before = tracemalloc.get_traced_memory()[0]
+            setup_started = time.perf_counter()
+            entries = await async_setup_detectors(hass, detectors, args.window)
+            setup_seconds = time.perf_counter() - setup_started
+            memory_per_detector_kib: Optional[float] = None
+            if args.memory:
+                memory_after = tracemalloc.get_traced_memory()[0]
+                tracemalloc.stop()
+                memory_per_detector_kib = round((memory_after - memory_before) / max(detectors, 1) / 1024, 2)
+
+            schedule = build_schedule(detectors, args.rate, args.duration, args.hit_ratio, args.click_gap, args.seed)
+            probe = _LoopLagProbe(hass.loop)
+            probe.start()
+            cpu_started = time.process_time()
+            wall_started = time.perf_counter()
+            fire_time = await _async_drive_load(hass, schedule)
+            load_seconds = time.perf_counter() - wall_started
+            # Låt sista gesterna avgöras och körningarna bli klara
+            await asyncio.sleep(args.window + 0.2)
+            await hass.async_block_till_done(wait_background_tasks=True)
+            wall_seconds = time.perf_counter() - wall_started
+            cpu_seconds = time.process_time() - cpu_started
+            probe.stop()
+
+            detection = LatencyHistogram()
+            press_to_action = LatencyHistogram()
+            gestures = 0
+            for stats in hass.data[DOMAIN][DATA_STATS].values():
+                detection.merge(stats.detection)
+                press_to_action.merge(stats.press_to_action)
+                gestures += stats.gestures_fired
+            intake = hass.data[DOMAIN][DATA_DISPATCHER].intake_latency.as_dict()
+
+            await async_unload_detectors(hass, entries)
+
+    telegrams = len(schedule)
+    return {
+        "detectors": detectors,
+        "telegrams": telegrams,
+        "gestures": gestures,
+        "service_calls": stubs.calls,
+        "setup_seconds": round(setup_seconds, 3),
+        "wall_seconds": round(wall_seconds, 3),
+        "achieved_rate": round(telegrams / load_seconds, 1) if load_seconds else None,
+        "fire_us": _histogram_us(fire_time),
+        "cpu_per_telegram_us": round(cpu_seconds / telegrams * 1e6, 2) if telegrams else None,
+        "loop_lag_ms": probe.lag.as_dict(),
+        "intake_ms": intake,
+        "detection_ms": detection.as_dict(),
+        "press_to_action_ms": press_to_action.as_dict(),
+        "memory_per_detector_kib": memory_per_detector_kib,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _metric(result: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = result
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value if isinstance(value, (int, float)) else None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """Skriver en jämförelsetabell. Returnerar False om något mått försämrats mer än threshold."""
+    baseline_by_scale = {result["detectors"]: result for result in baseline.get("results", [])}
+    ok = True
+    print(f"\nJämförelse mot {baseline.get('meta', {}).get('git_revision') or 'baslinje'} "
+          f"(tröskel +{threshold:.0%}):")
+    print(f"{'detektorer':>10}  {'mått':<26} {'före':>10} {'nu':>10} {'ändring':>9}")
+    for result in current["results"]:
+        previous = baseline_by_scale.get(result["detectors"])
+        if previous is None:
+            print(f"{result['detectors']:>10}  (ingen baslinje)")
+            continue
+        for path in COMPARED_METRICS:
+            before, now = _metric(previous, path), _metric(result, path)
+            if before is None or now is None:
+                continue
+            change = (now - before) / before if before else 0.0
+            flag = ""
+            if change > threshold:
+                flag = "  <-- försämring"
+                ok = False
+            print(f"{result['detectors']:>10}  {path:<26} {before:>10.2f} {now:>10.2f} {change:>+8.1%}{flag}")
+    return ok
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--detectors", default="100,1000,5000",
+                        help="kommaseparerade antal detektorer (standard 100,1000,5000)")
+    parser.add_argument("--rate", type=float, default=500.0, help="telegram per sekund (standard 500)")
+    parser.add_argument("--duration", type=float, default=10.0, help="sekunder last per mätning (standard 10)")
+    parser.add_argument("--hit-ratio", type=float, default=0.5,
+                        help="andel telegram till bevakade GA, 0-1 (standard 0.5)")
+    parser.add_argument("--window", type=float, default=0.7, help="detektorernas tidsfönster (standard 0.7)")
+    parser.add_argument("--click-gap", type=float, default=0.2, help="tid mellan klicken i ett dubbelklick")
+    parser.add_argument("--seed", type=int, default=1, help="frö för telegramströmmen")
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="hoppa över minnesmätningen (tracemalloc gör uppsättningen långsammare)")
+    parser.add_argument("--output", help="skriv resultatet som JSON hit")
+    parser.add_argument("--compare", help="JSON från en tidigare körning att jämföra mot")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="tillåten försämring vid --compare innan exitkod 1 (standard 0.25)")
+    return parser.parse_args(argv)
+
+
+async def async_main(args: argparse.Namespace) -> Dict[str, Any]:
+    results = []
+    for detectors in (int(value) for value in args.detectors.split(",") if value.strip()):
+        print(f"Mäter {detectors} detektorer ...", file=sys.stderr)
+        results.append(await async_run_scale(args, detectors))
+    return {
+        "meta": {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "homeassistant": HA_VERSION,
+            "platform": platform.platform(),
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(async_main(args))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if not compare(report, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,582 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Tider mellan tryck med itertools.pairwise, zip() med strict=True och
+#   round() utan onödig int().
+# - Importerna sorterade och datetime.UTC i stället för timezone.utc (ruff
+#   I001, UP017).
+#
+# Version: 0.9.15
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Nytt verktyg: spelar upp inspelade telegram (bussmonitor-CSV eller
+#   exporterade knx_event) offline, utan Home Assistant. Ger fördelningen av
+#   tid mellan tryck per knapp, antal dubbelklick per kandidatfönster och en
+#   uppskattning av falska dubbelklick.
+
+"""Offline-uppspelning av KNX-telegram för att välja tidsfönster.
+
+Exempel:
+    python tools/replay.py busmonitor.csv
+    python tools/replay.py knx_events.jsonl --windows 0.4,0.5,0.7,1.0 --ga 1/0/5
+    python tools/replay.py busmonitor.csv --exact --window 0.7 --gestures single,double --json result.json
+
+Indata:
+    *.csv            Bussmonitor-export (t.ex. ETS) med kolumner för tid,
+                     måladress och värde (Info/Data/Value). Värden som "$01",
+                     "$01 | På", "On"/"Off", "0x01" och heltal tolkas.
+    *.json, *.jsonl  knx_event som JSON-lista eller en händelse per rad, antingen
+                     hela händelsen ({"event_type", "data", "time_fired"}) eller
+                     bara data med en tidsnyckel ("time"/"time_fired").
+
+Dubbelklicken per fönster beräknas vektoriserat per GA (numpy om det finns,
+annars samma algoritm i ren Python) och motsvarar detektorns beteende när
+åtgärdsfilen bara har dubbelklick. Med --exact körs varje GA dessutom genom
+detektorns egen GestureClassifier och TimerWheel med simulerad tid, så att
+alla gester (enkel, trippel, håll ...) räknas exakt som i Home Assistant.
+
+Falska dubbelklick uppskattas genom att anta att tryck med längre mellanrum
+än --intent-max är oberoende (Poisson). Bakgrundstakten skattas från dessa
+mellanrum, och andelen av dem som ändå skulle hamna inom fönstret blir
+uppskattningen.
+"""
+import argparse
+import csv
+import heapq
+import importlib.util
+import json
+import math
+import os
+import sys
+import time
+from array import array
+from collections import Counter
+from datetime import UTC, datetime
+from itertools import pairwise
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy är valfritt
+    np = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DETECTOR_PATH = os.path.join(REPO_ROOT, "custom_components", "knx_doubleclick", "detector.py")
+
+
+def _load_detector_module() -> Any:
+    """Laddar detector.py fristående; paketets __init__ kräver Home Assistant."""
+    spec = importlib.util.spec_from_file_location("knx_doubleclick_detector", DETECTOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+detector = _load_detector_module()
+
+# (GA, tid i sekunder, jämförbart värde)
+Telegram = Tuple[str, float, Optional[int]]
+
+DEFAULT_WINDOWS = "0.3,0.4,0.5,0.6,0.7,0.8,1.0,1.2"
+GAP_HISTOGRAM_STEP = 0.1
+GAP_HISTOGRAM_MAX = 2.0
+
+_TIME_COLUMNS = ("time", "timestamp", "zeit", "tid", "time_fired")
+_DESTINATION_COLUMNS = ("destination address", "destination", "dest", "ziel", "zieladresse", "group address", "ga")
+_VALUE_COLUMNS = ("info", "data", "value", "wert", "värde")
+# Format för tiden fram till och med minuten; sekunderna tolkas separat
+_MINUTE_FORMATS = (
+    "%d.%m.%Y %H:%M",
+    "%Y-%m-%d %H:%M",
+    "%m/%d/%Y %H:%M",
+    "%d/%m/%Y %H:%M",
+)
+_ON_WORDS = {"on", "ein", "an", "på", "true", "1"}
+_OFF_WORDS = {"off", "aus", "av", "false", "0"}
+
+
+class _TimeParser:
+    """Tolkar tidsstämplar; formatet som fungerade senast provas först.
+
+    Bussmonitorns lokala format ("18.10.2026 12:34:56.789") delas vid sista
+    kolonet: minuten slås upp i en cache och bara sekunderna tolkas per rad,
+    eftersom strptime annars dominerar inläsningen.
+    """
+
+    def __init__(self) -> None:
+        self._parse: Optional[Callable[[str], float]] = None
+        self._minutes: Dict[str, float] = {}
+        self._minute_format: Optional[str] = None
+
+    def __call__(self, text: Any) -> float:
+        if isinstance(text, (int, float)):
+            return float(text)
+        text = text.strip()
+        if self._parse is not None:
+            try:
+                return self._parse(text)
+            except ValueError:
+                pass
+        for parse in (float, self._parse_iso, self._parse_local):
+            try:
+                value = parse(text)
+            except ValueError:
+                continue
+            self._parse = parse
+            return value
+        raise ValueError(f"Okänt tidsformat: {text!r}")
+
+    @staticmethod
+    def _parse_iso(text: str) -> float:
+        return _timestamp(datetime.fromisoformat(text.replace("Z", "+00:00")))
+
+    def _parse_local(self, text: str) -> float:
+        minute, _, seconds = text.rpartition(":")
+        if not minute:
+            raise ValueError(text)
+        base = self._minutes.get(minute)
+        if base is None:
+            base = self._minutes[minute] = self._parse_minute(minute)
+        return base + float(seconds.replace(",", "."))
+
+    def _parse_minute(self, minute: str) -> float:
+        if self._minute_format is not None:
+            try:
+                return _timestamp(datetime.strptime(minute, self._minute_format))
+            except ValueError:
+                pass
+        for minute_format in _MINUTE_FORMATS:
+            try:
+                value = _timestamp(datetime.strptime(minute, minute_format))
+            except ValueError:
+                continue
+            self._minute_format = minute_format
+            return value
+        raise ValueError(minute)
+
+
+def _timestamp(moment: datetime) -> float:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    return moment.timestamp()
+
+
+def parse_monitor_value(text: str) -> Optional[int]:
+    """Värdet i en bussmonitor-rad som jämförbart heltal, None om det saknas."""
+    token = text.split("|", 1)[0].strip()
+    if not token:
+        return None
+    lowered = token.lower()
+    if lowered in _ON_WORDS:
+        return 1
+    if lowered in _OFF_WORDS:
+        return 0
+    try:
+        if token.startswith("$"):
+            return int(token[1:].replace(" ", ""), 16)
+        if lowered.startswith("0x"):
+            return int(lowered, 16)
+        return int(token)
+    except ValueError:
+        return None
+
+
+def _find_column(header: Sequence[str], candidates: Sequence[str]) -> Optional[int]:
+    lowered = [column.strip().lower() for column in header]
+    for candidate in candidates:
+        if candidate in lowered:
+            return lowered.index(candidate)
+    return None
+
+
+def read_bus_monitor_csv(path: str) -> Iterator[Telegram]:
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        sample = file.read(4096)
+        file.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(file, dialect)
+        header = next(reader, None)
+        if header is None:
+            return
+        time_col = _find_column(header, _TIME_COLUMNS)
+        destination_col = _find_column(header, _DESTINATION_COLUMNS)
+        value_col = _find_column(header, _VALUE_COLUMNS)
+        if time_col is None or destination_col is None or value_col is None:
+            raise SystemExit(f"{path}: hittar inte kolumner för tid, måladress och värde i {header}")
+        parse_time = _TimeParser()
+        # Ett fåtal olika värdetexter förekommer; tolka varje bara en gång
+        values: Dict[str, Optional[int]] = {}
+        width = max(time_col, destination_col, value_col)
+        for row in reader:
+            if len(row) <= width:
+                continue
+            text = row[value_col]
+            value = values.get(text, -1)
+            if value == -1:
+                value = values[text] = parse_monitor_value(text)
+            yield row[destination_col].strip(), parse_time(row[time_col]), value
+
+
+def _iter_json_objects(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as file:
+        first = file.read(1)
+        while first and first.isspace():
+            first = file.read(1)
+        file.seek(0)
+        if first == "[":
+            yield from json.load(file)
+            return
+        for line in file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def read_knx_events(path: str) -> Iterator[Telegram]:
+    parse_time = _TimeParser()
+    for obj in _iter_json_objects(path):
+        if "destination" in obj:
+            data = obj
+        else:
+            if obj.get("event_type", "knx_event") != "knx_event":
+                continue
+            data = obj.get("data") or {}
+        when = obj.get("time_fired", obj.get("time", data.get("time")))
+        destination = data.get("destination")
+        if when is None or destination is None:
+            continue
+        # Samma tolkning av värdet som dispatchern gör i Home Assistant
+        yield str(destination), parse_time(when), detector.coerce_event_value(data)
+
+
+def read_telegrams(path: str) -> Iterator[Telegram]:
+    if path.lower().endswith(".csv"):
+        return read_bus_monitor_csv(path)
+    return read_knx_events(path)
+
+
+class PressLog:
+    """Tider för tryck och släpp per GA, lagrade kompakt i array('d')."""
+
+    def __init__(self, press_value: int, release_value: Optional[int], group_addresses: Optional[set]) -> None:
+        self.press_value = press_value
+        self.release_value = release_value
+        self.group_addresses = group_addresses
+        self.presses: Dict[str, array] = {}
+        self.releases: Dict[str, array] = {}
+        self.telegrams = 0
+
+    def add(self, telegrams: Iterable[Telegram]) -> None:
+        presses, releases = self.presses, self.releases
+        press_value, release_value, wanted = self.press_value, self.release_value, self.group_addresses
+        count = 0
+        for ga, when, value in telegrams:
+            count += 1
+            if wanted is not None and ga not in wanted:
+                continue
+            if value == press_value:
+                target = presses.get(ga)
+                if target is None:
+                    target = presses[ga] = array("d")
+                target.append(when)
+            elif release_value is not None and value == release_value:
+                target = releases.get(ga)
+                if target is None:
+                    target = releases[ga] = array("d")
+                target.append(when)
+        self.telegrams += count
+
+
+def _sorted_times(times: array) -> Any:
+    if np is not None:
+        values = np.frombuffer(times, dtype=np.float64)
+        return np.sort(values, kind="stable")
+    return sorted(times)
+
+
+def _gaps(times: Any) -> Any:
+    if np is not None:
+        return np.diff(times)
+    return [later - earlier for earlier, later in pairwise(times)]
+
+
+def doubles_for_window(gaps: Any, window: float) -> int:
+    """Antal dubbelklick som detektorn ger med bara dubbelklick konfigurerat.
+
+    En kedja av k tryck där varje mellanrum är högst fönstret ger k // 2
+    dubbelklick: gesten avgörs direkt vid andra trycket och nästa tryck
+    börjar en ny sekvens.
+    """
+    if np is not None:
+        if not len(gaps):
+            return 0
+        inside = np.concatenate(([0], (gaps <= window).astype(np.int8), [0]))
+        edges = np.diff(inside)
+        runs = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+        return int(((runs + 1) // 2).sum())
+    doubles = 0
+    run = 0
+    for gap in gaps:
+        if gap <= window:
+            run += 1
+        elif run:
+            doubles += (run + 1) // 2
+            run = 0
+    return doubles + (run + 1) // 2
+
+
+def false_positive_estimate(gaps: Any, window: float, intent_max: float) -> Optional[float]:
+    """Förväntat antal dubbelklick av oberoende tryck som råkar hamna inom fönstret."""
+    if np is not None:
+        background = gaps[gaps > intent_max] - intent_max
+        n_background, total = len(background), float(background.sum())
+    else:
+        background = [gap - intent_max for gap in gaps if gap > intent_max]
+        n_background, total = len(background), sum(background)
+    if not n_background or total <= 0:
+        return None
+    rate = n_background / total
+    # Alla mellanrum kan vara bakgrund; andelen inom fönstret enligt exponentialfördelningen
+    return round(len(gaps) * (1 - math.exp(-rate * window)), 2)
+
+
+def _linear_quantile(ordered: Sequence[float], q: float) -> float:
+    """Kvantil med linjär interpolation, samma som numpy.quantile som standard."""
+    position = q * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def gap_distribution(gaps: Any) -> Dict[str, Any]:
+    """Kvantiler och ett histogram (fack om 0.1 s upp till 2 s) över tid mellan tryck."""
+    n_bins = round(GAP_HISTOGRAM_MAX / GAP_HISTOGRAM_STEP)
+    if np is not None:
+        if not len(gaps):
+            return {"count": 0}
+        quantiles = np.quantile(gaps, (0.05, 0.25, 0.5, 0.75, 0.95))
+        counts = np.bincount(
+            np.minimum((gaps / GAP_HISTOGRAM_STEP).astype(np.int64), n_bins), minlength=n_bins + 1
+        ).tolist()
+    else:
+        if not gaps:
+            return {"count": 0}
+        ordered = sorted(gaps)
+        quantiles = [_linear_quantile(ordered, q) for q in (0.05, 0.25, 0.5, 0.75, 0.95)]
+        counts = [0] * (n_bins + 1)
+        for gap in gaps:
+            counts[min(int(gap / GAP_HISTOGRAM_STEP), n_bins)] += 1
+    labels = [f"{index * GAP_HISTOGRAM_STEP:.1f}-{(index + 1) * GAP_HISTOGRAM_STEP:.1f}" for index in range(n_bins)]
+    labels.append(f">{GAP_HISTOGRAM_MAX:.1f}")
+    return {
+        "count": len(gaps),
+        "quantiles_s": dict(
+            zip(("p5", "p25", "p50", "p75", "p95"), (round(float(q), 3) for q in quantiles), strict=True)
+        ),
+        "histogram": dict(zip(labels, counts, strict=True)),
+    }
+
+
+class _SimulatedLoop:
+    """Minimal loop med simulerad tid för TimerWheel (time() och call_at())."""
+
+    class _Handle:
+        __slots__ = ("callback", "cancelled")
+
+        def __init__(self, callback: Callable[[], None]) -> None:
+            self.callback = callback
+            self.cancelled = False
+
+        def cancel(self) -> None:
+            self.cancelled = True
+
+    def __init__(self, start: float) -> None:
+        self.now = start
+        self._pending: List[Tuple[float, int, "_SimulatedLoop._Handle"]] = []
+        self._sequence = 0
+
+    def time(self) -> float:
+        return self.now
+
+    def call_at(self, when: float, callback: Callable[[], None]) -> "_SimulatedLoop._Handle":
+        handle = self._Handle(callback)
+        self._sequence += 1
+        heapq.heappush(self._pending, (when, self._sequence, handle))
+        return handle
+
+    def advance(self, until: float) -> None:
+        """Kör alla callbacks som hinner bli aktuella fram till until."""
+        pending = self._pending
+        while pending and pending[0][0] <= until:
+            when, _, handle = heapq.heappop(pending)
+            if handle.cancelled:
+                continue
+            self.now = max(self.now, when)
+            handle.callback()
+        self.now = max(self.now, until)
+
+
+def exact_gestures(
+    presses: Sequence[float],
+    releases: Sequence[float],
+    window: float,
+    gesture_names: Sequence[str],
+    hold_seconds: Optional[float],
+    tick_seconds: float,
+) -> Counter:
+    """Kör trycken genom detektorns GestureClassifier med simulerad tid."""
+    counts = [clicks for clicks in (detector.gesture_clicks(name) for name in gesture_names) if clicks]
+    max_clicks = max(counts, default=0)
+    resolve_counts = frozenset(clicks for clicks in counts if clicks < max_clicks)
+    use_hold = hold_seconds is not None and detector.GESTURE_HOLD in gesture_names and len(releases) > 0
+
+    events = [(when, True) for when in presses]
+    if use_hold:
+        events.extend((when, False) for when in releases)
+    events.sort()
+    if not events:
+        return Counter()
+    # Tiden räknas från första händelsen så att flyttalen behåller sin upplösning
+    origin = events[0][0]
+    loop = _SimulatedLoop(0.0)
+    wheel = detector.TimerWheel(loop, tick_seconds)
+    gestures: Counter = Counter()
+    classifier = detector.GestureClassifier(wheel, lambda gesture, clicks: gestures.update((gesture,)))
+    classifier.configure(window, max_clicks, resolve_counts, hold_seconds if use_hold else None)
+    for when, is_press in events:
+        now = when - origin
+        loop.advance(now)
+        if is_press:
+            classifier.press(now)
+        else:
+            classifier.release(now)
+    loop.advance(events[-1][0] - origin + window + max(hold_seconds or 0.0, 0.0) + 1.0)
+    return gestures
+
+
+def analyse(log: PressLog, args: argparse.Namespace, windows: List[float]) -> Dict[str, Any]:
+    gesture_names = [name.strip() for name in args.gestures.split(",") if name.strip()]
+    buttons = []
+    for ga, raw_times in log.presses.items():
+        times = _sorted_times(raw_times)
+        gaps = _gaps(times)
+        button: Dict[str, Any] = {
+            "group_address": ga,
+            "presses": len(times),
+            "span_hours": round((float(times[-1]) - float(times[0])) / 3600, 2) if len(times) else 0.0,
+            "gaps": gap_distribution(gaps),
+            "windows": [
+                {
+                    "window": window,
+                    "doubles": doubles_for_window(gaps, window),
+                    "false_positive_estimate": false_positive_estimate(gaps, window, args.intent_max),
+                }
+                for window in windows
+            ],
+        }
+        if args.exact:
+            releases = _sorted_times(log.releases.get(ga, array("d")))
+            button["exact"] = {
+                "window": args.window,
+                "gestures": dict(
+                    exact_gestures(
+                        [float(t) for t in times],
+                        [float(t) for t in releases],
+                        args.window,
+                        gesture_names,
+                        args.hold,
+                        args.tick,
+                    )
+                ),
+            }
+        buttons.append(button)
+    buttons.sort(key=lambda button: button["presses"], reverse=True)
+    return {
+        "telegrams": log.telegrams,
+        "press_value": log.press_value,
+        "numpy": np is not None,
+        "buttons": buttons,
+    }
+
+
+def print_report(result: Dict[str, Any], top: int) -> None:
+    print(f"{result['telegrams']} telegram, {len(result['buttons'])} knappar med tryck "
+          f"(värde {result['press_value']}){'' if result['numpy'] else ', utan numpy'}.")
+    for button in result["buttons"][:top]:
+        gaps = button["gaps"]
+        print(f"\n{button['group_address']}: {button['presses']} tryck under {button['span_hours']} h")
+        if gaps.get("count"):
+            quantiles = "  ".join(f"{key}={value:.3f}s" for key, value in gaps["quantiles_s"].items())
+            print(f"  tid mellan tryck: {quantiles}")
+            histogram = gaps["histogram"]
+            peak = max(histogram.values()) or 1
+            for label, count in histogram.items():
+                if count:
+                    print(f"    {label:>9} s {count:>8}  {'#' * max(1, round(30 * count / peak))}")
+        print(f"  {'fönster':>8} {'dubbelklick':>12} {'falska (uppsk.)':>16}")
+        for row in button["windows"]:
+            estimate = "-" if row["false_positive_estimate"] is None else f"{row['false_positive_estimate']:.1f}"
+            print(f"  {row['window']:>8.2f} {row['doubles']:>12} {estimate:>16}")
+        if "exact" in button:
+            gestures = ", ".join(f"{name}={count}" for name, count in sorted(button["exact"]["gestures"].items()))
+            print(f"  exakt med fönster {button['exact']['window']}: {gestures or 'inga gester'}")
+    if len(result["buttons"]) > top:
+        print(f"\n... och {len(result['buttons']) - top} knappar till (se --json).")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="en eller flera CSV-/JSON-filer, spelas upp tillsammans")
+    parser.add_argument("--ga", help="kommaseparerade GA att analysera (standard alla)")
+    parser.add_argument("--value", type=int, default=1, help="värdet för ett tryck (standard 1)")
+    parser.add_argument("--release-value", type=int, help="värdet för ett släpp (för håll med --exact)")
+    parser.add_argument("--windows", default=DEFAULT_WINDOWS, help=f"kandidatfönster i sekunder (standard {DEFAULT_WINDOWS})")
+    parser.add_argument("--intent-max", type=float, default=1.5,
+                        help="mellanrum längre än detta räknas som oberoende tryck (standard 1.5 s)")
+    parser.add_argument("--exact", action="store_true", help="kör även detektorns GestureClassifier med --window")
+    parser.add_argument("--window", type=float, default=0.7, help="fönster för --exact (standard 0.7)")
+    parser.add_argument("--gestures", default="double", help="gester i åtgärdsfilen för --exact (standard double)")
+    parser.add_argument("--hold", type=float, help="hålltid i sekunder för --exact (kräver --release-value)")
+    parser.add_argument("--tick", type=float, default=0.02, help="timerhjulets tick för --exact (standard 0.02)")
+    parser.add_argument("--top", type=int, default=20, help="antal knappar i textrapporten (standard 20)")
+    parser.add_argument("--json", help="skriv hela resultatet som JSON hit")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    windows = [float(value) for value in args.windows.split(",") if value.strip()]
+    wanted = {ga.strip() for ga in args.ga.split(",")} if args.ga else None
+    log = PressLog(args.value, args.release_value, wanted)
+    started = time.perf_counter()
+    for path in args.paths:
+        log.add(read_telegrams(path))
+    read_seconds = time.perf_counter() - started
+    result = analyse(log, args, windows)
+    result["seconds"] = {"read": round(read_seconds, 2), "analyse": round(time.perf_counter() - started - read_seconds, 2)}
+    print_report(result, args.top)
+    print(f"\nInläsning {result['seconds']['read']} s, analys {result['seconds']['analyse']} s.", file=sys.stderr)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
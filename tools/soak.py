@@ -0,0 +1,283 @@
+# Versionshistorik:
+# Version: 0.9.26
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Onödiga "noqa: E402" borttagna; importer efter sys.path-ändringen
+#   godtas av ruff utan undantag.
+# - Importerna sorterade (ruff I001).
+#
+# Version: 0.9.23
+# Datum: 2026-10-18
+# Upphovsman: Home Assistant Expert
+# Ändringar:
+# - Nytt verktyg: uthållighetstest för läckor. Kör många cykler av
+#   uppsättning, ändrade options, telegramskurar och urladdning på en lokal
+#   Home Assistant och kontrollerar att lyssnare, tasks och allokerat minne
+#   (tracemalloc) inte växer. Vid fel skrivs de allokeringsställen som växt.
+
+"""Uthållighetstest för KNX Dubbelklicksdetektor: läckor av lyssnare och minne.
+
+Exempel:
+    python tools/soak.py --cycles 2000 --detectors 10
+    python tools/soak.py --cycles 200 --max-growth-kib 128 --output soak.json
+
+En cykel:
+    1. sätter upp --detectors detektorer (åtgärdsfiler, entries, sensorer)
+    2. ändrar options för alla, växlande mellan tre varianter som bland
+       annat startar om lyssnarna (fler värden, släppvärde, intagsfönster)
+    3. skickar en skur på --burst tryck och låter gesterna avgöras
+    4. laddar ur och tar bort alla entries
+
+Efter --warmup cykler tas en baslinje: lyssnare på eventbussen (med och
+utan laddade detektorer), antal tasks och en tracemalloc-ögonblicksbild.
+Därefter ska lyssnare och tasks vara exakt lika i varje cykel, och minnet
+får inte ha växt mer än --max-growth-kib vid sista kontrollen. Annars blir
+exitkoden 1 och de allokeringsställen som växt mest skrivs ut.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import linecache
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import (
+    StubServices,
+    async_bench_hass,
+    async_remove_detectors,
+    async_setup_detectors,
+    group_address,
+)
+
+from custom_components.knx_doubleclick.const import (
+    CONF_DEDUPE_WINDOW,
+    CONF_DOUBLE_CLICK_WINDOW_SECONDS,
+    CONF_EXECUTION_MODE,
+    CONF_KNX_ADDITIONAL_VALUES,
+    CONF_KNX_RELEASE_VALUE,
+    CONF_STATE_ON_GESTURE_ONLY,
+    CONF_TRACE_SAMPLE_RATE,
+    EXECUTION_MODE_CONCURRENT,
+    EXECUTION_MODE_NON_BLOCKING,
+)
+
+# Allokeringar som hör till mätningen själv eller till importer, inte till komponenten
+_IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__, all_frames=True),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def options_variant(cycle: int, window: float) -> Dict[str, Any]:
+    """Options för en cykel. Varianterna växlar så att varje ändring byter något."""
+    variant = cycle % 3
+    if variant == 0:
+        return {CONF_DOUBLE_CLICK_WINDOW_SECONDS: window * 1.5, CONF_DEDUPE_WINDOW: 0.0}
+    if variant == 1:
+        # Fler värden och släppvärde: lyssnarna registreras om
+        return {
+            CONF_KNX_ADDITIONAL_VALUES: [2],
+            CONF_KNX_RELEASE_VALUE: 0,
+            CONF_EXECUTION_MODE: EXECUTION_MODE_CONCURRENT,
+        }
+    return {
+        CONF_STATE_ON_GESTURE_ONLY: True,
+        CONF_TRACE_SAMPLE_RATE: 0.5,
+        CONF_EXECUTION_MODE: EXECUTION_MODE_NON_BLOCKING,
+    }
+
+
+def listener_counts(hass: Any) -> Dict[str, int]:
+    return {event: count for event, count in sorted(hass.bus.async_listeners().items()) if count}
+
+
+def task_count() -> int:
+    return len(asyncio.all_tasks())
+
+
+def traced_kib() -> float:
+    gc.collect()
+    return round(tracemalloc.get_traced_memory()[0] / 1024, 1)
+
+
+def snapshot() -> tracemalloc.Snapshot:
+    gc.collect()
+    return tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+
+
+def growth_report(baseline: tracemalloc.Snapshot, current: tracemalloc.Snapshot, top: int) -> List[Dict[str, Any]]:
+    """De allokeringsställen (med anropskedja) som växt mest sedan baslinjen."""
+    grown = [stat for stat in current.compare_to(baseline, "traceback") if stat.size_diff > 0]
+    grown.sort(key=lambda stat: stat.size_diff, reverse=True)
+    return [
+        {
+            "size_diff_kib": round(stat.size_diff / 1024, 2),
+            "count_diff": stat.count_diff,
+            "traceback": stat.traceback.format(most_recent_first=True),
+        }
+        for stat in grown[:top]
+    ]
+
+
+async def _async_fire_burst(hass: Any, rng: random.Random, detectors: int, burst: int) -> None:
+    """Tryck på slumpvisa detektorer: enkel-, dubbelklick och tryck med släpp."""
+    for _ in range(burst):
+        ga = group_address(rng.randrange(detectors))
+        hass.bus.async_fire("knx_event", {"destination": ga, "data": rng.choice((1, 1, 2)), "direction": "Incoming"})
+        if rng.random() < 0.5:
+            hass.bus.async_fire("knx_event", {"destination": ga, "data": 0, "direction": "Incoming"})
+        if rng.random() < 0.2:
+            # Låt loopen köra timers och åtgärder mitt i skuren
+            await asyncio.sleep(0)
+
+
+async def async_cycle(hass: Any, args: argparse.Namespace, cycle: int, rng: random.Random) -> Dict[str, int]:
+    """En cykel. Returnerar lyssnarna medan detektorerna var laddade."""
+    entries = await async_setup_detectors(hass, args.detectors, args.window)
+    options = options_variant(cycle, args.window)
+    for entry in entries:
+        hass.config_entries.async_update_entry(entry, options=options)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    loaded = listener_counts(hass)
+
+    await _async_fire_burst(hass, rng, args.detectors, args.burst)
+    # Låt alla gestfönster (och hålltider) löpa ut och körningarna bli klara
+    await asyncio.sleep(args.window * 1.5 + 0.05)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    await async_remove_detectors(hass, entries)
+    return loaded
+
+
+async def async_soak(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    failures: List[str] = []
+    checkpoints: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="knx_doubleclick_soak_") as config_dir:
+        async with async_bench_hass(config_dir) as hass:
+            StubServices().async_register(hass)
+            tracemalloc.start(args.frames)
+            started = time.perf_counter()
+
+            # Lyssnare med laddade detektorer, per options-variant
+            loaded_baselines: Dict[int, Dict[str, int]] = {}
+            for cycle in range(args.warmup):
+                loaded_baselines[cycle % 3] = await async_cycle(hass, args, cycle, rng)
+            idle_baseline = listener_counts(hass)
+            tasks_baseline = task_count()
+            baseline = snapshot()
+            memory_baseline = traced_kib()
+            print(
+                f"Baslinje efter {args.warmup} cykler: {memory_baseline} KiB, "
+                f"lyssnare {sum(idle_baseline.values())}, "
+                f"tasks {tasks_baseline}",
+                file=sys.stderr,
+            )
+
+            for cycle in range(args.warmup, args.warmup + args.cycles):
+                loaded = await async_cycle(hass, args, cycle, rng)
+                # Samma variant ska ge exakt samma lyssnare som under uppvärmningen
+                loaded_baseline = loaded_baselines.setdefault(cycle % 3, loaded)
+                if loaded != loaded_baseline:
+                    failures.append(f"Cykel {cycle}: lyssnare med laddade detektorer {loaded_baseline} -> {loaded}")
+                idle = listener_counts(hass)
+                if idle != idle_baseline:
+                    failures.append(f"Cykel {cycle}: lyssnare efter urladdning {idle_baseline} -> {idle}")
+                done = cycle - args.warmup + 1
+                if done % args.check_every == 0 or done == args.cycles:
+                    tasks = task_count()
+                    memory = traced_kib()
+                    checkpoints.append(
+                        {
+                            "cycle": cycle + 1,
+                            "memory_kib": memory,
+                            "growth_kib": round(memory - memory_baseline, 1),
+                            "listeners": sum(idle.values()),
+                            "tasks": tasks,
+                            "seconds": round(time.perf_counter() - started, 1),
+                        }
+                    )
+                    print(
+                        f"Cykel {cycle + 1}: {memory} KiB ({memory - memory_baseline:+.1f}), "
+                        f"lyssnare {sum(idle.values())}, tasks {tasks}",
+                        file=sys.stderr,
+                    )
+                    if tasks > tasks_baseline:
+                        failures.append(f"Cykel {cycle + 1}: {tasks} tasks, baslinjen hade {tasks_baseline}")
+                if failures and args.fail_fast:
+                    break
+
+            growth_kib = round(traced_kib() - memory_baseline, 1)
+            current = snapshot()
+            tracemalloc.stop()
+
+    if growth_kib > args.max_growth_kib:
+        failures.append(f"Minnet växte {growth_kib} KiB, tillåtet {args.max_growth_kib} KiB")
+    grown = growth_report(baseline, current, args.top) if failures else []
+    return {
+        "args": vars(args),
+        "ok": not failures,
+        "growth_kib": growth_kib,
+        "failures": failures,
+        "checkpoints": checkpoints,
+        "grown_allocations": grown,
+    }
+
+
+def print_growth(grown: List[Dict[str, Any]]) -> None:
+    print("\nAllokeringsställen som växt sedan baslinjen:", file=sys.stderr)
+    for stat in grown:
+        print(f"+{stat['size_diff_kib']} KiB ({stat['count_diff']:+d} block)", file=sys.stderr)
+        for line in stat["traceback"]:
+            print(f"    {line}", file=sys.stderr)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=1000, help="cykler efter uppvärmningen (standard 1000)")
+    parser.add_argument("--warmup", type=int, default=20, help="cykler före baslinjen (standard 20)")
+    parser.add_argument("--detectors", type=int, default=10, help="detektorer per cykel (standard 10)")
+    parser.add_argument("--burst", type=int, default=50, help="tryck per cykel (standard 50)")
+    parser.add_argument("--window", type=float, default=0.05,
+                        help="detektorernas tidsfönster; kort så att cyklerna går fort (standard 0.05)")
+    parser.add_argument("--check-every", type=int, default=100,
+                        help="cykler mellan minnes- och taskkontrollerna (standard 100)")
+    parser.add_argument("--max-growth-kib", type=float, default=256.0,
+                        help="tillåten minnesökning från baslinjen till sista kontrollen (standard 256)")
+    parser.add_argument("--frames", type=int, default=8, help="djup på tracemallocs anropskedjor (standard 8)")
+    parser.add_argument("--top", type=int, default=15, help="antal växande allokeringsställen vid fel (standard 15)")
+    parser.add_argument("--seed", type=int, default=1, help="frö för skurarna")
+    parser.add_argument("--fail-fast", action="store_true", help="avbryt vid första fel")
+    parser.add_argument("--output", help="skriv resultatet som JSON hit")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(async_soak(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+    if report["ok"]:
+        print(f"OK: {args.cycles} cykler, minnet {report['growth_kib']:+.1f} KiB.", file=sys.stderr)
+        return 0
+    for failure in report["failures"]:
+        print(f"FEL: {failure}", file=sys.stderr)
+    print_growth(report["grown_allocations"])
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())